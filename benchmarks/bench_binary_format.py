@@ -0,0 +1,85 @@
+"""
+Binary format dumps/loads against JSON for a construction file with one large template.
+
+    python benchmarks/bench_binary_format.py --length 1000000
+
+JSON is timed on the same work: json.dumps of the construction file as a JSON document, and
+json.loads followed by construction_file_from_dict, so both sides return Polynucleotides. Exits 1
+if the binary format is not faster than JSON on dumps and on loads.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from collections import namedtuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from run import cloning_steps, random_sequence
+from cf_simulator.binary_format import dumps, loads
+from cf_simulator.construction_file import ConstructionFile
+from cf_simulator.parse_CF_JSON import construction_file_from_dict
+from cf_simulator.polynucleotide import dsDNA
+from cf_simulator.step_cache import POLYNUCLEOTIDE_FIELDS
+
+# Fastest time per call, in seconds, of one direction in both formats
+FormatTimes = namedtuple('FormatTimes', ['operation', 'binary', 'json'])
+
+
+def construction_file_to_dict(construction_file):
+    """
+    Returns construction_file as the document parse_CF_JSON reads.
+    """
+    sequences = {name: {field: getattr(poly, field) for field in POLYNUCLEOTIDE_FIELDS}
+                 for name, poly in construction_file.sequences.items()}
+    steps = [dict(vars(step), operation=step.operation) for step in construction_file.steps]
+    return {"sequences": sequences, "steps": steps}
+
+
+def measure_formats(length, number=10, repeat=5):
+    """
+    Returns the FormatTimes of dumps and loads for a construction file with a length bp template.
+    """
+    construction_file = ConstructionFile(cloning_steps(9, "template"), {"template": dsDNA(random_sequence(length))})
+    binary = dumps(construction_file)
+    text = json.dumps(construction_file_to_dict(construction_file))
+    assert loads(binary).sequences == construction_file_from_dict(json.loads(text)).sequences
+
+    def best(function):
+        return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+    return [
+        FormatTimes('dumps', best(lambda: dumps(construction_file)),
+                    best(lambda: json.dumps(construction_file_to_dict(construction_file)))),
+        FormatTimes('loads', best(lambda: loads(binary)),
+                    best(lambda: construction_file_from_dict(json.loads(text)))),
+    ]
+
+
+def check(times):
+    """
+    Returns a message for each operation where the binary format is not faster than JSON.
+    """
+    return [f"binary {entry.operation} takes {entry.binary * 1e3:.2f} ms, JSON {entry.json * 1e3:.2f} ms"
+            for entry in times if entry.binary >= entry.json]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--length', type=int, default=1000000)
+    parser.add_argument('--number', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    times = measure_formats(args.length, number=args.number)
+    for entry in times:
+        print(f"{entry.operation} {args.length} bp: binary {entry.binary * 1e3:8.2f} ms, "
+              f"JSON {entry.json * 1e3:8.2f} ms ({entry.json / entry.binary:.1f}x)")
+    failures = check(times)
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Time per Polynucleotide <-> Dseqrecord conversion for sticky, blunt and circular molecules.
+
+    python benchmarks/bench_dseq_conversion.py --length 5000
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from cf_simulator.polynucleotide import Polynucleotide
+from cf_simulator.polynucleotide_to_dseqrecord import polynucleotide_to_dseqrecord
+from cf_simulator.dseqrecord_to_polynucleotide import dseqrecord_to_polynucleotide
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--length', type=int, default=5000)
+    parser.add_argument('--number', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    sequence = ''.join(random.Random(0).choices('ACGT', k=args.length))
+    molecules = {
+        'sticky': Polynucleotide(sequence, 'AATT', '-TGCA', True, False, None, None),
+        'blunt': Polynucleotide(sequence, '', '', True, False, None, None),
+        'circular': Polynucleotide(sequence, '', '', True, True, None, None),
+    }
+    for name, poly in molecules.items():
+        record = polynucleotide_to_dseqrecord(poly)
+        to_dseq = timeit.timeit(lambda: polynucleotide_to_dseqrecord(poly), number=args.number) / args.number
+        to_poly = timeit.timeit(lambda: dseqrecord_to_polynucleotide(record, None, None), number=args.number) / args.number
+        print(f"{name:>8} {args.length} bp: to Dseqrecord {to_dseq * 1e6:8.1f} us, to Polynucleotide {to_poly * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
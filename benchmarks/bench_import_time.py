@@ -0,0 +1,95 @@
+"""
+Start-up cost of importing the simulator, measured with `python -X importtime`, against a budget.
+
+    python benchmarks/bench_import_time.py --budget-ms 300
+    python benchmarks/bench_import_time.py --module cf_simulator.batch --top 20
+
+Each run imports the module in a fresh interpreter; the fastest of --repeat runs is reported, so
+the first run's bytecode compilation does not count. Exits 1 if the import takes longer than the
+budget or loads any of the --forbid modules (pydna and Bio.Restriction by default, which are
+imported only when a digest or Golden Gate step runs).
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import namedtuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+
+DEFAULT_MODULE = 'cf_simulator.construction_file_simulator'
+DEFAULT_BUDGET_MS = 300
+DEFAULT_FORBID = ('pydna', 'Bio.Restriction')
+
+# One line of -X importtime output: times in microseconds; cumulative includes the module's imports
+ImportTime = namedtuple('ImportTime', ['module', 'self_us', 'cumulative_us'])
+
+
+def parse_importtime(text):
+    """
+    Returns the ImportTimes in -X importtime output (stderr), in the order they were reported.
+    """
+    times = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        times.append(ImportTime(fields[2].strip(), int(fields[0]), int(fields[1])))
+    return times
+
+
+def measure_import(module=DEFAULT_MODULE):
+    """
+    Imports module in a fresh interpreter and returns its ImportTimes.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return parse_importtime(result.stderr)
+
+
+def total_us(times, module=DEFAULT_MODULE):
+    """
+    Returns the cumulative import time of module.
+    """
+    return next(entry.cumulative_us for entry in times if entry.module == module)
+
+
+def check(times, module=DEFAULT_MODULE, budget_ms=DEFAULT_BUDGET_MS, forbid=DEFAULT_FORBID):
+    """
+    Returns the problems with an import: over budget (unless budget_ms is None), or loading a
+    forbidden module.
+    """
+    problems = []
+    total_ms = total_us(times, module) / 1000
+    if budget_ms is not None and total_ms > budget_ms:
+        problems.append(f"import {module} took {total_ms:.1f} ms, over the {budget_ms} ms budget")
+    for name in forbid:
+        if any(entry.module == name or entry.module.startswith(name + '.') for entry in times):
+            problems.append(f"import {module} loaded {name}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--module', default=DEFAULT_MODULE)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--forbid', default=','.join(DEFAULT_FORBID),
+                        help="comma-separated modules that must not be imported")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="slowest modules to list")
+    args = parser.parse_args(argv)
+
+    times = min((measure_import(args.module) for _ in range(args.repeat)), key=lambda run: total_us(run, args.module))
+    print(f"import {args.module}: {total_us(times, args.module) / 1000:.1f} ms (budget {args.budget_ms:g} ms)")
+    for entry in sorted(times, key=lambda entry: entry.self_us, reverse=True)[:args.top]:
+        print(f"  {entry.self_us / 1000:8.1f} ms self {entry.cumulative_us / 1000:8.1f} ms total  {entry.module}")
+    problems = check(times, args.module, args.budget_ms, [name for name in args.forbid.split(',') if name])
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Parse throughput of parse_CF_shorthand on a generated shorthand file.
+
+    python benchmarks/bench_parse_shorthand.py --designs 2000 --plasmid-length 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from cf_simulator.parse_CF_shorthand import parse_CF_shorthand
+
+
+def make_shorthand(designs, plasmid_length, seed=0):
+    """
+    Returns a shorthand document with one plasmid, two primers and a short cloning route per design.
+    """
+    rng = random.Random(seed)
+    lines = ["/* generated benchmark file */"]
+    for i in range(designs):
+        backbone = ''.join(rng.choice('ACGT') for _ in range(plasmid_length))
+        lines += [
+            f"plasmid backbone{i} {backbone}",
+            f"oligo fwd{i} {''.join(rng.choice('ACGT') for _ in range(30))}  # forward primer",
+            f"oligo rev{i} {''.join(rng.choice('ACGT') for _ in range(30))}",
+            f"pcr fwd{i} rev{i} backbone{i} pcr{i}",
+            f"digest pcr{i} EcoRI,BamHI 0 dig{i}",
+            f"ligate dig{i} fwd{i} lig{i}",
+            f"transform lig{i} Mach1 Zeo 37 xfm{i}",
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--designs', type=int, default=2000)
+    parser.add_argument('--plasmid-length', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    text = make_shorthand(args.designs, args.plasmid_length)
+    lines = text.count('\n')
+    megabytes = len(text) / 1e6
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as handle:
+        handle.write(text)
+    try:
+        for label, run in (("string", lambda: parse_CF_shorthand(text)),
+                           ("file", lambda: _parse_file(handle.name))):
+            best = min(_timed(run) for _ in range(args.repeat))
+            print(f"{label:>6}: {lines} lines, {megabytes:.1f} MB in {best:.3f}s "
+                  f"= {lines / best:,.0f} lines/s, {megabytes / best:.1f} MB/s")
+    finally:
+        os.remove(handle.name)
+
+
+def _parse_file(path):
+    with open(path) as source:
+        return parse_CF_shorthand(source)
+
+
+def _timed(run):
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Memory used per Polynucleotide for a library of parts, measured with tracemalloc.
+
+    python benchmarks/bench_polynucleotide_memory.py --parts 50000 --length 1000
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from cf_simulator.polynucleotide import dsDNA, oligo, plasmid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--parts', type=int, default=50000)
+    parser.add_argument('--length', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    factories = [dsDNA, oligo, plasmid]
+    # Build the sequences first so only the parts themselves are measured
+    sequences = [''.join(rng.choices('ACGT', k=args.length)) for _ in range(args.parts)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    parts = [factories[i % 3](sequence) for i, sequence in enumerate(sequences)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    # Includes the 8-byte list slot per part, and any copy of the sequence a part makes
+    print(f"{len(parts)} parts of {args.length} bp: {used / 1e6:.1f} MB, "
+          f"{used / len(parts):.0f} bytes/part beyond the input sequences")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Benchmark suite for the simulator hot paths, recorded as JSON so runs can be compared.
+
+    python benchmarks/run.py --output results.json            # full suite, 1 kb - 1 Mb
+    python benchmarks/run.py --quick --filter digest          # small sizes only
+    python benchmarks/run.py --compare baseline.json --output new.json
+
+Each benchmark is timed on synthetic, seeded workloads with everything built before timing;
+the per-sequence restriction site cache is cleared before every call, so digests are timed cold.
+Runs offline with only the packages the simulator needs.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bio_functions import translate, reverse_complement
+from cf_simulator.construction_file import ConstructionFile, PCR, Digest, Ligate, GoldenGate, Transform
+from cf_simulator.construction_file_simulator import simulate, perform_digest, perform_goldengate
+from cf_simulator.parse_CF_shorthand import parse_CF_shorthand
+from cf_simulator.polynucleotide import dsDNA
+from cf_simulator.restriction_index import site_index
+from bench_parse_shorthand import make_shorthand
+
+SEQUENCE_LENGTHS = [1000, 10000, 100000, 1000000]
+STEP_COUNTS = [1, 10, 100]
+BATCH_SIZES = [100, 10000]
+QUICK_LIMITS = {'length': 10000, 'steps': 10, 'designs': 10, 'files': 100}
+
+DIGEST_ENZYMES = ['EcoRI', 'BamHI', 'HindIII', 'XbaI', 'NotI']
+
+# name -> (parameter values, limit key for --quick, function(parameter) returning the callable to time)
+BENCHMARKS = {}
+
+
+def benchmark(name, params, limit):
+    def register(function):
+        BENCHMARKS[name] = (params, limit, function)
+        return function
+    return register
+
+
+def random_sequence(length, seed=0):
+    return ''.join(random.Random(seed).choices('ACGT', k=length))
+
+
+def digest_sequence(length):
+    """
+    Returns a random sequence with an EcoRI and a BamHI site every 500 bases, so every size is cut.
+    """
+    sequence = random_sequence(length)
+    pieces = [sequence[start:start + 500] for start in range(0, length, 500)]
+    return "GAATTC".join(piece[:250] + "GGATCC" + piece[256:] for piece in pieces)[:length]
+
+
+def goldengate_parts(length, parts=3):
+    """
+    Returns parts of about length bases in total, each flanked by BsaI sites that release
+    it with 4-nt overhangs matching its neighbours.
+    """
+    overhangs = ['AATG', 'GCTT', 'CGAC', 'TTCG', 'GGAA', 'ACTA'][:parts + 1]
+    body = max(length // parts - 22, 1)
+    return [f"GGTCTCA{overhangs[i]}{random_sequence(body, seed=i)}{overhangs[i + 1]}TGAGACC"
+            for i in range(parts)]
+
+
+def cloning_steps(count, template):
+    """
+    Returns count steps cycling PCR, multi-enzyme Digest and Ligate over the same template.
+    """
+    steps = []
+    for i in range(count):
+        if i % 3 == 0:
+            steps.append(PCR("ATGC", "CGTA", template, f"pcr{i}"))
+        elif i % 3 == 1:
+            steps.append(Digest(f"pcr{i - 1}", ['EcoRI', 'BamHI'], 0, f"dig{i}"))
+        else:
+            steps.append(Ligate([f"dig{i - 1}", "GGCC"], f"lig{i}"))
+    return steps
+
+
+def cold(function):
+    # Time a digest from scratch rather than from the site index cached by the previous call
+    def run():
+        site_index.cache_clear()
+        function()
+    return run
+
+
+@benchmark('translate', SEQUENCE_LENGTHS, 'length')
+def bench_translate(length):
+    sequence = random_sequence(length - length % 3)
+    return lambda: translate(sequence)
+
+
+@benchmark('reverse_complement', SEQUENCE_LENGTHS, 'length')
+def bench_reverse_complement(length):
+    sequence = random_sequence(length)
+    return lambda: reverse_complement(sequence)
+
+
+@benchmark('digest', SEQUENCE_LENGTHS, 'length')
+def bench_digest(length):
+    step = Digest(digest_sequence(length), DIGEST_ENZYMES, 0, "dig")
+    return cold(lambda: perform_digest(step))
+
+
+@benchmark('goldengate', SEQUENCE_LENGTHS, 'length')
+def bench_goldengate(length):
+    step = GoldenGate(goldengate_parts(length), "BsaI", "gg")
+    return cold(lambda: perform_goldengate(step))
+
+
+@benchmark('simulate', STEP_COUNTS, 'steps')
+def bench_simulate(count):
+    template = "ATGCGAATTCGATCGGATCCATGCATGCAAGCTTGCAT" + random_sequence(2000)
+    construction_file = ConstructionFile(cloning_steps(count, "template"), {"template": dsDNA(template)})
+    return cold(lambda: simulate(construction_file))
+
+
+@benchmark('parse_shorthand', [1, 10, 100, 1000], 'designs')
+def bench_parse_shorthand(designs):
+    text = make_shorthand(designs, 5000)
+    return lambda: parse_CF_shorthand(text)
+
+
+@benchmark('parse_json', [1, 10, 100, 1000], 'designs')
+def bench_parse_json(designs):
+    from cf_simulator.parse_CF_JSON import iter_CF_JSON
+    part = {"sequence": random_sequence(5000), "ext5": "", "ext3": "", "is_double_stranded": True,
+            "is_circular": False, "mod_ext5": "hydroxyl", "mod_ext3": "hydroxyl"}
+    steps = [dict(vars(step), operation=step.operation) for step in cloning_steps(3, "template")]
+    text = json.dumps([{"sequences": {"template": part}, "steps": steps}] * designs)
+    return lambda: sum(1 for _ in iter_CF_JSON(text))
+
+
+@benchmark('simulate_many', BATCH_SIZES, 'files')
+def bench_simulate_many(files):
+    from cf_simulator.batch import simulate_many
+    template = "ATGCGAATTCGATCGGATCC" + random_sequence(500)
+    batch = [ConstructionFile(cloning_steps(3, "template") + [Transform("lig2", "Mach1", ["Zeo"], "xfm", 37)],
+                              {"template": dsDNA(template[i % 500:] + template[:i % 500])})
+             for i in range(files)]
+    return lambda: sum(1 for _ in simulate_many(batch, chunksize=64))
+
+
+@benchmark('binary_format', SEQUENCE_LENGTHS, 'length')
+def bench_binary_format(length):
+    from cf_simulator.binary_format import dumps, loads
+    construction_file = ConstructionFile(cloning_steps(9, "template"), {"template": dsDNA(random_sequence(length))})
+    return lambda: loads(dumps(construction_file))
+
+
+def measure(run, repeat):
+    """
+    Returns the per-call times of repeat samples, each averaging enough calls to last ~0.2 s.
+    """
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    return [sample / number for sample in timer.repeat(repeat=repeat, number=number)], number
+
+
+def run_benchmarks(pattern=None, quick=False, repeat=5, report=print):
+    """
+    Runs the selected benchmarks and returns the results document.
+    """
+    results = []
+    for name, (params, limit, function) in BENCHMARKS.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        for param in params:
+            if quick and param > QUICK_LIMITS[limit]:
+                continue
+            run = function(param)
+            times, number = measure(run, repeat)
+            result = {'name': name, 'param': param, 'min': min(times), 'median': statistics.median(times),
+                      'number': number, 'repeat': repeat}
+            results.append(result)
+            report(f"{name:<20} {param:>9} {result['min'] * 1e3:12.3f} ms  (median {result['median'] * 1e3:.3f} ms)")
+    return {'meta': _metadata(quick), 'results': results}
+
+
+def compare(old, new):
+    """
+    Returns report lines with the ratio new/old for each benchmark present in both runs.
+    """
+    previous = {(result['name'], result['param']): result['min'] for result in old['results']}
+    lines = []
+    for result in new['results']:
+        key = (result['name'], result['param'])
+        if key in previous:
+            ratio = result['min'] / previous[key]
+            flag = '  slower' if ratio > 1.1 else '  faster' if ratio < 0.9 else ''
+            lines.append(f"{result['name']:<20} {result['param']:>9} {ratio:8.2f}x{flag}")
+    return lines
+
+
+def _metadata(quick):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'quick': quick,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--filter', help="only run benchmarks whose name matches this regex")
+    parser.add_argument('--quick', action='store_true', help="skip the largest workloads")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    document = run_benchmarks(args.filter, args.quick, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(document, handle, indent=2)
+    if args.compare:
+        with open(args.compare) as handle:
+            print('\n'.join(compare(json.load(handle), document)))
+
+
+if __name__ == "__main__":
+    main()
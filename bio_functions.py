@@ -1,3 +1,33 @@
+import contextlib
+import gzip
+import itertools
+import os
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the batch functions fall back to pure Python
+    np = None
+
+
+CODON_TABLE = {
+    'ATA':'I', 'ATC':'I', 'ATT':'I', 'ATG':'M',
+    'ACA':'T', 'ACC':'T', 'ACG':'T', 'ACT':'T',
+    'AAC':'N', 'AAT':'N', 'AAA':'K', 'AAG':'K',
+    'AGC':'S', 'AGT':'S', 'AGA':'R', 'AGG':'R',
+    'CTA':'L', 'CTC':'L', 'CTG':'L', 'CTT':'L',
+    'CCA':'P', 'CCC':'P', 'CCG':'P', 'CCT':'P',
+    'CAC':'H', 'CAT':'H', 'CAA':'Q', 'CAG':'Q',
+    'CGA':'R', 'CGC':'R', 'CGG':'R', 'CGT':'R',
+    'GTA':'V', 'GTC':'V', 'GTG':'V', 'GTT':'V',
+    'GCA':'A', 'GCC':'A', 'GCG':'A', 'GCT':'A',
+    'GAC':'D', 'GAT':'D', 'GAA':'E', 'GAG':'E',
+    'GGA':'G', 'GGC':'G', 'GGG':'G', 'GGT':'G',
+    'TCA':'S', 'TCC':'S', 'TCG':'S', 'TCT':'S',
+    'TTC':'F', 'TTT':'F', 'TTA':'L', 'TTG':'L',
+    'TAC':'Y', 'TAT':'Y', 'TAA':'_', 'TAG':'_',
+    'TGC':'C', 'TGT':'C', 'TGA':'_', 'TGG':'W',
+}
+
 def reverse_complement(sequence):
     """
     Calculates the reverse complement of a DNA sequence.
@@ -37,31 +67,379 @@ def translate(sequence):
     if len(sequence) % 3 != 0:
         raise ValueError("Length of DNA sequence is not a multiple of three, which is required for translation.")
 
-    codon_table = {
-        'ATA':'I', 'ATC':'I', 'ATT':'I', 'ATG':'M',
-        'ACA':'T', 'ACC':'T', 'ACG':'T', 'ACT':'T',
-        'AAC':'N', 'AAT':'N', 'AAA':'K', 'AAG':'K',
-        'AGC':'S', 'AGT':'S', 'AGA':'R', 'AGG':'R',
-        'CTA':'L', 'CTC':'L', 'CTG':'L', 'CTT':'L',
-        'CCA':'P', 'CCC':'P', 'CCG':'P', 'CCT':'P',
-        'CAC':'H', 'CAT':'H', 'CAA':'Q', 'CAG':'Q',
-        'CGA':'R', 'CGC':'R', 'CGG':'R', 'CGT':'R',
-        'GTA':'V', 'GTC':'V', 'GTG':'V', 'GTT':'V',
-        'GCA':'A', 'GCC':'A', 'GCG':'A', 'GCT':'A',
-        'GAC':'D', 'GAT':'D', 'GAA':'E', 'GAG':'E',
-        'GGA':'G', 'GGC':'G', 'GGG':'G', 'GGT':'G',
-        'TCA':'S', 'TCC':'S', 'TCG':'S', 'TCT':'S',
-        'TTC':'F', 'TTT':'F', 'TTA':'L', 'TTG':'L',
-        'TAC':'Y', 'TAT':'Y', 'TAA':'_', 'TAG':'_',
-        'TGC':'C', 'TGT':'C', 'TGA':'_', 'TGG':'W',
-    }
     protein = ""
     for i in range(0, len(sequence), 3):
         codon = sequence[i:i+3]
-        protein += codon_table.get(codon, '_')  # Using '_' for unknown or stop codons
+        protein += CODON_TABLE.get(codon, '_')  # Using '_' for unknown or stop codons
     return protein
 
 
+INVALID_CHARACTERS_MESSAGE = "DNA sequence contains invalid characters. Allowed characters: A, T, C, G."
+INVALID_LENGTH_MESSAGE = "Length of DNA sequence is not a multiple of three, which is required for translation."
+
+# Translation tables shared by the batch functions
+_COMPLEMENT = bytes.maketrans(b'ATCG', b'TAGC')
+_CODON_BASES = 'ACGT'  # base order used to build the codon indices
+
+# Base -> 0..3 for A, C, G, T and 4 for anything else; codon index is b0 * 25 + b1 * 5 + b2
+_BASE_INDEX = bytes(_CODON_BASES.index(chr(c)) if chr(c) in _CODON_BASES else 4 for c in range(256))
+_CODON_INDEX = bytearray(b'X' * 256)
+for _codon, _amino_acid in CODON_TABLE.items():
+    _CODON_INDEX[sum(_CODON_BASES.index(b) * w for b, w in zip(_codon, (25, 5, 1)))] = ord(_amino_acid)
+_CODON_INDEX = bytes(_CODON_INDEX)
+
+
+def _translate_codons(sequence):
+    """
+    Translates an in-frame sequence of whole codons, using 'X' for codons with unknown bases.
+    The input is not validated; callers are expected to check it first.
+    """
+    if np is None:
+        return ''.join([CODON_TABLE.get(sequence[i:i+3], 'X') for i in range(0, len(sequence), 3)])
+    bases = np.frombuffer(sequence.encode('latin-1').translate(_BASE_INDEX), dtype=np.uint8)
+    codons = bases[0::3] * 25 + bases[1::3] * 5 + bases[2::3]
+    return codons.tobytes().translate(_CODON_INDEX).decode('ascii')
+
+
+def _unpack_batch(sequences):
+    """
+    Normalizes a batch input into parallel lists of keys, sequence strings and
+    bytes flags (None when no input was bytes), plus a function that packs results
+    back into the input's shape.
+    """
+    if isinstance(sequences, (bytes, bytearray, memoryview)):
+        strings = bytes(sequences).decode('latin-1').splitlines()
+        keys = list(range(len(strings)))
+        return keys, strings, [True] * len(strings), lambda results: b'\n'.join(b'' if r is None else r for r in results)
+
+    if np is not None and isinstance(sequences, np.ndarray):
+        keys = list(np.ndindex(sequences.shape))
+        values = [sequences[key] for key in keys]
+        as_bytes = [isinstance(value, bytes) for value in values]
+        strings = [value.decode('latin-1') if is_bytes else str(value) for value, is_bytes in zip(values, as_bytes)]
+
+        def pack(results):
+            kind = sequences.dtype.kind
+            empty = b'' if kind == 'S' else ''
+            packed = np.array([empty if r is None else r for r in results],
+                              dtype=kind if kind in 'SU' else object)
+            return packed.reshape(sequences.shape)
+        return keys, strings, as_bytes, pack
+
+    values = sequences if isinstance(sequences, list) else list(sequences)
+    keys = range(len(values))
+    if set(map(type, values)) <= {str}:
+        return keys, values, None, list
+    as_bytes = [isinstance(value, (bytes, bytearray)) for value in values]
+    strings = [bytes(value).decode('latin-1') if is_bytes else value for value, is_bytes in zip(values, as_bytes)]
+    return keys, strings, as_bytes, list
+
+
+def _find_errors(keys, strings, check_length):
+    """
+    Returns a dict mapping the key of every sequence that reverse_complement (or
+    translate, when check_length is set) would reject to the ValueError it would raise,
+    and the newline-joined batch as bytes when every sequence is valid (else None).
+    The whole batch is checked in one pass first so valid batches skip the per-sequence scan.
+    """
+    joined = '\n'.join(strings).encode('latin-1', 'replace')
+    if joined.translate(None, b'ATCG') == b'\n' * (len(strings) - 1):
+        if not check_length or not any(len(sequence) % 3 for sequence in strings):
+            return {}, joined
+
+    errors = {}
+    for key, sequence in zip(keys, strings):
+        if sequence.encode('latin-1', 'replace').translate(None, b'ATCG'):
+            errors[key] = ValueError(INVALID_CHARACTERS_MESSAGE)
+        elif check_length and len(sequence) % 3 != 0:
+            errors[key] = ValueError(INVALID_LENGTH_MESSAGE)
+    return errors, None
+
+
+def _merge_results(keys, as_bytes, errors, valid_results):
+    """
+    Re-inserts None for rejected sequences and re-encodes results for bytes inputs.
+    """
+    if not errors and as_bytes is None:
+        return valid_results
+    if as_bytes is None:
+        as_bytes = [False] * len(keys)
+    valid_results = iter(valid_results)
+    results = []
+    for key, is_bytes in zip(keys, as_bytes):
+        if key in errors:
+            results.append(None)
+        else:
+            result = next(valid_results)
+            results.append(result.encode('ascii') if is_bytes else result)
+    return results
+
+
+def reverse_complement_many(sequences):
+    """
+    Calculates the reverse complement of every DNA sequence in a batch.
+
+    The valid sequences are complemented with a single bytes.translate call over the
+    joined batch, reversed once and split back apart.
+
+    Args:
+        sequences: A list of sequences (str or bytes), a newline-separated bytes buffer,
+            or a NumPy array of sequences.
+
+    Returns:
+        tuple: (results, errors). results has the same shape as the input (list, bytes buffer
+        or array) with the reverse complement of each sequence, and None (or an empty entry)
+        where a sequence was rejected. errors maps the position of each rejected sequence to
+        the ValueError that reverse_complement would have raised for it.
+    """
+    keys, strings, as_bytes, pack = _unpack_batch(sequences)
+    errors, joined = _find_errors(keys, strings, check_length=False)
+    valid = [sequence for key, sequence in zip(keys, strings) if key not in errors] if errors else strings
+
+    if valid:
+        # Reversing the joined batch reverses each sequence and the batch order at once
+        if joined is None:
+            joined = '\n'.join(valid).encode('ascii')
+        complemented = joined.translate(_COMPLEMENT)[::-1].decode('ascii').split('\n')
+        complemented.reverse()
+    else:
+        complemented = []
+    return pack(_merge_results(keys, as_bytes, errors, complemented)), errors
+
+
+def translate_many(sequences):
+    """
+    Translates every DNA sequence in a batch into a protein sequence.
+
+    All valid sequences are joined and translated in a single pass over a NumPy
+    codon-index array (or a pure Python loop when NumPy is not installed), then
+    split back apart.
+
+    Args:
+        sequences: A list of sequences (str or bytes), a newline-separated bytes buffer,
+            or a NumPy array of sequences.
+
+    Returns:
+        tuple: (results, errors). results has the same shape as the input with the protein
+        sequence for each DNA sequence, and None (or an empty entry) where a sequence was
+        rejected. errors maps the position of each rejected sequence to the ValueError that
+        translate would have raised for it.
+    """
+    keys, strings, as_bytes, pack = _unpack_batch(sequences)
+    errors, _ = _find_errors(keys, strings, check_length=True)
+    valid = [sequence for key, sequence in zip(keys, strings) if key not in errors] if errors else strings
+
+    # Every valid sequence is a whole number of codons, so the joined batch stays in frame;
+    # the 'NNN' separators translate to 'X', which no valid codon produces
+    translated = _translate_codons('NNN'.join(valid)).split('X') if valid else []
+    return pack(_merge_results(keys, as_bytes, errors, translated)), errors
+
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+_WHITESPACE = b' \t\r\n'
+
+
+@contextlib.contextmanager
+def _open_source(source):
+    """
+    Opens a path (plain or gzip-compressed) for binary reading, or passes an
+    already-open file object through without closing it.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        yield source
+        return
+    with open(source, 'rb') as raw:
+        magic = raw.read(2)
+        raw.seek(0)
+        if magic == b'\x1f\x8b':
+            with gzip.GzipFile(fileobj=raw) as handle:
+                yield handle
+        else:
+            yield raw
+
+
+def _read_records(source, chunk_size):
+    """
+    Yields (record_number, name, chunk) for every block of sequence in a FASTA or raw file.
+    """
+    with _open_source(source) as handle:
+        record, name, header = 0, None, None
+        at_line_start = True
+        while True:
+            block = handle.read(chunk_size)
+            if not block:
+                break
+            if isinstance(block, str):
+                block = block.encode('latin-1')
+            pos = 0
+            while pos < len(block):
+                if header is not None:
+                    # Headers may span several blocks; only the first word is kept as the name
+                    end = block.find(b'\n', pos)
+                    header += block[pos:] if end < 0 else block[pos:end]
+                    if end < 0:
+                        break
+                    fields = header.decode('latin-1').split()
+                    record, name, header = record + 1, fields[0] if fields else '', None
+                    pos, at_line_start = end + 1, True
+                elif at_line_start and block[pos:pos + 1] == b'>':
+                    header = bytearray()
+                    pos += 1
+                else:
+                    end = block.find(b'\n>', pos)
+                    stop = len(block) if end < 0 else end + 1
+                    chunk = block[pos:stop].translate(None, _WHITESPACE)
+                    if chunk:
+                        yield record, name, chunk.decode('latin-1').upper()
+                    pos, at_line_start = stop, block[stop - 1:stop] == b'\n'
+
+
+def read_fasta(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Reads a FASTA or raw sequence file in bounded-size chunks.
+
+    Args:
+        source: A path (plain or gzip-compressed) or an open file object.
+        chunk_size (int): Number of bytes read from the file at a time.
+
+    Returns:
+        generator: (name, chunks) pairs, one per record, where name is the first word of
+        the FASTA header (None for raw files) and chunks yields the record's upper-case
+        sequence a block at a time. Each record's chunks must be consumed before moving on.
+    """
+    for _, group in itertools.groupby(_read_records(source, chunk_size), key=lambda event: event[0]):
+        first = next(group)
+        yield first[1], itertools.chain([first[2]], (chunk for _, _, chunk in group))
+
+
+def _translate_frames(chunks):
+    """
+    Yields (frame, start, protein) for each chunk of a record, carrying the bases of a
+    codon split across chunk boundaries into the next chunk.
+    """
+    tail, position = '', 0  # position is the record offset of tail[0]
+    for chunk in chunks:
+        data = tail + chunk
+        for offset in range(3):
+            start = (offset - position) % 3
+            end = start + (len(data) - start) // 3 * 3
+            if end > start:
+                codons = data[start:end]
+                complement = codons.encode('latin-1').translate(_COMPLEMENT)[::-1].decode('latin-1')
+                yield offset + 1, position + start, _translate_codons(codons)
+                yield -(offset + 1), position + start, _translate_codons(complement)
+        keep = min(len(data), 2)
+        tail = data[len(data) - keep:]
+        position += len(data) - keep
+
+
+def translate_six_frames(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Translates every record of a FASTA or raw file in all six reading frames, streaming
+    the file so memory use is bounded by chunk_size rather than the genome size.
+
+    Frames 1, 2 and 3 start at record offsets 0, 1 and 2. Frames -1, -2 and -3 cover the
+    same codon positions read on the reverse strand. Codons use CODON_TABLE, so joining
+    the pieces of frame k gives translate(seq[k - 1:...]); joining the pieces of frame -k
+    in reverse order gives translate(reverse_complement(seq[k - 1:...])). Codons with
+    bases other than A, T, C and G translate to 'X'.
+
+    Args:
+        source: A path (plain or gzip-compressed) or an open file object.
+        chunk_size (int): Number of bytes read from the file at a time.
+
+    Returns:
+        generator: (name, frame, start, protein) tuples, where start is the record offset
+        of the first base covered by the piece.
+    """
+    for name, chunks in read_fasta(source, chunk_size):
+        for frame, start, protein in _translate_frames(chunks):
+            yield name, frame, start, protein
+
+
+def find_orfs(source, min_length=30, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streams a FASTA or raw file and finds open reading frames on both strands.
+
+    An ORF runs from the first ATG after a stop codon (or the start of the record) to
+    the next in-frame stop codon. ORFs that run off the end of a record are not reported.
+
+    Args:
+        source: A path (plain or gzip-compressed) or an open file object.
+        min_length (int): Minimum protein length, in amino acids, to report.
+        chunk_size (int): Number of bytes read from the file at a time.
+
+    Returns:
+        generator: (name, frame, start, end, protein) tuples, where start and end are
+        record offsets spanning the start codon through the stop codon, and protein
+        excludes the stop.
+    """
+    for name, chunks in read_fasta(source, chunk_size):
+        # Forward frames: start offset and pieces of the open ORF
+        forward = {frame: [None, []] for frame in (1, 2, 3)}
+        # Reverse frames: offset after the last stop, pieces since then, offset of the last ATG
+        reverse = {frame: [None, [], None] for frame in (-1, -2, -3)}
+
+        for frame, start, protein in _translate_frames(chunks):
+            if frame > 0:
+                state = forward[frame]
+                i = 0
+                while True:
+                    if state[0] is None:
+                        i = protein.find('M', i)
+                        if i < 0:
+                            break
+                        state[0], state[1] = start + 3 * i, []
+                    stop = protein.find('_', i)
+                    if stop < 0:
+                        state[1].append(protein[i:])
+                        break
+                    state[1].append(protein[i:stop])
+                    peptide = ''.join(state[1])
+                    if len(peptide) >= min_length:
+                        yield name, frame, state[0], start + 3 * stop + 3, peptide
+                    state[0], i = None, stop + 1
+            else:
+                # Reverse-strand protein reads right to left; flip it into record order so
+                # an ORF is the stretch between a stop and the last ATG before the next stop
+                state = reverse[frame]
+                protein = protein[::-1]
+                i = 0
+                while True:
+                    stop = protein.find('_', i)
+                    end = len(protein) if stop < 0 else stop
+                    if state[0] is not None:
+                        atg = protein.rfind('M', i, end)
+                        if atg >= 0:
+                            state[2] = start + 3 * atg
+                        state[1].append(protein[i:end])
+                    if stop < 0:
+                        break
+                    orf = _reverse_orf(name, frame, state, min_length)
+                    if orf:
+                        yield orf
+                    state[:] = [start + 3 * stop + 3, [], None]
+                    i = stop + 1
+
+        for frame, state in reverse.items():
+            orf = _reverse_orf(name, frame, state, min_length)
+            if orf:
+                yield orf
+
+
+def _reverse_orf(name, frame, state, min_length):
+    """
+    Builds the reverse-strand ORF record for a finished stretch between stop codons, if any.
+    """
+    segment_start, pieces, atg = state
+    if segment_start is None or atg is None:
+        return None
+    peptide = ''.join(pieces)[:(atg - segment_start) // 3 + 1][::-1]
+    if len(peptide) < min_length:
+        return None
+    return name, frame, segment_start - 3, atg + 3, peptide
+
+
 if __name__ == "__main__":
     # Example DNA sequence for demonstration
     dna_example = "ATGGCCATTGTAATGGGCCGCTGAAAGGGTGCCCGATAG"
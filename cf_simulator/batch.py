@@ -0,0 +1,140 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# pydna/Biopython are imported by a worker's first digest or Golden Gate step and reused
+# for every task it runs after that
+from .construction_file_simulator import simulate, SimulationContext
+from .rope import flatten
+from .parse_CF_JSON import parse_CF_JSON, construction_file_from_dict
+from .parse_CF_shorthand import parse_CF_shorthand
+
+DEFAULT_CHUNK_SIZE = 16
+
+# One simulated construction file. products holds only what the file defined or produced;
+# error is None on success, otherwise "<ExceptionType>: <message>" and the other values are None.
+SimulationRecord = namedtuple('SimulationRecord', ['index', 'source', 'products', 'time', 'cost', 'error'])
+
+
+def load_construction_file(path):
+    """
+    Parses a construction file from disk: JSON for .json files, shorthand otherwise.
+    """
+    with open(path) as handle:
+        if path.endswith('.json'):
+            return parse_CF_JSON(handle.read())
+        return parse_CF_shorthand(handle)
+
+
+def parse_construction_file(source):
+    """
+    Parses a construction file sent as text or decoded JSON: a dict is a decoded JSON construction
+    file, text starting with '{' is JSON and anything else is shorthand.
+    """
+    if isinstance(source, dict):
+        return construction_file_from_dict(source)
+    if source.lstrip().startswith('{'):
+        return parse_CF_JSON(source)
+    return parse_CF_shorthand(source)
+
+
+def _simulate_one(index, item, library=None):
+    """
+    Simulates one ConstructionFile (or path to one), turning any failure into an error record.
+    library is the part library of the session (symbol_to_gene by default).
+    """
+    source = item if isinstance(item, str) else None
+    try:
+        construction_file = load_construction_file(item) if source is not None else item
+        with SimulationContext(library=library) as context:
+            _, time, cost = simulate(construction_file, context=context)
+            products = {name: flatten(sequence) for name, sequence in context.products.items()}
+    except Exception as e:
+        return SimulationRecord(index, source, None, None, None, f"{type(e).__name__}: {e}")
+    return SimulationRecord(index, source, products, time, cost, None)
+
+
+def _simulate_source(index, source, library=None):
+    """
+    Parses (see parse_construction_file) and simulates one construction file sent as text or
+    decoded JSON, turning any failure into an error record.
+    """
+    try:
+        construction_file = parse_construction_file(source)
+    except Exception as e:
+        return SimulationRecord(index, None, None, None, None, f"{type(e).__name__}: {e}")
+    return _simulate_one(index, construction_file, library)
+
+
+def _simulate_chunk(chunk):
+    return [_simulate_one(index, item) for index, item in chunk]
+
+
+def simulate_many(files, workers=None, chunksize=DEFAULT_CHUNK_SIZE, ordered=True):
+    """
+    Simulates many construction files on a process pool, yielding a SimulationRecord for each.
+
+    files may be ConstructionFile objects or paths to shorthand/JSON files (parsed in the workers)
+    and may be a lazy iterable. Files are sent to workers (os.cpu_count() by default) in chunks of
+    chunksize, with at most two chunks per worker in flight so memory stays bounded. Records are
+    yielded in input order, or as soon as each chunk completes when ordered is False. A file that
+    fails to parse or simulate yields a record with its error instead of stopping the batch.
+    With workers=1 everything runs in this process.
+    """
+    items = enumerate(files)
+    chunks = iter(lambda: list(itertools.islice(items, chunksize)), [])
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            yield from _simulate_chunk(chunk)
+        return
+
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_simulate_chunk, chunk))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            pending = set()
+            for chunk in chunks:
+                pending.add(executor.submit(_simulate_chunk, chunk))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+
+
+def main(argv=None):
+    """
+    Command line entry point: simulates the given files and writes one JSON record per line.
+    Returns 1 if any file failed, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Simulate construction files in parallel.")
+    parser.add_argument('files', nargs='+', help="shorthand or .json construction files")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNK_SIZE, help="files sent to a worker at a time")
+    parser.add_argument('--unordered', action='store_true', help="write records as they complete")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for record in simulate_many(args.files, args.workers, args.chunksize, not args.unordered):
+        failed = failed or record.error is not None
+        sys.stdout.write(json.dumps(record._asdict()) + '\n')
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
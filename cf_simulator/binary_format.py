@@ -0,0 +1,418 @@
+"""
+Versioned binary format for ConstructionFiles, Polynucleotides and simulation results.
+
+A file is a header (MAGIC, FORMAT_VERSION and a kind byte), a table of the distinct strings
+(names, enzymes, strains, overhangs), a table of the distinct sequences and the body. Sequences
+are packed 2 bits per base when they are pure ACGT, 4 bits per base when they use IUPAC codes
+and stored as UTF-8 otherwise; each one is stored once however often it is referenced. Steps
+are an operation code followed by their fields in constructor order, with integers as varints.
+Tables are filled in first-use order, so the same object always encodes to the same bytes.
+"""
+import itertools
+import struct
+from collections import namedtuple
+
+import numpy
+
+from .construction_file import ConstructionFile, PCR, Digest, Ligate, GoldenGate, Gibson, Transform
+from .polynucleotide import Polynucleotide, _set_sequence
+from .rope import flatten
+
+MAGIC = b'CFBN'
+FORMAT_VERSION = 1
+
+KIND_CONSTRUCTION_FILE = 1
+KIND_POLYNUCLEOTIDE = 2
+KIND_SIMULATION_RESULT = 3
+KIND_STEP_RESULT = 4
+
+# The products (name -> sequence) defined or made by a simulation, with its time and cost.
+# SimulationResult(dict(context.products), time, cost) after simulate(..., context=context).
+SimulationResult = namedtuple('SimulationResult', ['products', 'time', 'cost'])
+
+# Operation code -> (step class, (field, type) in constructor order)
+_STEPS = [
+    (PCR, (('forward_oligo', 'dna'), ('reverse_oligo', 'dna'), ('template', 'dna'), ('output', 'str'),
+           ('product_size', 'value'))),
+    (Digest, (('dna', 'dna'), ('enzymes', 'strs'), ('fragSelect', 'value'), ('output', 'str'),
+              ('product_size', 'value'))),
+    (Ligate, (('dnas', 'dnas'), ('output', 'str'))),
+    (GoldenGate, (('dnas', 'dnas'), ('enzyme', 'str'), ('output', 'str'))),
+    (Gibson, (('dnas', 'dnas'), ('output', 'str'))),
+    (Transform, (('dna', 'dna'), ('strain', 'str'), ('antibiotics', 'strs'), ('output', 'str'),
+                 ('temperature', 'value'))),
+]
+_STEP_CODES = {step_class.__name__: code for code, (step_class, _) in enumerate(_STEPS)}
+
+# Sequence encodings
+_TWO_BIT, _FOUR_BIT, _TEXT = 0, 1, 2
+_TWO_BIT_BASES = 'ACGT'
+_FOUR_BIT_BASES = '=ACMGRSVTWYHKDBN'  # as in BAM
+_NOT_A_BASE = 0xFF
+
+
+def _code_table(bases):
+    # Byte -> code for bytes.translate, with every byte outside bases mapped to _NOT_A_BASE
+    table = bytearray([_NOT_A_BASE]) * 256
+    for code, base in enumerate(bases.encode()):
+        table[base] = code
+    return bytes(table)
+
+
+_TWO_BIT_CODES = _code_table(_TWO_BIT_BASES)
+_FOUR_BIT_CODES = _code_table(_FOUR_BIT_BASES)
+# Packed byte -> the bases it holds, as one little-endian word (first base lowest) for numpy.take
+_UNPACK_TWO_BIT = numpy.frombuffer(b''.join(''.join(bases).encode() for bases in itertools.product(
+    _TWO_BIT_BASES, repeat=4)), dtype='<u4')
+_UNPACK_FOUR_BIT = numpy.frombuffer(b''.join(''.join(bases).encode() for bases in itertools.product(
+    _FOUR_BIT_BASES, repeat=2)), dtype='<u2')
+
+# Tagged scalar values (sizes, fragment indices, temperatures, costs and times)
+_NONE, _INT, _FLOAT, _STR, _FALSE, _TRUE = range(6)
+_DOUBLE = struct.Struct('<d')
+
+
+def dumps(obj):
+    """
+    Encodes a ConstructionFile, Polynucleotide or SimulationResult to bytes.
+    """
+    writer = _Writer()
+    if isinstance(obj, ConstructionFile):
+        kind = KIND_CONSTRUCTION_FILE
+        writer.construction_file(obj)
+    elif isinstance(obj, Polynucleotide):
+        kind = KIND_POLYNUCLEOTIDE
+        writer.polynucleotide(obj)
+    elif isinstance(obj, SimulationResult):
+        kind = KIND_SIMULATION_RESULT
+        writer.simulation_result(obj)
+    else:
+        raise TypeError(f"Cannot encode {type(obj).__name__}.")
+    return writer.finish(kind)
+
+
+def loads(data):
+    """
+    Decodes bytes written by dumps (or encode_step_result).
+    """
+    reader = _Reader(data)
+    if reader.kind == KIND_CONSTRUCTION_FILE:
+        return reader.construction_file()
+    if reader.kind == KIND_POLYNUCLEOTIDE:
+        return reader.polynucleotide()
+    if reader.kind == KIND_SIMULATION_RESULT:
+        return reader.simulation_result()
+    if reader.kind == KIND_STEP_RESULT:
+        return reader.step_result()
+    raise ValueError(f"Unknown binary object kind {reader.kind}.")
+
+
+def dump(obj, handle):
+    handle.write(dumps(obj))
+
+
+def load(handle):
+    return loads(handle.read())
+
+
+def encode_step_result(result):
+    """
+    Encodes a (product, cost, time) step result; the product is a Polynucleotide or, for
+    Transform, a str.
+    """
+    writer = _Writer()
+    writer.step_result(result)
+    return writer.finish(KIND_STEP_RESULT)
+
+
+def decode_step_result(data):
+    reader = _Reader(data)
+    if reader.kind != KIND_STEP_RESULT:
+        raise ValueError("Data does not hold a step result.")
+    return reader.step_result()
+
+
+class _Writer:
+    def __init__(self):
+        self.body = bytearray()
+        self.strings = {}
+        self.sequences = {}
+
+    def finish(self, kind):
+        out = bytearray(MAGIC)
+        out += bytes((FORMAT_VERSION, kind))
+        _write_varint(out, len(self.strings))
+        for string in self.strings:
+            encoded = string.encode()
+            _write_varint(out, len(encoded))
+            out += encoded
+        _write_varint(out, len(self.sequences))
+        for sequence in self.sequences:
+            _write_sequence(out, sequence)
+        out += self.body
+        return bytes(out)
+
+    def varint(self, value):
+        _write_varint(self.body, value)
+
+    def string(self, value):
+        # 0 is None, otherwise the string's table index + 1
+        if value is None:
+            self.varint(0)
+        else:
+            self.varint(self.strings.setdefault(value, len(self.strings)) + 1)
+
+    def strings_list(self, values):
+        self.varint(len(values))
+        for value in values:
+            self.string(value)
+
+    def sequence(self, value):
+        self.varint(self.sequences.setdefault(flatten(value), len(self.sequences)))
+
+    def dna(self, value):
+        # Gene inputs are either a symbol (string table) or an upper-case sequence (sequence table)
+        if value.isupper():
+            self.varint(self.sequences.setdefault(value, len(self.sequences)) << 1 | 1)
+        else:
+            self.varint(self.strings.setdefault(value, len(self.strings)) << 1)
+
+    def value(self, value):
+        body = self.body
+        if value is None:
+            body.append(_NONE)
+        elif value is True or value is False:
+            body.append(_TRUE if value else _FALSE)
+        elif isinstance(value, int):
+            body.append(_INT)
+            _write_varint(body, value << 1 if value >= 0 else (-value << 1) - 1)
+        elif isinstance(value, float):
+            body.append(_FLOAT)
+            body += _DOUBLE.pack(value)
+        elif isinstance(value, str):
+            body.append(_STR)
+            self.string(value)
+        else:
+            raise TypeError(f"Cannot encode value {value!r}.")
+
+    def polynucleotide(self, poly):
+        self.sequence(poly.sequence)
+        self.string(poly.ext5)
+        self.string(poly.ext3)
+        self.body.append(bool(poly.is_double_stranded) | bool(poly.is_circular) << 1)
+        self.string(poly.mod_ext5)
+        self.string(poly.mod_ext3)
+
+    def step(self, step):
+        code = _STEP_CODES.get(type(step).__name__)
+        if code is None:
+            raise TypeError(f"Cannot encode step {type(step).__name__}.")
+        self.body.append(code)
+        for field, kind in _STEPS[code][1]:
+            value = getattr(step, field)
+            if kind == 'dna':
+                self.dna(value)
+            elif kind == 'dnas':
+                self.varint(len(value))
+                for item in value:
+                    self.dna(item)
+            elif kind == 'str':
+                self.string(value)
+            elif kind == 'strs':
+                self.strings_list(value)
+            else:
+                self.value(value)
+
+    def construction_file(self, construction_file):
+        self.varint(len(construction_file.sequences))
+        for name, poly in construction_file.sequences.items():
+            self.string(name)
+            self.polynucleotide(poly)
+        self.varint(len(construction_file.steps))
+        for step in construction_file.steps:
+            self.step(step)
+
+    def simulation_result(self, result):
+        self.varint(len(result.products))
+        for name, sequence in result.products.items():
+            self.string(name)
+            self.sequence(sequence)
+        self.value(result.time)
+        self.value(result.cost)
+
+    def step_result(self, result):
+        product, cost, time = result
+        if isinstance(product, Polynucleotide):
+            self.body.append(1)
+            self.polynucleotide(product)
+        else:
+            self.body.append(0)
+            self.string(product)
+        self.value(cost)
+        self.value(time)
+
+
+class _Reader:
+    def __init__(self, data):
+        view = memoryview(data)
+        if bytes(view[:4]) != MAGIC:
+            raise ValueError("Not a construction file binary (bad magic).")
+        if view[4] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary format version {view[4]}; this reader handles {FORMAT_VERSION}.")
+        self.kind = view[5]
+        self.view = view
+        self.position = 6
+        self.strings = [str(self.take(self.varint()), 'utf-8') for _ in range(self.varint())]
+        # Sequences are located now and unpacked on first use, each only once
+        self._sequence_spans = [self._locate_sequence() for _ in range(self.varint())]
+        self._sequences = [None] * len(self._sequence_spans)
+
+    def take(self, size):
+        start = self.position
+        self.position += size
+        return self.view[start:self.position]
+
+    def byte(self):
+        self.position += 1
+        return self.view[self.position - 1]
+
+    def varint(self):
+        view = self.view
+        result = shift = 0
+        while True:
+            byte = view[self.position]
+            self.position += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def _locate_sequence(self):
+        encoding = self.byte()
+        length = self.varint()
+        size = (length + 3) // 4 if encoding == _TWO_BIT else (length + 1) // 2 if encoding == _FOUR_BIT else length
+        return encoding, length, self.take(size)
+
+    def sequence_at(self, index):
+        sequence = self._sequences[index]
+        if sequence is None:
+            encoding, length, data = self._sequence_spans[index]
+            if encoding == _TWO_BIT or encoding == _FOUR_BIT:
+                table = _UNPACK_TWO_BIT if encoding == _TWO_BIT else _UNPACK_FOUR_BIT
+                bases = numpy.take(table, numpy.frombuffer(data, dtype=numpy.uint8))
+                sequence = str(memoryview(bases).cast('B')[:length], 'ascii')
+            else:
+                sequence = str(data, 'utf-8')
+            self._sequences[index] = sequence
+        return sequence
+
+    def string(self):
+        index = self.varint()
+        return None if index == 0 else self.strings[index - 1]
+
+    def sequence(self):
+        return self.sequence_at(self.varint())
+
+    def dna(self):
+        reference = self.varint()
+        if reference & 1:
+            return self.sequence_at(reference >> 1)
+        return self.strings[reference >> 1]
+
+    def value(self):
+        tag = self.byte()
+        if tag == _NONE:
+            return None
+        if tag == _INT:
+            encoded = self.varint()
+            return encoded >> 1 if not encoded & 1 else -((encoded + 1) >> 1)
+        if tag == _FLOAT:
+            return _DOUBLE.unpack(self.take(8))[0]
+        if tag == _STR:
+            return self.string()
+        return tag == _TRUE
+
+    def polynucleotide(self):
+        index = self.varint()
+        ext5 = self.string()
+        ext3 = self.string()
+        flags = self.byte()
+        poly = Polynucleotide('', ext5, ext3, bool(flags & 1), bool(flags & 2), self.string(), self.string())
+        # Packed sequences are upper case by construction, so only text ones go through the case check
+        if self._sequence_spans[index][0] == _TEXT:
+            poly.sequence = self.sequence_at(index)
+        else:
+            _set_sequence(poly, self.sequence_at(index))
+        return poly
+
+    def step(self):
+        step_class, fields = _STEPS[self.byte()]
+        arguments = []
+        for _, kind in fields:
+            if kind == 'dna':
+                arguments.append(self.dna())
+            elif kind == 'dnas':
+                arguments.append([self.dna() for _ in range(self.varint())])
+            elif kind == 'str':
+                arguments.append(self.string())
+            elif kind == 'strs':
+                arguments.append([self.string() for _ in range(self.varint())])
+            else:
+                arguments.append(self.value())
+        return step_class(*arguments)
+
+    def construction_file(self):
+        sequences = {}
+        for _ in range(self.varint()):
+            name = self.string()
+            sequences[name] = self.polynucleotide()
+        steps = [self.step() for _ in range(self.varint())]
+        return ConstructionFile(steps, sequences)
+
+    def simulation_result(self):
+        products = {}
+        for _ in range(self.varint()):
+            name = self.string()
+            products[name] = self.sequence()
+        return SimulationResult(products, self.value(), self.value())
+
+    def step_result(self):
+        if self.byte():
+            product = self.polynucleotide()
+        else:
+            product = self.string()
+        return product, self.value(), self.value()
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_sequence(out, sequence):
+    data = sequence.encode()
+    codes = data.translate(_TWO_BIT_CODES)
+    if _NOT_A_BASE not in codes:
+        encoding, width = _TWO_BIT, 4
+    else:
+        codes = data.translate(_FOUR_BIT_CODES)
+        if _NOT_A_BASE in codes:
+            out.append(_TEXT)
+            _write_varint(out, len(data))
+            out += data
+            return
+        encoding, width = _FOUR_BIT, 2
+    out.append(encoding)
+    _write_varint(out, len(sequence))
+    # Padded with code 0 (A or =) to whole bytes, each byte's codes read as one little-endian
+    # word (first base lowest) and shifted into place, first base highest; astype keeps the low byte
+    codes += bytes(-len(codes) % width)
+    if encoding == _TWO_BIT:
+        words = numpy.frombuffer(codes, dtype='<u4')
+        packed = (words << 6) | (words >> 4) | (words >> 14) | (words >> 24)
+    else:
+        words = numpy.frombuffer(codes, dtype='<u2')
+        packed = (words << 4) | (words >> 8)
+    out += packed.astype(numpy.uint8).tobytes()
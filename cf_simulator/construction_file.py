@@ -53,3 +53,6 @@ class ConstructionFile:
     def __init__(self, steps, sequences):
         self.steps = steps
         self.sequences = sequences
+
+    def __iter__(self):
+        return iter(self.steps)
@@ -1,18 +1,25 @@
-from .polynucleotide import Polynucleotide, dsDNA
-from pydna.dseqrecord import Dseqrecord
-from pydna.dseq import Dseq
-from Bio.Restriction import RestrictionBatch, AllEnzymes
-from pydna.utils import rc
-from Bio.Restriction import Restriction
+from .polynucleotide import Polynucleotide, dsDNA, plasmid
+import logging
 import math
-from construction_file import Step, ConstructionFile
+from collections import ChainMap
+from functools import partial
+from .construction_file import Step, ConstructionFile
+from .enzyme_table import is_known_enzyme, load_restriction
+from .restriction_index import site_index
+from .gibson import assemble_gibson
+from .goldengate import assemble_goldengate
+from .pcr import find_amplicons, is_off_target
+from .rope import Rope
+from . import tracing
+
+logger = logging.getLogger(__name__)
 
 def get_restriction_enzyme(enzyme_name):
     """
-    Retrieve a restriction enzyme by name.
+    Retrieve a restriction enzyme by name. Biopython's enzymes are imported on first use.
     """
-    if enzyme_name in AllEnzymes:
-        return Restriction.__dict__.get(enzyme_name, None)
+    if is_known_enzyme(enzyme_name):
+        return load_restriction().__dict__.get(enzyme_name, None)
     else:
         raise ValueError(f"Enzyme '{enzyme_name}' is not recognized.")
 
@@ -37,42 +44,122 @@ reagent_to_price = {
     'Competent Cells': 50
 }
 
+class SimulationContext:
+    """
+    Namespace and price table for one simulation session.
+
+    Products are written to a private layer over the shared library (symbol_to_gene and
+    reagent_to_price by default), which is never modified, so concurrent sessions cannot see
+    each other's products and everything a session adds is freed with it. circular maps the
+    names whose sequence is circular (plasmid inputs and circular products) to True; any other
+    name, and every literal sequence, is linear.
+    """
+
+    def __init__(self, library=None, prices=None, circular=None):
+        self.symbol_to_gene = ChainMap({}, symbol_to_gene if library is None else library)
+        self.reagent_to_price = ChainMap({}, reagent_to_price if prices is None else prices)
+        self.circular = ChainMap({}, {} if circular is None else circular)
+
+    @property
+    def products(self):
+        """
+        The sequences added during this session.
+        """
+        return self.symbol_to_gene.maps[0]
+
+    def close(self):
+        self.symbol_to_gene.maps[0].clear()
+        self.reagent_to_price.maps[0].clear()
+        self.circular.maps[0].clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _namespaces(context):
+    """
+    Returns the (genes, prices) mappings a perform_* call reads: the context's own layers,
+    or the module-level tables when called without a context.
+    """
+    if context is None:
+        return symbol_to_gene, reagent_to_price
+    return context.symbol_to_gene, context.reagent_to_price
+
+
+def is_circular_input(gene_input, context):
+    """
+    Whether a gene input names a circular sequence in the session. Literal sequences, and every
+    input when called without a context, are linear.
+    """
+    return context is not None and context.circular.get(gene_input, False)
+
+
 def round_to_nearest_15(minutes):
     return math.ceil(minutes / 15) * 15
 
-def simulate(constructionFile: ConstructionFile): 
+def simulate(constructionFile: ConstructionFile, cache=None, context=None, profile=None, lazy=False):
+    """
+    Simulate every step of a construction file, returning the products with the total time and cost.
+    Each call runs in its own SimulationContext unless one is given, so simulations never share products.
+    If a StepCache is given, steps that were simulated before with the same inputs are reused.
+    If a SimulationProfile is given, the compute time and memory of every step are recorded in it.
+    Products of Ligate, Gibson and unprimed PCR steps are Ropes sharing their inputs while the
+    construction file runs, and are flattened to str when it returns; with lazy=True they are
+    returned as Ropes (str() flattens one), so long assembly chains are never copied.
+    """
+    if context is None:
+        context = SimulationContext()
+    genes = context.symbol_to_gene
+    resolve = lambda gene_input: resolve_gene_input(gene_input, genes)
     time = 0
     cost = 0
-    products = {}
+    for name, sequence in constructionFile.sequences.items():
+        genes[name] = sequence.lazy_sequence
+        context.circular[name] = sequence.is_circular
     for step in constructionFile:
-        if step.operation == 'Digest':
-            result = perform_digest(step)
-        elif step.operation == 'PCR':
-            result = perform_pcr(step)
-        elif step.operation == 'Ligate':
-            result = perform_ligate(step)
-        elif step.operation == 'GoldenGate':
-            result = perform_goldengate(step)
-        elif step.operation == 'Gibson':
-            result = perform_gibson(step)
-        elif step.operation == 'Transform':
-            result = perform_transform(step)
+        perform = OPERATIONS.get(step.operation)
+        if perform is None:
+            raise ValueError(f"Unrecognized operation: {step.operation}")
+        if cache is None:
+            run = lambda step: perform(step, context)
+        else:
+            run = lambda step: cache.run(step, lambda step: perform(step, context), resolve, context.reagent_to_price,
+                                             context.circular)
+        if tracing.enabled():
+            run = partial(tracing.traced, run=run, resolve=resolve)
+        result = profile.measure(step, run, resolve, context.circular) if profile is not None else run(step)
+        logger.debug("%s %s: cost %s, time %s", step.operation, step.output, result[1], result[2])
         time += result[2]
         cost +=result[1]
         if step.operation != 'Transform':
-            symbol_to_gene[step.output] = result.sequence
-            products[step.output] = result.sequence
-    return symbol_to_gene, time, cost
-
-def resolve_gene_input(gene_input, dictionary):
+            # Products stay lazy (a Rope sharing the inputs) until they are read
+            genes[step.output] = result[0].lazy_sequence
+            context.circular[step.output] = result[0].is_circular
+    if not lazy:
+        products = context.products
+        for name, sequence in products.items():
+            if isinstance(sequence, Rope):
+                products[name] = str(sequence)
+    return genes, time, cost
+
+def resolve_gene_input(gene_input, dictionary, lazy=False):
     """
     Resolves a gene input into its full sequence.
     If the input is a gene symbol (lowercase), it looks up the sequence in the dictionary.
     If the input is a sequence (uppercase), it returns it as-is.
+    Lazy entries (such as the SequenceViews of a SequenceStore) are read into a str here,
+    so only the sequences and regions a step uses are loaded. With lazy=True, Ropes are
+    returned without flattening them.
     """
     if gene_input.islower():
         if gene_input in dictionary:
-            return dictionary[gene_input]
+            sequence = dictionary[gene_input]
+            if isinstance(sequence, str) or (lazy and isinstance(sequence, Rope)):
+                return sequence
+            return str(sequence)
         else:
             raise ValueError(f"Gene symbol '{gene_input}' not found in symbol_to_gene dictionary.")
     elif gene_input.isupper():
@@ -81,17 +168,28 @@ def resolve_gene_input(gene_input, dictionary):
         raise ValueError(f"Invalid gene input '{gene_input}'. It must be either uppercase (sequence) or lowercase (symbol).")
 
 
-def perform_pcr(pcr_step):
+def perform_pcr(pcr_step, context=None):
     """
     Perform a PCR operation with cost and time predictions.
     """
-    forward_primer = resolve_gene_input(pcr_step.forward_oligo, symbol_to_gene)
-    reverse_primer = resolve_gene_input(pcr_step.reverse_oligo, symbol_to_gene)
-    template = resolve_gene_input(pcr_step.template, symbol_to_gene)
+    genes, prices = _namespaces(context)
+    forward_primer = resolve_gene_input(pcr_step.forward_oligo, genes)
+    reverse_primer = resolve_gene_input(pcr_step.reverse_oligo, genes)
+    template = resolve_gene_input(pcr_step.template, genes)
     output = pcr_step.output
 
-    # Simulate PCR product creation
-    product_sequence = forward_primer + template + reverse_primer
+    # Anneal both primers to the template (across the origin of a plasmid); the first amplicon
+    # is the forward/reverse product
+    amplicons = find_amplicons(forward_primer, reverse_primer, template,
+                               circular=is_circular_input(pcr_step.template, context))
+    if amplicons and not is_off_target(amplicons[0]):
+        product_sequence = amplicons[0].sequence
+        if len(amplicons) > 1:
+            logger.warning("PCR %s has %d off-target amplicons", output, len(amplicons) - 1)
+    else:
+        # Primers that do not anneal are joined to the template as before
+        logger.warning("Primers of PCR %s do not anneal to the template; joining them to it", output)
+        product_sequence = Rope((forward_primer, template, reverse_primer))
     product = Polynucleotide(
         product_sequence,
         ext5="",
@@ -103,7 +201,7 @@ def perform_pcr(pcr_step):
     )
 
     # Predict cost
-    cost = reagent_to_price['Taq Polymerase'] + reagent_to_price['dNTPs']
+    cost = prices['Taq Polymerase'] + prices['dNTPs']
 
     # Predict time based on template length
     template_length = len(template)
@@ -112,27 +210,23 @@ def perform_pcr(pcr_step):
     return product, cost, time
 
 
-from Bio.Restriction import RestrictionBatch, AllEnzymes
-
-def perform_digest(digest_step):
+def perform_digest(digest_step, context=None):
     """
     Perform a Digest operation with cost and time predictions.
     """
-    dna_sequence = resolve_gene_input(digest_step.dna, symbol_to_gene)
+    genes, prices = _namespaces(context)
+    dna_sequence = resolve_gene_input(digest_step.dna, genes)
     enzymes = digest_step.enzymes
     frag_select = digest_step.fragSelect
     output = digest_step.output
 
-    # Convert DNA to Dseqrecord
-    dna_dseq = Dseqrecord(Dseq(dna_sequence))
-
-    # Create enzyme batch and perform digestion
-    enzyme_batch = RestrictionBatch([enz for enz in enzymes if enz in AllEnzymes])
-    fragments = dna_dseq.cut(enzyme_batch)
+    # Look up the cut sites in the (cached) site index for this sequence
+    index = site_index(dna_sequence)
+    cutsite_pairs = index.cutsite_pairs([enz for enz in enzymes if is_known_enzyme(enz)])
 
-    # Select fragment
-    if 0 <= frag_select < len(fragments):
-        selected_fragment = fragments[frag_select]
+    # Select fragment, building only the one that is needed
+    if 0 <= frag_select < len(cutsite_pairs):
+        selected_fragment = index.record.apply_cut(*cutsite_pairs[frag_select])
         product = Polynucleotide(
             str(selected_fragment.seq.watson),
             ext5="",
@@ -146,7 +240,7 @@ def perform_digest(digest_step):
         raise ValueError("Fragment selection index out of range.")
 
     # Predict cost
-    cost = sum(reagent_to_price[enzyme] for enzyme in enzymes)
+    cost = sum(prices[enzyme] for enzyme in enzymes)
 
     # Predict time based on DNA length and number of enzymes
     dna_length = len(dna_sequence)
@@ -155,27 +249,32 @@ def perform_digest(digest_step):
     return product, cost, time
 
 
-def perform_gibson(gibson_step):
+def perform_gibson(gibson_step, context=None):
     """
     Perform a Gibson assembly operation with cost and time predictions.
     """
-    fragments = [resolve_gene_input(fragment, symbol_to_gene) for fragment in gibson_step.dnas]
+    genes, prices = _namespaces(context)
+    fragments = [resolve_gene_input(fragment, genes, lazy=True) for fragment in gibson_step.dnas]
     output = gibson_step.output
 
-    # Simulate Gibson Assembly
-    gibson_product = ''.join(fragments)
+    # Simulate Gibson Assembly: join the fragments by their terminal overlaps
+    assembly = assemble_gibson(fragments)
+    for left, right in assembly.missing:
+        logger.warning("Gibson %s: no overlap between fragments %d and %d, joining them directly", output, left, right)
+    for index, candidates in assembly.ambiguous.items():
+        logger.warning("Gibson %s: fragment %d can anneal to fragments %s", output, index, [right for right, _ in candidates])
     product = Polynucleotide(
-        gibson_product,
+        assembly.sequence,
         ext5="",
         ext3="",
         is_double_stranded=True,
-        is_circular=False,
+        is_circular=assembly.circular,
         mod_ext5="hydroxyl",
         mod_ext3="hydroxyl"
     )
 
     # Predict cost
-    cost = reagent_to_price['Gibson Assembly Mix']
+    cost = prices['Gibson Assembly Mix']
 
     # Predict time based on total length of fragments
     total_length = sum(len(frag) for frag in fragments)
@@ -184,41 +283,74 @@ def perform_gibson(gibson_step):
     return product, cost, time
 
 
-def perform_goldengate(gg_step):
+def perform_goldengate(gg_step, context=None):
     """
     Perform a Golden Gate operation with cost and time predictions.
     """
+    genes, prices = _namespaces(context)
     # Resolve the fragments
-    fragments = [resolve_gene_input(fragment, symbol_to_gene) for fragment in gg_step.dnas]
+    fragments = [resolve_gene_input(fragment, genes) for fragment in gg_step.dnas]
     enzyme_name = gg_step.enzyme
     output = gg_step.output
 
-    # Convert DNA sequences to Dseqrecords
-    dna_dseqs = [Dseqrecord(Dseq(dsDNA(seq).sequence)) for seq in fragments]
+    # Plasmid inputs (a backbone, say) are digested as circles, wherever their origin is
+    parts = [plasmid(seq) if is_circular_input(fragment, context) else dsDNA(seq)
+             for fragment, seq in zip(gg_step.dnas, fragments)]
+
+    # Site indexes for each fragment, reused across steps that digest the same sequence
+    indexes = [site_index(part.sequence, part.is_circular) for part in parts]
 
     # Restriction enzyme
     enzyme = get_restriction_enzyme(enzyme_name)
     if enzyme is None:
         raise ValueError(f"Enzyme '{enzyme_name}' not found.")
 
-    print(f"Using enzyme: {enzyme_name}")
+    logger.debug("Using enzyme: %s", enzyme_name)
+
+    # Predict cost
+    cost = prices[enzyme_name] + prices['DNA Ligase']
+
+    # Predict time (Golden Gate typically takes around 30 minutes)
+    time = round_to_nearest_15(30)  # Golden Gate time is fairly consistent, typically 30 minutes
 
-    # Simulate digestion
+    # Ligate the digested pieces by their overhangs; the largest circular product is the construct
+    result = assemble_goldengate(parts, enzyme)
+    if result.assemblies:
+        assembly = max(result.assemblies, key=lambda assembly: len(assembly.pieces))
+        if len(result.assemblies) > 1:
+            logger.warning("Golden Gate with %s gives %d assemblies; using one of %d parts",
+                           enzyme_name, len(result.assemblies), len(assembly.pieces))
+        for overhang, ends in result.collisions.items():
+            logger.warning("Overhang %s is shared by %s", overhang, ends)
+        product = Polynucleotide(
+            assembly.sequence,
+            ext5="",
+            ext3="",
+            is_double_stranded=True,
+            is_circular=True,
+            mod_ext5=None,
+            mod_ext3=None
+        )
+        return product, cost, time
+
+    # No circular product: join the digested fragments end to end
+    logger.warning("No circular Golden Gate assembly of %s with %s; joining the fragments in order "
+                   "into a linear product", output, enzyme_name)
     digested_fragments = []
-    for dna in dna_dseqs:
-        # Check the fragment before digestion
-        print(f"Original fragment: {str(dna.seq.watson)}")
+    for index in indexes:
+        dna = index.record
 
         # Perform the cut (digestion)
-        digested = dna.cut(enzyme)
+        digested = index.cut([enzyme])
 
         # If no digestion occurs, just add the fragment as is
         if not digested:
-            print(f"No cut found for enzyme {enzyme_name} on fragment: {str(dna.seq.watson)}")
+            logger.debug("No cut found for enzyme %s on %d bp fragment", enzyme_name, len(index.sequence))
             digested_fragments.append(dna)
         else:
-            # Check the digested fragments
-            print(f"Digested fragments: {[str(fragment.seq.watson) for fragment in digested]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Digested %d bp fragment into %s bp", len(index.sequence),
+                             [len(fragment.seq.watson) for fragment in digested])
             digested_fragments.extend(digested)
 
     if not digested_fragments:
@@ -242,23 +374,18 @@ def perform_goldengate(gg_step):
         mod_ext3="phosphate"
     )
 
-    # Predict cost
-    cost = reagent_to_price[enzyme_name] + reagent_to_price['DNA Ligase']
-
-    # Predict time (Golden Gate typically takes around 30 minutes)
-    time = round_to_nearest_15(30)  # Golden Gate time is fairly consistent, typically 30 minutes
-
     return product, cost, time
 
 
 
 
 
-def perform_transform(transform_step):
+def perform_transform(transform_step, context=None):
     """
     Perform a Transformation operation with cost and time predictions.
     """
-    plasmid = resolve_gene_input(transform_step.dna, symbol_to_gene)
+    genes, prices = _namespaces(context)
+    plasmid = resolve_gene_input(transform_step.dna, genes)
     host = transform_step.strain
     antibiotics = transform_step.antibiotics
     temperature = transform_step.temperature
@@ -268,22 +395,23 @@ def perform_transform(transform_step):
     transformation_result = f"Transformation successful: {output} now carries {plasmid} in host {host} at {temperature}°C."
 
     # Predict cost
-    cost = reagent_to_price['Competent Cells'] + sum(reagent_to_price[antibiotic] for antibiotic in antibiotics)
+    cost = prices['Competent Cells'] + sum(prices[antibiotic] for antibiotic in antibiotics)
 
     # Predict time
     time = round_to_nearest_15(45)  # Assume 45 minutes for transformation
 
     return transformation_result, cost, time
 
-def perform_ligate(ligate_step):
+def perform_ligate(ligate_step, context=None):
     """
     Perform a Ligate operation with cost and time predictions.
     """
-    fragments = [resolve_gene_input(fragment, symbol_to_gene) for fragment in ligate_step.dnas]
+    genes, prices = _namespaces(context)
+    fragments = [resolve_gene_input(fragment, genes, lazy=True) for fragment in ligate_step.dnas]
     output = ligate_step.output
 
-    # Simulate ligation - concatenate sequences
-    ligated_product = ''.join(fragments)
+    # Simulate ligation - concatenate sequences, sharing rather than copying them
+    ligated_product = Rope(fragments)
     product = Polynucleotide(
         ligated_product,
         ext5="",
@@ -295,10 +423,21 @@ def perform_ligate(ligate_step):
     )
 
     # Predict cost
-    cost = reagent_to_price['DNA Ligase']
+    cost = prices['DNA Ligase']
 
     # Predict time based on total fragment length
     total_length = sum(len(fragment) for fragment in fragments)
     time = round_to_nearest_15(30 + total_length / 1000 * 10)  # Base time + 10 min per 1 kb
 
     return product, cost, time
+
+
+# Operation name -> function that performs it
+OPERATIONS = {
+    'PCR': perform_pcr,
+    'Digest': perform_digest,
+    'Ligate': perform_ligate,
+    'GoldenGate': perform_goldengate,
+    'Gibson': perform_gibson,
+    'Transform': perform_transform,
+}
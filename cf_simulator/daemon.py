@@ -0,0 +1,323 @@
+"""
+A long-lived simulation daemon on a Unix domain socket, so short CLI runs skip interpreter start-up
+and the pydna/Biopython imports.
+
+    python -m cf_simulator.daemon serve --library parts.fa &    # load once, keep warm
+    python -m cf_simulator.daemon run design1.txt design2.json  # milliseconds per file
+    python -m cf_simulator.daemon stop
+
+The daemon imports pydna and Biopython, runs a warm-up digest and opens the part library before it
+starts listening. Each client connection is served on its own thread, so several clients can share
+one daemon, and every simulation runs in its own SimulationContext. run falls back to simulating
+in-process when no daemon is listening. The socket is $CF_SIMULATOR_SOCKET, or
+cf_simulator-<uid>.sock in the temporary directory, and only its owner can connect.
+
+The protocol is one JSON object per line in each direction:
+{"method": "simulate", "construction_file": <shorthand, JSON text or object>} is answered with
+{"record": <SimulationRecord fields>}; "ping" and "shutdown" return the daemon's status.
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+from .batch import SimulationRecord, _simulate_source
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 300.0
+
+
+class DaemonUnavailable(Exception):
+    """
+    Raised when no daemon is listening on the socket.
+    """
+
+
+def default_socket_path():
+    """
+    Returns $CF_SIMULATOR_SOCKET, or a per-user socket in the temporary directory.
+    """
+    return os.environ.get('CF_SIMULATOR_SOCKET') or os.path.join(tempfile.gettempdir(), f"cf_simulator-{os.getuid()}.sock")
+
+
+def warm_up():
+    """
+    Imports pydna and Biopython and simulates a small digest, so the first request is as fast as the rest.
+    """
+    from .construction_file import ConstructionFile, Digest
+    from .construction_file_simulator import simulate
+    from .enzyme_table import load_restriction
+    load_restriction()
+    simulate(ConstructionFile([Digest("GGGAATTCGGGATCCGG", ["EcoRI", "BamHI"], 1, "warmup")], {}))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # One connection carries any number of requests, one JSON line each
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("expected a JSON object")
+                response = self.server.daemon.handle(request)
+            except ValueError as e:
+                request, response = None, {'error': f"Invalid request: {e}"}
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
+            if isinstance(request, dict) and request.get('method') == 'shutdown':
+                # Answered first: the serving process may exit as soon as shutdown() returns.
+                # shutdown() waits for serve_forever to return, so it runs on its own thread.
+                threading.Thread(target=self.server.daemon.shutdown, daemon=False).start()
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class SimulationDaemon:
+    """
+    Serves simulations on a Unix domain socket from one warm process.
+
+    library is the part library every simulation reads (for example a SequenceStore; the built-in
+    symbol_to_gene by default). start() warms up and binds the socket, serve_forever() serves until
+    shutdown(); as a context manager the daemon serves on a background thread.
+    """
+
+    def __init__(self, path=None, library=None):
+        self.path = path or default_socket_path()
+        self.library = library
+        self._server = None
+        self._thread = None
+        self._started = None
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Warms up and binds the socket. Raises RuntimeError if another daemon is listening on it;
+        a socket file left behind by a daemon that died is replaced.
+        """
+        warm_up()
+        if os.path.exists(self.path):
+            if is_running(self.path):
+                raise RuntimeError(f"A simulation daemon is already listening on {self.path}")
+            os.unlink(self.path)
+        # Created owner-only, so other users cannot connect
+        umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.path, _Handler)
+        finally:
+            os.umask(umask)
+        self._server.daemon = self
+        self._started = time.time()
+        logger.info("Simulation daemon %d listening on %s", os.getpid(), self.path)
+
+    def serve_forever(self):
+        if self._server is None:
+            self.start()
+        self._server.serve_forever()
+
+    def shutdown(self):
+        """
+        Stops serving and removes the socket.
+        """
+        with self._lock:
+            server, self._server = self._server, None
+        if server is None:
+            return
+        # Unlinked first, so new clients fall back at once and no stale socket is left if the
+        # process exits as soon as serve_forever returns
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server.shutdown()
+        server.server_close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        self._thread = threading.Thread(target=self._server.serve_forever, name='cf-simulator-daemon', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def status(self):
+        return {'pid': os.getpid(), 'path': self.path, 'requests': self._requests,
+                'uptime': time.time() - self._started}
+
+    def handle(self, request):
+        """
+        Answers one decoded request.
+        """
+        method = request.get('method', 'simulate')
+        if method == 'ping':
+            return self.status()
+        if method == 'shutdown':
+            # The handler shuts the daemon down once this answer is sent
+            return self.status()
+        if method != 'simulate':
+            return {'error': f"Unknown method: {method}"}
+        with self._lock:
+            self._requests += 1
+            index = self._requests
+        record = _simulate_source(index, request.get('construction_file'), self.library)
+        return {'record': record._asdict()}
+
+
+class DaemonClient:
+    """
+    A connection to a running daemon; raises DaemonUnavailable if none is listening.
+    """
+
+    def __init__(self, path=None, timeout=DEFAULT_TIMEOUT):
+        self.path = path or default_socket_path()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        try:
+            self._socket.connect(self.path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            self._socket.close()
+            raise DaemonUnavailable(f"No simulation daemon on {self.path}") from e
+        self._file = self._socket.makefile('rwb')
+
+    def call(self, request):
+        """
+        Sends one request and returns the daemon's decoded response.
+        """
+        self._file.write(json.dumps(request).encode() + b'\n')
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The simulation daemon closed the connection")
+        return json.loads(line)
+
+    def simulate(self, construction_file):
+        """
+        Simulates a construction file (shorthand, JSON text or a decoded JSON dict) in the daemon.
+        """
+        response = self.call({'method': 'simulate', 'construction_file': construction_file})
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return SimulationRecord(**response['record'])
+
+    def ping(self):
+        return self.call({'method': 'ping'})
+
+    def shutdown(self):
+        return self.call({'method': 'shutdown'})
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def is_running(path=None):
+    """
+    Whether a daemon is listening on the socket.
+    """
+    try:
+        DaemonClient(path, timeout=5).close()
+    except DaemonUnavailable:
+        return False
+    return True
+
+
+def simulate_sources(sources, path=None, fallback=True):
+    """
+    Yields a SimulationRecord for each construction file (shorthand, JSON text or a decoded JSON
+    dict), simulated by the daemon over one connection. Without a daemon they are simulated in this
+    process, unless fallback is False, when DaemonUnavailable is raised.
+    """
+    try:
+        client = DaemonClient(path)
+    except DaemonUnavailable:
+        if not fallback:
+            raise
+        logger.info("No simulation daemon running; simulating in-process")
+        for index, source in enumerate(sources):
+            yield _simulate_source(index, source)
+        return
+    with client:
+        for index, source in enumerate(sources):
+            yield client.simulate(source)._replace(index=index)
+
+
+def main(argv=None):
+    """
+    Command line entry point: serve, run, status or stop. run writes one JSON record per line and
+    returns 1 if any file failed.
+    """
+    parser = argparse.ArgumentParser(description="Keep construction file simulation warm in a local daemon.")
+    parser.add_argument('--socket', default=None, help="Unix socket path (default: $CF_SIMULATOR_SOCKET or a per-user temp file)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="run the daemon in the foreground")
+    serve.add_argument('--library', default=None, help="FASTA or 2bit part library to load")
+    run = commands.add_parser('run', help="simulate files with the daemon, or in-process without one")
+    run.add_argument('files', nargs='+', help="shorthand or .json construction files")
+    run.add_argument('--no-fallback', action='store_true', help="fail if no daemon is running")
+    commands.add_parser('status', help="report whether a daemon is running")
+    commands.add_parser('stop', help="stop the daemon")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        logging.basicConfig(level=logging.INFO)
+        library = None
+        if args.library:
+            from .sequence_store import SequenceStore
+            library = SequenceStore(args.library)
+        daemon = SimulationDaemon(args.socket, library)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            daemon.shutdown()
+        return 0
+
+    if args.command == 'run':
+        def sources():
+            for path in args.files:
+                with open(path) as handle:
+                    yield handle.read()
+        failed = False
+        try:
+            for path, record in zip(args.files, simulate_sources(sources(), args.socket, not args.no_fallback)):
+                record = record._replace(source=path)
+                failed = failed or record.error is not None
+                sys.stdout.write(json.dumps(record._asdict()) + '\n')
+        except DaemonUnavailable as e:
+            sys.stderr.write(f"{e}\n")
+            return 1
+        return 1 if failed else 0
+
+    try:
+        with DaemonClient(args.socket) as client:
+            status = client.shutdown() if args.command == 'stop' else client.ping()
+    except DaemonUnavailable as e:
+        sys.stderr.write(f"{e}\n")
+        return 1
+    sys.stdout.write(json.dumps(status) + '\n')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
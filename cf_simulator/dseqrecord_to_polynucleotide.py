@@ -1,56 +1,40 @@
-from pydna.dseqrecord import Dseqrecord
-from polynucleotide import Polynucleotide
-from Bio.Seq import Seq
+from typing import TYPE_CHECKING
 
+from .polynucleotide import Polynucleotide
+from .polynucleotide_to_dseqrecord import reverse_complement_overhang
 
-def dseqrecord_to_polynucleotide(dseqrecord: Dseqrecord, mod_ext5: str, mod_ext3: str) -> Polynucleotide:
+if TYPE_CHECKING:
+    from pydna.dseqrecord import Dseqrecord
+
+
+def dseqrecord_to_polynucleotide(dseqrecord: 'Dseqrecord', mod_ext5: str, mod_ext3: str) -> Polynucleotide:
     """
     Convert a Dseqrecord to a Polynucleotide.
     """
-    # Get sequence and extensions
-    watson = dseqrecord.seq.watson
-    crick = dseqrecord.seq.crick
-
-    # Determine the type of overhangs
-    lefty_overhang = dseqrecord.seq.ovhg
-    lefty = 'prime3' if lefty_overhang > 0 else 'blunt' if lefty_overhang == 0 else 'prime5'
-    print(f'lefty: {lefty}, lefty_overhang: {lefty_overhang}, dseqrecord.seq.ovhg: {dseqrecord.seq.ovhg}')
-    
-    righty_overhang = len(watson) - len(crick) + lefty_overhang
-    righty = 'prime3' if righty_overhang > 0 else 'blunt' if righty_overhang == 0 else 'prime5'
-    print(f'righty: {righty}, righty_overhang: {righty_overhang}')
-    
-    # Compute ext5 and ext3
-    if lefty == 'blunt':
-        ext_5 = ''
-    elif lefty == 'prime5':
-        ext_5 = watson[:abs(lefty_overhang)]
-    else:  # lefty == 'prime3'
-        ext_5 = str(Seq(crick[-abs(lefty_overhang):]).reverse_complement())
-    
-    if righty == 'blunt':
+    # Get the strands once; each access rebuilds them from the Dseq
+    dseq = dseqrecord.seq
+    watson = dseq.watson
+    crick = dseq.crick
+
+    # Overhangs at each end: positive where the crick strand sticks out on the left
+    # or the watson strand on the right (3' overhangs), negative for 5' overhangs
+    left_overhang = dseq.ovhg
+    right_overhang = len(watson) - len(crick) + left_overhang
+
+    # Compute ext5 and ext3, marking 3' overhangs with a hyphen
+    if left_overhang > 0:
+        ext_5 = '-' + reverse_complement_overhang(crick[-left_overhang:])
+    else:
+        ext_5 = watson[:-left_overhang]
+
+    if right_overhang > 0:
+        ext_3 = '-' + watson[-right_overhang:]
+    elif right_overhang < 0:
+        ext_3 = reverse_complement_overhang(crick[:-right_overhang])
+    else:
         ext_3 = ''
-    elif righty == 'prime5':
-        ext_3 = str(Seq(crick[:abs(righty_overhang)]).reverse_complement())
-    else:  # righty == 'prime3'
-        ext_3 = watson[-abs(righty_overhang):]
-    
-    print(f'Watson: {watson}, Calculated ext_3: {ext_3}')
-    
-    # Add hyphen if overhang is negative
-    ext_5 = '-' + ext_5 if lefty_overhang > 0 else ext_5
-    ext_3 = '-' + ext_3 if righty_overhang > 0 else ext_3
-    
-    print(f'ext_5: {ext_5}, ext_3: {ext_3}')
-    
-    # Compute sequence
-    sequence = watson
-    if lefty_overhang < 0:
-        sequence = sequence[abs(lefty_overhang):]
-    if righty_overhang > 0:
-        sequence = sequence[:len(sequence) - abs(righty_overhang)]
-    
-    print(f'sequence: {sequence}')
-    
-    # Create and return Polynucleotide
+
+    # The double-stranded part is watson without its single-stranded ends
+    sequence = watson[max(-left_overhang, 0):len(watson) - max(right_overhang, 0)]
+
     return Polynucleotide(sequence, ext_5, ext_3, True, dseqrecord.circular, mod_ext5, mod_ext3)
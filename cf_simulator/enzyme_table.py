@@ -0,0 +1,111 @@
+"""
+Recognition data for the enzymes the parsers accept, precomputed from Biopython and pickled.
+
+Importing Bio.Restriction takes a few hundred milliseconds, most of the start-up cost of a
+single small simulation. With this table, enzyme names can be checked and restriction site
+indexes built without importing Biopython. It is imported when a digest or Golden Gate step
+runs. The pickle records the Biopython version it was built from and is rebuilt in memory if
+that version changes. Regenerate it with:
+
+    python -m cf_simulator.enzyme_table
+"""
+import logging
+import os
+import pickle
+import sys
+from collections import namedtuple
+
+from .parse_CF_JSON import ALL_ENZYMES, TYPE_IIS_ENZYMES
+
+logger = logging.getLogger(__name__)
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'enzyme_table.pickle')
+TABLE_ENZYMES = list(dict.fromkeys(ALL_ENZYMES + TYPE_IIS_ENZYMES))
+
+# One enzyme as Biopython describes it: recognition site, its length, whether it reads the same
+# on both strands, and the overhang length (negative for 5' overhangs, as in Biopython).
+EnzymeRecord = namedtuple('EnzymeRecord', ['name', 'site', 'size', 'palindromic', 'ovhg'])
+
+
+def load_restriction():
+    """
+    Returns the Bio.Restriction.Restriction module, importing Biopython's enzymes on first use.
+    """
+    from Bio.Restriction import Restriction
+    return Restriction
+
+
+def build_enzyme_table(names=TABLE_ENZYMES):
+    """
+    Returns the table for the given enzyme names, read from Biopython. Names Biopython does not
+    know (the homing endonucleases) are left out. Records are stored as plain tuples, so the
+    pickle does not depend on where EnzymeRecord is defined.
+    """
+    import Bio
+    enzymes = load_restriction().__dict__
+    records = {}
+    for name in names:
+        enzyme = enzymes.get(name)
+        if enzyme is not None and hasattr(enzyme, 'site'):
+            records[name] = (name, enzyme.site.upper(), enzyme.size, enzyme.is_palindromic(), enzyme.ovhg)
+    return {'biopython': Bio.__version__, 'names': list(names), 'enzymes': records}
+
+
+def write_enzyme_table(path=TABLE_PATH):
+    """
+    Builds the table, pickles it to path and returns it.
+    """
+    table = build_enzyme_table()
+    with open(path, 'wb') as handle:
+        pickle.dump(table, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    return table
+
+
+def load_enzyme_table(path=TABLE_PATH):
+    """
+    Returns name -> EnzymeRecord from the pickled table. If the table is missing or stale (a
+    different Biopython version or enzyme list), it is rebuilt from Biopython instead.
+    """
+    import Bio
+    try:
+        with open(path, 'rb') as handle:
+            table = pickle.load(handle)
+        if table['biopython'] == Bio.__version__ and table['names'] == TABLE_ENZYMES:
+            return _records(table)
+        logger.warning("Enzyme table %s is stale; rebuilding it from Biopython %s", path, Bio.__version__)
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError) as e:
+        logger.warning("Cannot read enzyme table %s (%s); rebuilding it from Biopython", path, e)
+    return _records(build_enzyme_table())
+
+
+def _records(table):
+    return {name: EnzymeRecord(*fields) for name, fields in table['enzymes'].items()}
+
+
+ENZYMES = load_enzyme_table()
+
+
+def is_known_enzyme(name):
+    """
+    Whether Biopython knows an enzyme name, as `name in AllEnzymes` would answer. Only names
+    outside the table import Biopython.
+    """
+    if name in ENZYMES:
+        return True
+    if name in TABLE_ENZYMES:
+        return False
+    return name in load_restriction().AllEnzymes
+
+
+def main(argv=None):
+    """
+    Command line entry point: rewrites the pickled table (or the path given) from Biopython.
+    """
+    path = argv[0] if argv else TABLE_PATH
+    table = write_enzyme_table(path)
+    print(f"Wrote {len(table['enzymes'])} enzymes to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
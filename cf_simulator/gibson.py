@@ -0,0 +1,131 @@
+from collections import namedtuple
+
+from .rope import join
+
+MIN_OVERLAP = 15
+MAX_OVERLAP = 40
+
+# Bound on the order search, which is exponential only when many fragment ends are ambiguous
+MAX_ORDER_SEARCH = 100000
+
+# A junction between the 3' end of fragment left and the 5' end of fragment right (indices into
+# the input fragments); overlap is the number of shared bases, 0 when the junction is missing.
+GibsonJunction = namedtuple('GibsonJunction', ['left', 'right', 'overlap'])
+
+# Result of assemble_gibson. order lists fragment indices in assembly order and junctions the
+# joins between them (including the closing join for circular products). missing lists the
+# junctions in that order without homology; ambiguous maps a fragment index to every
+# (fragment, overlap) its 3' end could anneal to when there is more than one.
+GibsonAssembly = namedtuple('GibsonAssembly', ['sequence', 'circular', 'order', 'junctions', 'missing', 'ambiguous'])
+
+
+def find_overlaps(fragments, min_overlap=MIN_OVERLAP, max_overlap=MAX_OVERLAP):
+    """
+    Returns, for each fragment, the (fragment, overlap) pairs whose 5' end matches its 3' end
+    for between min_overlap and max_overlap bases, longest overlap first.
+
+    The first min_overlap bases of every fragment are indexed in a dict, so each fragment end is
+    matched with one lookup per overlap length instead of being compared with every other fragment.
+    """
+    seeds = {}
+    for index, fragment in enumerate(fragments):
+        if len(fragment) >= min_overlap:
+            seeds.setdefault(str(fragment[:min_overlap]), []).append(index)
+
+    overlaps = []
+    for left, fragment in enumerate(fragments):
+        found = {}
+        for length in range(min(max_overlap, len(fragment) - 1), min_overlap - 1, -1):
+            end = str(fragment[-length:])
+            for right in seeds.get(end[:min_overlap], ()):
+                # A fragment only overlaps itself when it circularizes on its own
+                if right == left and len(fragments) > 1:
+                    continue
+                if right not in found and fragments[right].startswith(end) and len(fragments[right]) > length:
+                    found[right] = length
+        overlaps.append(sorted(found.items(), key=lambda item: -item[1]))
+    return overlaps
+
+
+def assemble_gibson(fragments, order='auto', min_overlap=MIN_OVERLAP, max_overlap=MAX_OVERLAP):
+    """
+    Assembles fragments by their terminal overlaps, returning a GibsonAssembly.
+
+    With order='given' fragments are joined in input order. With order='auto' the input order is
+    kept when every junction has an overlap; otherwise the fragments are reordered so that all of
+    them are joined, preferring a circular product and keeping the first fragment first. When no
+    order joins every fragment, the input order is used and the missing junctions are reported
+    (those fragments are simply concatenated). The product is circular when the last fragment
+    overlaps the first. Fragments may be Ropes, in which case so is the product.
+    """
+    if order not in ('auto', 'given'):
+        raise ValueError(f"Invalid order '{order}'. Must be 'auto' or 'given'.")
+    fragments = [fragment.upper() for fragment in fragments]
+    if not fragments:
+        raise ValueError("Gibson assembly requires at least one fragment.")
+    overlaps = find_overlaps(fragments, min_overlap, max_overlap)
+    successors = [dict(candidates) for candidates in overlaps]
+    ambiguous = {index: candidates for index, candidates in enumerate(overlaps) if len(candidates) > 1}
+
+    path = list(range(len(fragments)))
+    if order == 'auto' and not _is_joined(path, successors):
+        path = _find_order(successors) or path
+
+    junctions = [GibsonJunction(left, right, successors[left].get(right, 0)) for left, right in zip(path, path[1:])]
+    closing = successors[path[-1]].get(path[0], 0)
+    circular = closing > 0
+    if circular:
+        junctions.append(GibsonJunction(path[-1], path[0], closing))
+
+    pieces = [fragments[path[0]]]
+    for junction in junctions[:len(path) - 1]:
+        pieces.append(fragments[junction.right][junction.overlap:])
+    sequence = join(pieces)
+    if circular:
+        sequence = sequence[:-closing]
+
+    missing = [(junction.left, junction.right) for junction in junctions if junction.overlap == 0]
+    return GibsonAssembly(sequence, circular, path, junctions, missing, ambiguous)
+
+
+def _is_joined(path, successors):
+    return all(right in successors[left] for left, right in zip(path, path[1:]))
+
+
+def _find_order(successors):
+    """
+    Returns an order joining every fragment (a circular one if possible), or None.
+    Orders start at the fragment with no incoming overlap, or at fragment 0 for circles.
+    """
+    count = len(successors)
+    has_predecessor = {right for candidates in successors for right in candidates}
+    starts = [index for index in range(count) if index not in has_predecessor]
+    if len(starts) > 1:
+        # Two fragments with free 5' ends cannot both be in one assembly
+        return None
+    start = starts[0] if starts else 0
+
+    budget = [MAX_ORDER_SEARCH]
+    linear = []
+
+    def visit(path, used):
+        budget[0] -= 1
+        if budget[0] < 0:
+            return None
+        if len(path) == count:
+            if path[0] in successors[path[-1]]:
+                return list(path)
+            if not linear:
+                linear.append(list(path))
+            return None
+        for right in successors[path[-1]]:
+            if right not in used:
+                path.append(right)
+                used.add(right)
+                found = visit(path, used)
+                if found:
+                    return found
+                used.discard(path.pop())
+        return None
+
+    return visit([start], {start}) or (linear[0] if linear else None)
@@ -0,0 +1,159 @@
+from collections import namedtuple
+
+from .dseqrecord_to_polynucleotide import dseqrecord_to_polynucleotide
+from .polynucleotide import Polynucleotide
+from .polynucleotide_to_dseqrecord import reverse_complement_overhang
+from .restriction_index import site_index, _resolve
+
+# Bound on the overhang graph walk; combinatorial libraries can have very many assemblies
+MAX_ASSEMBLY_SEARCH = 1000000
+
+# A piece of a digested part: which part it came from, its double-stranded sequence and its
+# ends in Polynucleotide notation (top-strand sense, '-' marking a 3' overhang).
+GoldenGateFragment = namedtuple('GoldenGateFragment', ['part', 'sequence', 'ext5', 'ext3'])
+
+# One product: its sequence, whether it is circular, and the (fragment index, is_forward)
+# pieces it is built from, in order.
+GoldenGateAssembly = namedtuple('GoldenGateAssembly', ['sequence', 'circular', 'pieces'])
+
+# Result of assemble_goldengate. fragments are the ligatable pieces (those without a remaining
+# recognition site); assemblies every circular product; collisions maps an overhang to the
+# fragment ends sharing it when more than one left or right end has it; palindromes lists
+# overhangs that can ligate to themselves; misligations the pairs of overhangs one mismatch
+# apart; unmatched the (fragment index, 'ext5' | 'ext3') sticky ends with no partner.
+GoldenGateResult = namedtuple('GoldenGateResult', ['fragments', 'assemblies', 'collisions', 'palindromes',
+                                                   'misligations', 'unmatched'])
+
+
+def flip_overhang(overhang):
+    """
+    Returns the overhang as seen from the other end once the fragment is reverse complemented.
+    """
+    if overhang.startswith('-'):
+        return '-' + reverse_complement_overhang(overhang[1:])
+    return reverse_complement_overhang(overhang)
+
+
+def digest_parts(parts, enzyme):
+    """
+    Digests each part once and returns the GoldenGateFragments that can ligate, i.e. the pieces
+    with sticky ends that no longer contain the recognition site. parts are sequences or
+    Polynucleotides (circular parts are digested as circles).
+    """
+    enzyme = _resolve(enzyme)
+    site = enzyme.site
+    reverse_site = reverse_complement_overhang(site)
+    fragments = []
+    for part, dna in enumerate(parts):
+        if isinstance(dna, Polynucleotide):
+            sequence, circular = dna.sequence, dna.is_circular
+        else:
+            sequence, circular = dna.upper(), False
+        for record in site_index(sequence, circular).cut([enzyme]):
+            piece = dseqrecord_to_polynucleotide(record, None, None)
+            if not piece.ext5 and not piece.ext3:
+                continue
+            full = str(record.seq.watson) + piece.ext3.lstrip('-') if piece.ext3 else str(record.seq.watson)
+            if site in full or reverse_site in full:
+                # Pieces still carrying the site are recut in a one-pot reaction
+                continue
+            fragments.append(GoldenGateFragment(part, piece.sequence, piece.ext5, piece.ext3))
+    return fragments
+
+
+def assemble_goldengate(parts, enzyme, max_assemblies=None):
+    """
+    Digests the parts and walks the overhang graph, returning a GoldenGateResult with every
+    circular assembly (up to max_assemblies).
+
+    Each fragment is used at most once per assembly, in either orientation, and each overhang
+    joins at most one junction, so interchangeable parts give one assembly per combination rather
+    than concatemers. Two ends ligate when their overhangs match (a fragment's ext3 equals the
+    next fragment's ext5). Every assembly is reported once, starting from its lowest-numbered
+    fragment in the forward orientation.
+    """
+    fragments = digest_parts(parts, enzyme)
+    # Both orientations of every fragment: (index, is_forward) -> (ext5, ext3, sequence)
+    oriented = {}
+    for index, fragment in enumerate(fragments):
+        oriented[index, True] = (fragment.ext5, fragment.ext3, fragment.sequence)
+        oriented[index, False] = (flip_overhang(fragment.ext3), flip_overhang(fragment.ext5),
+                                  reverse_complement_overhang(fragment.sequence))
+    # Overhang -> fragment orientations starting with it
+    by_left = {}
+    for piece, (ext5, _, _) in oriented.items():
+        if ext5:
+            by_left.setdefault(ext5, []).append(piece)
+
+    assemblies = []
+    budget = [MAX_ASSEMBLY_SEARCH]
+
+    def walk(path, used, joined):
+        budget[0] -= 1
+        if budget[0] < 0 or (max_assemblies is not None and len(assemblies) >= max_assemblies):
+            return
+        right = oriented[path[-1]][1]
+        junction = _canonical(right)
+        for piece in by_left.get(right, ()):
+            if piece == path[0]:
+                assemblies.append(_circular_product(path, oriented))
+            elif piece[0] > path[0][0] and piece[0] not in used and junction not in joined:
+                path.append(piece)
+                used.add(piece[0])
+                joined.add(junction)
+                walk(path, used, joined)
+                joined.discard(junction)
+                used.discard(piece[0])
+                path.pop()
+
+    for index in range(len(fragments)):
+        walk([(index, True)], {index}, {_canonical(fragments[index].ext5)})
+
+    return GoldenGateResult(fragments, assemblies, *_check_overhangs(fragments, oriented, by_left))
+
+
+def _canonical(overhang):
+    # The same junction seen from either strand
+    return min(overhang, flip_overhang(overhang))
+
+
+def _circular_product(path, oriented):
+    # Each piece contributes its double-stranded sequence followed by the overhang it shares with the next
+    sequence = ''.join(oriented[piece][2] + oriented[piece][1].lstrip('-') for piece in path)
+    return GoldenGateAssembly(sequence, True, list(path))
+
+
+def _check_overhangs(fragments, oriented, by_left):
+    """
+    Returns the collisions, palindromes, misligations and unmatched ends of a set of fragments.
+    """
+    lefts = {}
+    rights = {}
+    for index, fragment in enumerate(fragments):
+        if fragment.ext5:
+            lefts.setdefault(fragment.ext5, []).append((index, 'ext5'))
+        if fragment.ext3:
+            rights.setdefault(fragment.ext3, []).append((index, 'ext3'))
+    overhangs = sorted(set(lefts) | set(rights))
+
+    collisions = {overhang: lefts.get(overhang, []) + rights.get(overhang, []) for overhang in overhangs
+                  if len(lefts.get(overhang, [])) > 1 or len(rights.get(overhang, [])) > 1}
+    palindromes = [overhang for overhang in overhangs if flip_overhang(overhang) == overhang]
+
+    # Overhangs of the same kind and length differing at one base can still anneal
+    misligations = []
+    for i, first in enumerate(overhangs):
+        for second in overhangs[i + 1:]:
+            if len(first) == len(second) and first.startswith('-') == second.startswith('-') and \
+                    sum(a != b for a, b in zip(first, second)) == 1:
+                misligations.append((first, second))
+
+    # A right end is matched by any left end with its overhang, in either orientation, and vice versa
+    by_right = {ext3 for ext5, ext3, _ in oriented.values()}
+    unmatched = []
+    for index, fragment in enumerate(fragments):
+        if fragment.ext5 and fragment.ext5 not in by_right:
+            unmatched.append((index, 'ext5'))
+        if fragment.ext3 and fragment.ext3 not in by_left:
+            unmatched.append((index, 'ext3'))
+    return collisions, palindromes, misligations, unmatched
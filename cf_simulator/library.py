@@ -0,0 +1,163 @@
+import itertools
+from collections import namedtuple
+
+from .construction_file import ConstructionFile
+from .construction_file_simulator import OPERATIONS, SimulationContext, resolve_gene_input
+from .polynucleotide import Polynucleotide, dsDNA
+from .scheduler import build_step_graph, step_inputs
+
+# One simulated variant: the variant chosen for each slot (slot -> variant name), the product
+# of every step (output -> sequence, Transform steps excluded) and the total time and cost, as
+# simulate() would report them for the expanded construction file.
+LibraryResult = namedtuple('LibraryResult', ['choices', 'products', 'time', 'cost'])
+
+
+class Library:
+    """
+    A construction file with variable slots, expanded lazily into one variant per combination.
+
+        library = Library(construction_file, {
+            'promoter': {'J23100': 'TTGACGGCTAGC...', 'J23106': 'TTTACGGCTAGC...'},
+            'cds': ['ATGGTGAGCAAG...', 'ATGCGTAAAGGA...'],
+        })
+        for result in library.simulate():
+            ...
+
+    Each slot is a sequence name used by the steps, with its alternatives given as a dict of
+    variant name -> sequence or as a list (variant names are then the list positions). Variants
+    are produced in itertools.product order, the last slot varying fastest.
+    """
+
+    def __init__(self, construction_file, slots):
+        if not slots:
+            raise ValueError("A library needs at least one variable slot.")
+        self.construction_file = construction_file
+        self.slots = {}
+        for slot, alternatives in slots.items():
+            if not isinstance(alternatives, dict):
+                alternatives = {str(index): sequence for index, sequence in enumerate(alternatives)}
+            if not alternatives:
+                raise ValueError(f"Slot '{slot}' has no alternatives.")
+            self.slots[slot] = {name: _as_polynucleotide(sequence) for name, sequence in alternatives.items()}
+        self._dependencies = slot_dependencies(construction_file.steps, self.slots)
+
+    def __len__(self):
+        count = 1
+        for alternatives in self.slots.values():
+            count *= len(alternatives)
+        return count
+
+    def choices(self):
+        """
+        Yields every combination as a dict of slot -> variant name.
+        """
+        names = list(self.slots)
+        for combination in itertools.product(*self.slots.values()):
+            yield dict(zip(names, combination))
+
+    def variants(self):
+        """
+        Yields (choices, ConstructionFile) for every variant. The steps are shared between the
+        construction files; only the sequences differ.
+        """
+        for choices in self.choices():
+            sequences = dict(self.construction_file.sequences)
+            sequences.update((slot, self.slots[slot][name]) for slot, name in choices.items())
+            yield choices, ConstructionFile(self.construction_file.steps, sequences)
+
+    def simulate(self, cache=None):
+        """
+        Yields a LibraryResult for every variant.
+
+        Steps that read no slot are simulated once for the whole library, ahead of the others,
+        unless they redefine a slot or an earlier step depending on a slot reads or writes their
+        output; those run in order with each variant (still once, their result being shared). A
+        step reading only some of the slots is simulated once per combination of those slots and
+        reused by every variant sharing them; only steps reading every slot run once per variant.
+        A StepCache can be given to reuse results across libraries, as with simulate().
+        """
+        base = SimulationContext()
+        genes = base.symbol_to_gene
+        resolve = lambda gene_input: resolve_gene_input(gene_input, genes)
+        for name, sequence in self.construction_file.sequences.items():
+            genes[name] = sequence.sequence
+            base.circular[name] = sequence.is_circular
+
+        steps = self.construction_file.steps
+        graph = build_step_graph(steps)
+        shared = {}  # index of a slot-free step run up front -> its result
+        memos = {}  # index of a step reading some slots -> {variant names of those slots: result}
+        for index, step in enumerate(steps):
+            # Running a step early is only safe when every step it must wait for ran early too
+            if not self._dependencies[index] and graph[index].issubset(shared) and step.output not in self.slots:
+                result = _perform(step, base, resolve, cache)
+                shared[index] = result
+                if step.operation != 'Transform':
+                    genes[step.output] = result[0].sequence
+                    base.circular[step.output] = result[0].is_circular
+            elif len(self._dependencies[index]) < len(self.slots):
+                memos[index] = {}
+
+        for choices in self.choices():
+            context = SimulationContext(library=genes, prices=base.reagent_to_price, circular=base.circular)
+            variant_genes = context.symbol_to_gene
+            variant_resolve = lambda gene_input: resolve_gene_input(gene_input, variant_genes)
+            for slot, name in choices.items():
+                variant_genes[slot] = self.slots[slot][name].sequence
+                context.circular[slot] = self.slots[slot][name].is_circular
+            products = {}
+            time = 0
+            cost = 0
+            for index, step in enumerate(steps):
+                if index in shared:
+                    result = shared[index]
+                else:
+                    memo = memos.get(index)
+                    key = tuple(choices[slot] for slot in self._dependencies[index])
+                    if memo is not None and key in memo:
+                        result = memo[key]
+                    else:
+                        result = _perform(step, context, variant_resolve, cache)
+                        if memo is not None:
+                            memo[key] = result
+                    if step.operation != 'Transform':
+                        variant_genes[step.output] = result[0].sequence
+                        context.circular[step.output] = result[0].is_circular
+                time += result[2]
+                cost += result[1]
+                if step.operation != 'Transform':
+                    products[step.output] = result[0].sequence
+            yield LibraryResult(choices, products, time, cost)
+
+
+def slot_dependencies(steps, slots):
+    """
+    Returns, for each step, the slots its inputs are derived from (in slot order), following
+    products through earlier steps. A slot name that a step overwrites no longer counts as a slot.
+    """
+    order = {slot: position for position, slot in enumerate(slots)}
+    derived = {slot: {slot} for slot in slots}  # product or slot name -> slots it depends on
+    dependencies = []
+    for step in steps:
+        depends_on = set()
+        for name in step_inputs(step):
+            depends_on.update(derived.get(name, ()))
+        dependencies.append(tuple(sorted(depends_on, key=order.get)))
+        if step.operation != 'Transform':
+            derived[step.output] = depends_on
+    return dependencies
+
+
+def _perform(step, context, resolve, cache):
+    perform = OPERATIONS.get(step.operation)
+    if perform is None:
+        raise ValueError(f"Unrecognized operation: {step.operation}")
+    if cache is None:
+        return perform(step, context)
+    return cache.run(step, lambda step: perform(step, context), resolve, context.reagent_to_price, context.circular)
+
+
+def _as_polynucleotide(sequence):
+    if isinstance(sequence, Polynucleotide):
+        return sequence
+    return dsDNA(sequence)
@@ -1,8 +1,22 @@
+import io
 import json
+import re
+from collections import namedtuple
 
 from .construction_file import ConstructionFile, PCR, Digest, Ligate, GoldenGate, Gibson, Transform
 from .polynucleotide import Polynucleotide
 
+# The fastest JSON decoder installed: orjson, then msgspec, then the standard library
+try:
+    import orjson
+    _default_loads = orjson.loads
+except ImportError:
+    try:
+        import msgspec
+        _default_loads = msgspec.json.decode
+    except ImportError:
+        _default_loads = json.loads
+
 ALL_ENZYMES = ['AarI', 'ApaI', 'BamHI', 'BbsI', 'BglII', 'BsaI', 'BseRI', 'BsmBI', 'ClaI', 'EcoRI', 'EcoRV', 'HindIII', 'I-CreI', 'I-SceI', 'KpnI', 'NcoI', 'NdeI', 'NotI', 'PstI', 'SacI', 'SalI', 'SapI', 'SmaI', 'SpeI', 'XbaI', 'XhoI']
 TYPE_IIS_ENZYMES = ['AarI', 'BbsI', 'BsaI', 'BsmBI', 'SapI', 'BseRI']
 VALID_ANTIBIOTICS = {'G418', 'Hygro', 'Nat', 'Zeo'}
@@ -16,57 +30,218 @@ REQUIRED_FIELDS = {
     'Transform': {'dna', 'strain', 'antibiotics', 'output'}
 }
 
+_ENZYME_SET = frozenset(ALL_ENZYMES)
+_TYPE_IIS_SET = frozenset(TYPE_IIS_ENZYMES)
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+_loads = _default_loads
+
+
+def set_json_decoder(loads=None):
+    """
+    Sets the function parse_CF_JSON decodes documents with (str or bytes -> Python objects).
+    None restores the default: orjson or msgspec when installed, otherwise json.loads.
+    """
+    global _loads
+    _loads = _default_loads if loads is None else loads
+
+
 def parse_CF_JSON(json_string):
-    cf_dict = json.loads(json_string)
-    
+    """
+    Parses one construction file from a JSON document (str or bytes).
+    """
+    return construction_file_from_dict(_loads(json_string))
+
+
+def construction_file_from_dict(cf_dict):
+    """
+    Builds a ConstructionFile from a decoded JSON construction file, validating every step.
+    """
     # Parse sequences
     sequences = {}
     for name, seq_dict in cf_dict['sequences'].items():
         if name in sequences:
             raise ValueError(f'Duplicate sequence name {name} in the sequences.')
-        sequences[name] = Polynucleotide(seq_dict["sequence"], seq_dict["ext5"], seq_dict["ext3"], 
-                                         seq_dict["is_double_stranded"], seq_dict["is_circular"], 
+        sequences[name] = Polynucleotide(seq_dict["sequence"], seq_dict["ext5"], seq_dict["ext3"],
+                                         seq_dict["is_double_stranded"], seq_dict["is_circular"],
                                          seq_dict["mod_ext5"], seq_dict["mod_ext3"])
 
     # Parse steps
     steps = []
     for step_dict in cf_dict['steps']:
         op = step_dict.get('operation')
-
-        # Validate required fields
-        required_fields = REQUIRED_FIELDS.get(op)
-        if required_fields and not required_fields.issubset(step_dict.keys()):
-            missing_fields = required_fields - step_dict.keys()
-            raise ValueError(f"Missing required field(s) {', '.join(missing_fields)} for {op} operation.")
-
-        step_dict.pop('operation')
-        if op == 'PCR':
-            steps.append(PCR(**step_dict))
-        elif op == 'Digest':
-            # Validate enzymes
-            enzymes = step_dict.get('enzymes', [])
-            unrecognized_enzymes = [enzyme for enzyme in enzymes if enzyme not in ALL_ENZYMES]
-            if unrecognized_enzymes:
-                raise ValueError(f"Unrecognized enzyme(s): {', '.join(unrecognized_enzymes)}")
-            steps.append(Digest(**step_dict))
-        elif op == 'Ligate':
-            steps.append(Ligate(**step_dict))
-        elif op == 'GoldenGate':
-            # Validate enzyme
-            enzyme = step_dict.get('enzyme')
-            if enzyme not in TYPE_IIS_ENZYMES:
-                raise ValueError(f"Invalid enzyme {enzyme} for GoldenGate. Must be one of {TYPE_IIS_ENZYMES}.")
-            steps.append(GoldenGate(**step_dict))
-        elif op == 'Gibson':
-            steps.append(Gibson(**step_dict))
-        elif op == 'Transform':
-            # Validate antibiotics
-            antibiotics = step_dict.get('antibiotics', [])
-            unrecognized_antibiotics = [antibiotic for antibiotic in antibiotics if antibiotic not in VALID_ANTIBIOTICS]
-            if unrecognized_antibiotics:
-                raise ValueError(f"Unrecognized antibiotic(s): {', '.join(unrecognized_antibiotics)}")
-            steps.append(Transform(**step_dict))
-        else:
+        entry = _STEP_TABLE.get(op)
+        if entry is None:
             raise ValueError(f"Unrecognized operation: {op}")
-    
+        build, validate, field_count, optional_fields = entry
+
+        try:
+            step = build(step_dict)
+        except KeyError:
+            # Validate required fields
+            missing_fields = sorted(REQUIRED_FIELDS[op].difference(step_dict))
+            raise ValueError(f"Missing required field(s) {', '.join(missing_fields)} for {op} operation.") from None
+        if validate is not None:
+            validate(step_dict)
+        if (len(step_dict) != field_count and
+                len(step_dict) != field_count + sum(field in step_dict for field in optional_fields)):
+            # Unknown fields: the step's constructor raises the TypeError for them
+            fields = dict(step_dict)
+            del fields['operation']
+            step.__class__(**fields)
+        steps.append(step)
+
     return ConstructionFile(steps, sequences)
+
+
+def iter_CF_JSON(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the construction files of a JSON array of construction files one at a time, reading
+    source (a str or an open text file) in chunks, so the whole array is never held in memory.
+    A document holding a single construction file yields just that one. A malformed array raises
+    json.JSONDecodeError with its line, column and character counted from the start of the document.
+    """
+    handle = io.StringIO(source) if isinstance(source, str) else source
+    decoder = json.JSONDecoder()
+    buffer = handle.read(chunk_size)
+    position = _WHITESPACE.match(buffer).end()
+    if buffer[position:position + 1] != '[':
+        yield parse_CF_JSON(buffer + handle.read())
+        return
+    position += 1
+    offset = _Offset(0, 0, 0)
+    expect_item = True
+    after_comma = False
+    eof = False
+    read_size = chunk_size
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            if eof:
+                raise _decode_error("Unterminated JSON array of construction files", buffer, position, offset)
+            buffer, position, eof, offset = _refill(handle, buffer, position, read_size, offset)
+            continue
+        char = buffer[position]
+        if char == ']' and not after_comma:
+            return
+        if not expect_item:
+            if char != ',':
+                raise _decode_error("Expecting ',' delimiter", buffer, position, offset)
+            position += 1
+            expect_item = after_comma = True
+            continue
+        if char in ',]':
+            raise _decode_error("Expecting value", buffer, position, offset)
+        try:
+            cf_dict, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise _decode_error(e.msg, buffer, e.pos, offset) from None
+            # The item runs past the buffer; read more, doubling the read for very large items
+            buffer, position, eof, offset = _refill(handle, buffer, position, read_size, offset)
+            read_size *= 2
+            continue
+        read_size = chunk_size
+        position = end
+        expect_item = after_comma = False
+        yield construction_file_from_dict(cf_dict)
+
+
+# Where a buffer of iter_CF_JSON starts in the document: the characters and newlines before it,
+# and the characters after the last of those newlines
+_Offset = namedtuple('_Offset', ['chars', 'lines', 'column'])
+
+
+def _refill(handle, buffer, position, size, offset):
+    """
+    Drops the consumed buffer[:position] and appends the next read; returns the new buffer,
+    position, whether the source is exhausted and the new buffer's _Offset.
+    """
+    data = handle.read(size)
+    consumed = buffer[:position]
+    newlines = consumed.count('\n')
+    column = len(consumed) - consumed.rfind('\n') - 1 if newlines else offset.column + len(consumed)
+    offset = _Offset(offset.chars + len(consumed), offset.lines + newlines, column)
+    return buffer[position:] + data, 0, not data, offset
+
+
+def _decode_error(message, buffer, position, offset):
+    """
+    Returns a JSONDecodeError for buffer[position] whose pos, lineno and colno count from the
+    start of the document rather than the buffer (doc is still the buffer).
+    """
+    error = json.JSONDecodeError(message, buffer, position)
+    if offset.chars:
+        error.pos += offset.chars
+        if error.lineno == 1:
+            error.colno += offset.column
+        error.lineno += offset.lines
+        error.args = (f"{message}: line {error.lineno} column {error.colno} (char {error.pos})",)
+    return error
+
+
+def _validate_digest(step_dict):
+    # Validate enzymes
+    unrecognized_enzymes = [enzyme for enzyme in step_dict.get('enzymes', []) if enzyme not in _ENZYME_SET]
+    if unrecognized_enzymes:
+        raise ValueError(f"Unrecognized enzyme(s): {', '.join(unrecognized_enzymes)}")
+
+
+def _validate_goldengate(step_dict):
+    # Validate enzyme
+    enzyme = step_dict.get('enzyme')
+    if enzyme not in _TYPE_IIS_SET:
+        raise ValueError(f"Invalid enzyme {enzyme} for GoldenGate. Must be one of {TYPE_IIS_ENZYMES}.")
+
+
+def _validate_transform(step_dict):
+    # Validate antibiotics
+    unrecognized_antibiotics = [antibiotic for antibiotic in step_dict.get('antibiotics', [])
+                                if antibiotic not in VALID_ANTIBIOTICS]
+    if unrecognized_antibiotics:
+        raise ValueError(f"Unrecognized antibiotic(s): {', '.join(unrecognized_antibiotics)}")
+
+
+# Builders reading each step's fields straight from its decoded dict; a missing required field
+# raises KeyError
+def _build_pcr(step_dict):
+    return PCR(step_dict['forward_oligo'], step_dict['reverse_oligo'], step_dict['template'],
+               step_dict['output'], step_dict.get('product_size'))
+
+
+def _build_digest(step_dict):
+    return Digest(step_dict['dna'], step_dict['enzymes'], step_dict['fragSelect'], step_dict['output'],
+                  step_dict.get('product_size'))
+
+
+def _build_ligate(step_dict):
+    return Ligate(step_dict['dnas'], step_dict['output'])
+
+
+def _build_goldengate(step_dict):
+    return GoldenGate(step_dict['dnas'], step_dict['enzyme'], step_dict['output'])
+
+
+def _build_gibson(step_dict):
+    return Gibson(step_dict['dnas'], step_dict['output'])
+
+
+def _build_transform(step_dict):
+    return Transform(step_dict['dna'], step_dict['strain'], step_dict['antibiotics'], step_dict['output'],
+                     step_dict.get('temperature'))
+
+
+# Operation -> (builder, validator or None, required field count including 'operation', optional fields),
+# built once at import
+_STEP_TABLE = {
+    'PCR': (_build_pcr, None, len(REQUIRED_FIELDS['PCR']) + 1, ('product_size',)),
+    'Digest': (_build_digest, _validate_digest, len(REQUIRED_FIELDS['Digest']) + 1, ('product_size',)),
+    'Ligate': (_build_ligate, None, len(REQUIRED_FIELDS['Ligate']) + 1, ()),
+    'GoldenGate': (_build_goldengate, _validate_goldengate, len(REQUIRED_FIELDS['GoldenGate']) + 1, ()),
+    'Gibson': (_build_gibson, None, len(REQUIRED_FIELDS['Gibson']) + 1, ()),
+    'Transform': (_build_transform, _validate_transform, len(REQUIRED_FIELDS['Transform']) + 1, ('temperature',)),
+}
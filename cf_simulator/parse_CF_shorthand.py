@@ -1,3 +1,4 @@
+import io
 import re
 
 from .construction_file import ConstructionFile, PCR, Digest, Ligate, GoldenGate, Gibson, Transform
@@ -7,167 +8,245 @@ ALL_ENZYMES = ['AarI', 'ApaI', 'BamHI', 'BbsI', 'BglII', 'BsaI', 'BseRI', 'BsmBI
 TYPE_IIS_ENZYMES = ['AarI', 'BbsI', 'BsaI', 'BsmBI', 'SapI', 'BseRI']
 VALID_ANTIBIOTICS = {'G418', 'Hygro', 'Nat', 'Zeo'}
 
+SEQUENCE_CHARACTERS = 'ATCGNRKYSWBVHDM'
+INVALID_SEQUENCE_MESSAGE = "Invalid sequence format. Sequences must only contain characters 'A', 'T', 'C', 'G', 'N', 'R', 'K', 'Y', 'S', 'W', 'B', 'V', 'H', 'D', and be at least one character long."
 
+_SEQUENCE_CHARACTERS = SEQUENCE_CHARACTERS.encode()
+_ENZYME_SET = frozenset(ALL_ENZYMES)
+_LINE_COMMENT = re.compile(r'#|//')
 
-def parse_CF_shorthand(cf_shorthand):
-    # Remove /*comment*/ style comments
-    cf_shorthand = re.sub(r'/\*.*?\*/', '', cf_shorthand, flags=re.DOTALL)
 
-    lines = cf_shorthand.split('\n')
+def parse_CF_shorthand(cf_shorthand):
+    """
+    Parses construction file shorthand (a string or an open text file) into a ConstructionFile.
+    """
     steps = []
     sequences = {}
+    for kind, name, value in iter_CF_shorthand(cf_shorthand):
+        if kind == 'sequence':
+            sequences[name] = value
+        else:
+            steps.append(value)
+    return ConstructionFile(steps, sequences)
 
-    for line_num, line in enumerate(lines, start=1):
-        # Remove # and // style comments
-        line = re.split(r'#|//', line)[0]
+def iter_CF_shorthand(source):
+    """
+    Parses construction file shorthand one line at a time, yielding ('sequence', name, Polynucleotide)
+    and ('step', output, Step) tuples as they are read.
 
-        # Skip empty or whitespace-only lines
-        if not line.strip():
+    source is a string, an open text file or any iterable of lines. Block comments are tracked
+    across lines, so only the current line is held in memory.
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    for line_num, line in _strip_comments(source):
+        # Skip empty or whitespace-only lines (isspace stops at the first character, strip copies the line)
+        if not line or line.isspace():
             continue
-        
-        elements = line.split()
-
-        try:
-            # Check if the line is a sequence or a step
-            if len(elements) == 2:
-                # It's a sequence, store it
-                name, sequence = elements
-                sequence = sequence.upper()
-                if re.match("^[ATCGNRKYSWBVHDM]+$", sequence):
-                    if len(sequence) < 100:
-                        sequences[name] = oligo(sequence)
-                    else:
-                        sequences[name] = plasmid(sequence)
-                else:
-                    raise ValueError(f"Error in line {line_num}: Invalid sequence format. Sequences must only contain characters 'A', 'T', 'C', 'G', 'N', 'R', 'K', 'Y', 'S', 'W', 'B', 'V', 'H', 'D', and be at least one character long.")
-            else:
-                # It's a step, parse it
-                operation = elements[0].lower()
-
-                if operation == 'pcr':
-                    try:
-                        if len(elements) == 6:
-                            forward_primer, reverse_primer, template, product_size, product_name = elements[1:]
-                            validate_int(product_size, line_num)
-                            steps.append(PCR(forward_primer, reverse_primer, template, product_name, int(product_size)))
-                        else:
-                            forward_primer, reverse_primer, template, product_name = elements[1:]
-                            steps.append(PCR(forward_primer, reverse_primer, template, product_name))
-                    except ValueError:
-                        raise ValueError(f"Error in line {line_num}: Invalid argument type for PCR operation.")
-                    except IndexError:
-                        raise ValueError(f"Error in line {line_num}: Invalid number of arguments for PCR operation.")
-                elif operation == 'digest':
-                    try:
-                        if len(elements) == 5:
-                            dna, enzymes, frag_select, product_name = elements[1:]
-                            validate_int(frag_select, line_num)
-                            frag_select = int(frag_select)
-                            if frag_select < 0:
-                                raise ValueError(f"Error in line {line_num}: Invalid sequence number '{frag_select}'. Must be a non-negative integer.")
-                            enzymes = enzymes.split(',')
-                            unrecognized_enzymes = [enzyme for enzyme in enzymes if enzyme not in ALL_ENZYMES]
-                            if unrecognized_enzymes:
-                                raise ValueError(f"Error in line {line_num}: Unrecognized enzyme(s): {', '.join(unrecognized_enzymes)}")
-                            steps.append(Digest(dna, enzymes, frag_select, product_name))
-                        else:
-                            raise ValueError(f"Error in line {line_num}: Invalid number of arguments for Digest operation.")
-                    except ValueError:
-                        raise ValueError(f"Error in line {line_num}: Invalid argument type for Digest operation.")
-                elif operation == 'ligate':
-                    try:
-                        if len(elements) >= 3:
-                            dnas, product_name = elements[1:-1], elements[-1]
-                            if len(dnas) < 1:
-                                raise ValueError(f"Error in line {line_num}: Ligate operation requires at least 1 DNA inputs.")
-                            steps.append(Ligate(dnas, product_name))
-                        else:
-                            raise ValueError(f"Error in line {line_num}: Invalid number of arguments for Ligate operation.")
-                    except ValueError:
-                        raise ValueError(f"Error in line {line_num}: Invalid argument type for Ligate operation.")
-                elif operation == 'goldengate':
-                    try:
-                        if len(elements) >= 5:
-                            inputs, enzyme, product_name = elements[1:-1], elements[-2], elements[-1]
-                            if len(inputs) < 1:
-                                raise ValueError(f"Error in line {line_num}: GoldenGate operation requires at least 1 inputs.")
-                            if enzyme not in TYPE_IIS_ENZYMES:
-                                raise ValueError(f"Invalid enzyme {enzyme} for GoldenGate. Must be one of {TYPE_IIS_ENZYMES}.")
-                            steps.append(GoldenGate(inputs, enzyme, product_name))
-                        else:
-                            raise ValueError(f"Error in line {line_num}: Invalid number of arguments for GoldenGate operation.")
-                    except ValueError:
-                        raise ValueError(f"Error in line {line_num}: Invalid argument type for GoldenGate operation.")
-                elif operation == 'gibson':
-                    try:
-                        if len(elements) >= 4:
-                            inputs, product_name = elements[1:-1], elements[-1]
-                            if len(inputs) < 1:
-                                raise ValueError(f"Error in line {line_num}: Gibson operation requires at least 1 inputs.")
-                            steps.append(Gibson(inputs, product_name))
-                        else:
-                            raise ValueError(f"Error in line {line_num}: Invalid number of arguments for Gibson operation.")
-                    except ValueError:
-                        raise ValueError(f"Error in line {line_num}: Invalid argument type for Gibson operation.")
-                elif operation == 'transform':
-                    try:
-                        if len(elements) == 6:
-                            dna, strain, antibiotics, temperature, output = elements[1:]
-                            antibiotics = antibiotics.split(',')
-                            validate_antibiotics(antibiotics, line_num)
-                            validate_int(temperature, line_num)
-                            steps.append(Transform(dna, strain, antibiotics, output, int(temperature)))
-                        else:
-                            dna, strain, antibiotics, output = elements[1:]
-                            antibiotics = antibiotics.split(',')
-                            validate_antibiotics(antibiotics, line_num)
-                            steps.append(Transform(dna, strain, antibiotics, output))
-                    except ValueError:
-                        raise ValueError(f"Error in line {line_num}: Invalid argument type for Transform operation.")
-                    except IndexError:
-                        raise ValueError(f"Error in line {line_num}: Invalid number of arguments for Transform operation.")
-
-                # Or it's a sequence with a biological type
-                elif operation == 'oligo':
-                    if len(elements) == 3:
-                        # It's a sequence, store it
-                        seqname, sequence = elements[1:]
-                        sequence = sequence.upper()
-                        if re.match("^[ATCGNRKYSWBVHDM]+$", sequence):
-                            sequences[seqname] = oligo(sequence)
-                        else:
-                            raise ValueError(f"Error in line {line_num}: Invalid sequence format. Sequences must only contain characters 'A', 'T', 'C', 'G', 'N', 'R', 'K', 'Y', 'S', 'W', 'B', 'V', 'H', 'D', and be at least one character long.")
-                    else:
-                        raise ValueError(f"Error in line {line_num}: Invalid number of arguments for oligo operation.")
-                elif operation == 'plasmid':
-                    if len(elements) == 3:
-                        # It's a sequence, store it
-                        seqname, sequence = elements[1:]
-                        sequence = sequence.upper()
-                        if re.match("^[ATCGNRKYSWBVHDM]+$", sequence):
-                            sequences[seqname] = plasmid(sequence)
-                        else:
-                            raise ValueError(f"Error in line {line_num}: Invalid sequence format. Sequences must only contain characters 'A', 'T', 'C', 'G', 'N', 'R', 'K', 'Y', 'S', 'W', 'B', 'V', 'H', 'D', and be at least one character long.")
-                    else:
-                        raise ValueError(f"Error in line {line_num}: Invalid number of arguments for plasmid operation.")
-                elif operation == 'dsdna':
-                    if len(elements) == 3:
-                        # It's a sequence, store it
-                        seqname, sequence = elements[1:]
-                        sequence = sequence.upper()
-                        if re.match("^[ATCGNRKYSWBVHDM]+$", sequence):
-                            sequences[seqname] = dsDNA(sequence)
-                        else:
-                            raise ValueError(f"Error in line {line_num}: Invalid sequence format. Sequences must only contain characters 'A', 'T', 'C', 'G', 'N', 'R', 'K', 'Y', 'S', 'W', 'B', 'V', 'H', 'D', and be at least one character long.")
-                    else:
-                        raise ValueError(f"Error in line {line_num}: Invalid number of arguments for dsdna operation.")
-
-                else:
-                    raise ValueError(f"Error in line {line_num}: Invalid operation {operation}")
-        except (ValueError, IndexError) as e:
-            raise ValueError(f"Error in line {line_num}: {str(e)}")
+        yield _parse_line(line, line_num)
 
-    return ConstructionFile(steps, sequences)
+def _strip_comments(source):
+    """
+    Yields (line number, text) for each line with comments removed, as the whole-text parser did:
+    /* */ comments are removed first, wherever they start (even after a # or //), and then # or //
+    ends the line. A /* */ comment is removed without a trace, so text after one spanning lines
+    continues the line it opened on (reported with that line's number); a /* that is never closed
+    is kept as text.
+
+    Lines inside a comment are dropped as they are read. A /* still open at the end is replayed by
+    seeking back to the line after it, which needs a seekable source; other sources raise ValueError.
+    """
+    seekable = hasattr(source, 'seekable') and source.seekable()
+    # readline rather than iteration, since a text file's tell() is disabled while it is iterated
+    lines = iter(source.readline, '') if seekable else source
+    # (line number, text before the /*, the line holding the /* from there on, that line's number,
+    # where the line after it starts) while a /* */ comment is open
+    block = None
+    for line_num, line in enumerate(lines, start=1):
+        if block is None:
+            # Most lines have no comment at all; substring tests are much cheaper than a regex scan
+            if '/' not in line and '#' not in line:
+                yield line_num, line
+                continue
+            start, text, position = line_num, [], 0
+        else:
+            end = line.find('*/')
+            if end < 0:
+                continue
+            start, text, _, _, _ = block
+            block = None
+            position = end + 2
+        while True:
+            opening = line.find('/*', position)
+            if opening < 0:
+                text.append(line[position:])
+                yield start, _LINE_COMMENT.split(''.join(text), 1)[0]
+                break
+            text.append(line[position:opening])
+            end = line.find('*/', opening + 2)
+            if end < 0:
+                block = (start, text, line[opening:], line_num, source.tell() if seekable else None)
+                break
+            position = end + 2
+    if block is not None:
+        # Never closed: the /* and everything after it is text after all
+        start, text, rest, opening_line, resume = block
+        yield start, _LINE_COMMENT.split(''.join(text) + rest, 1)[0]
+        if resume is None:
+            raise ValueError(f"Error in line {opening_line}: Unclosed /* comment")
+        source.seek(resume)
+        for line_num, line in enumerate(iter(source.readline, ''), start=opening_line + 1):
+            yield line_num, _LINE_COMMENT.split(line, 1)[0]
+
+def _parse_line(line, line_num):
+    """
+    Parses one comment-free line into a ('sequence', name, Polynucleotide) or ('step', output, Step) tuple.
+    """
+    elements = line.split()
+
+    try:
+        # Check if the line is a sequence or a step
+        if len(elements) == 2:
+            # It's a sequence, stored as an oligo or, when long, a plasmid
+            name, sequence = elements
+            sequence = _check_sequence(sequence, line_num)
+            return 'sequence', name, oligo(sequence) if len(sequence) < 100 else plasmid(sequence)
+        operation = elements[0].lower()
+        handler = _LINE_HANDLERS.get(operation)
+        if handler is None:
+            raise ValueError(f"Error in line {line_num}: Invalid operation {operation}")
+        return handler(elements, line_num)
+    except (ValueError, IndexError) as e:
+        raise ValueError(f"Error in line {line_num}: {str(e)}")
+
+def _check_sequence(sequence, line_num):
+    """
+    Returns the sequence in upper case, or raises ValueError if it uses characters outside SEQUENCE_CHARACTERS.
+    Deleting the valid characters with bytes.translate is several times faster than a regex on long plasmids.
+    """
+    sequence = sequence.upper()
+    if not sequence.isascii() or sequence.encode('ascii').translate(None, _SEQUENCE_CHARACTERS):
+        raise ValueError(f"Error in line {line_num}: {INVALID_SEQUENCE_MESSAGE}")
+    return sequence
+
+def _parse_pcr(elements, line_num):
+    try:
+        if len(elements) == 6:
+            forward_primer, reverse_primer, template, product_size, product_name = elements[1:]
+            validate_int(product_size, line_num)
+            step = PCR(forward_primer, reverse_primer, template, product_name, int(product_size))
+        else:
+            forward_primer, reverse_primer, template, product_name = elements[1:]
+            step = PCR(forward_primer, reverse_primer, template, product_name)
+    except ValueError:
+        raise ValueError(f"Error in line {line_num}: Invalid argument type for PCR operation.")
+    except IndexError:
+        raise ValueError(f"Error in line {line_num}: Invalid number of arguments for PCR operation.")
+    return 'step', step.output, step
+
+def _parse_digest(elements, line_num):
+    try:
+        if len(elements) == 5:
+            dna, enzymes, frag_select, product_name = elements[1:]
+            validate_int(frag_select, line_num)
+            frag_select = int(frag_select)
+            if frag_select < 0:
+                raise ValueError(f"Error in line {line_num}: Invalid sequence number '{frag_select}'. Must be a non-negative integer.")
+            enzymes = enzymes.split(',')
+            unrecognized_enzymes = [enzyme for enzyme in enzymes if enzyme not in _ENZYME_SET]
+            if unrecognized_enzymes:
+                raise ValueError(f"Error in line {line_num}: Unrecognized enzyme(s): {', '.join(unrecognized_enzymes)}")
+            step = Digest(dna, enzymes, frag_select, product_name)
+        else:
+            raise ValueError(f"Error in line {line_num}: Invalid number of arguments for Digest operation.")
+    except ValueError:
+        raise ValueError(f"Error in line {line_num}: Invalid argument type for Digest operation.")
+    return 'step', step.output, step
+
+def _parse_ligate(elements, line_num):
+    try:
+        if len(elements) >= 3:
+            dnas, product_name = elements[1:-1], elements[-1]
+            if len(dnas) < 1:
+                raise ValueError(f"Error in line {line_num}: Ligate operation requires at least 1 DNA inputs.")
+            step = Ligate(dnas, product_name)
+        else:
+            raise ValueError(f"Error in line {line_num}: Invalid number of arguments for Ligate operation.")
+    except ValueError:
+        raise ValueError(f"Error in line {line_num}: Invalid argument type for Ligate operation.")
+    return 'step', step.output, step
+
+def _parse_goldengate(elements, line_num):
+    try:
+        if len(elements) >= 5:
+            inputs, enzyme, product_name = elements[1:-1], elements[-2], elements[-1]
+            if len(inputs) < 1:
+                raise ValueError(f"Error in line {line_num}: GoldenGate operation requires at least 1 inputs.")
+            if enzyme not in TYPE_IIS_ENZYMES:
+                raise ValueError(f"Invalid enzyme {enzyme} for GoldenGate. Must be one of {TYPE_IIS_ENZYMES}.")
+            step = GoldenGate(inputs, enzyme, product_name)
+        else:
+            raise ValueError(f"Error in line {line_num}: Invalid number of arguments for GoldenGate operation.")
+    except ValueError:
+        raise ValueError(f"Error in line {line_num}: Invalid argument type for GoldenGate operation.")
+    return 'step', step.output, step
+
+def _parse_gibson(elements, line_num):
+    try:
+        if len(elements) >= 4:
+            inputs, product_name = elements[1:-1], elements[-1]
+            if len(inputs) < 1:
+                raise ValueError(f"Error in line {line_num}: Gibson operation requires at least 1 inputs.")
+            step = Gibson(inputs, product_name)
+        else:
+            raise ValueError(f"Error in line {line_num}: Invalid number of arguments for Gibson operation.")
+    except ValueError:
+        raise ValueError(f"Error in line {line_num}: Invalid argument type for Gibson operation.")
+    return 'step', step.output, step
+
+def _parse_transform(elements, line_num):
+    try:
+        if len(elements) == 6:
+            dna, strain, antibiotics, temperature, output = elements[1:]
+            antibiotics = antibiotics.split(',')
+            validate_antibiotics(antibiotics, line_num)
+            validate_int(temperature, line_num)
+            step = Transform(dna, strain, antibiotics, output, int(temperature))
+        else:
+            dna, strain, antibiotics, output = elements[1:]
+            antibiotics = antibiotics.split(',')
+            validate_antibiotics(antibiotics, line_num)
+            step = Transform(dna, strain, antibiotics, output)
+    except ValueError:
+        raise ValueError(f"Error in line {line_num}: Invalid argument type for Transform operation.")
+    except IndexError:
+        raise ValueError(f"Error in line {line_num}: Invalid number of arguments for Transform operation.")
+    return 'step', step.output, step
+
+def _sequence_handler(operation, factory):
+    """
+    Returns the handler for a "<type> name sequence" line that builds the sequence with factory.
+    """
+    def parse(elements, line_num):
+        if len(elements) != 3:
+            raise ValueError(f"Error in line {line_num}: Invalid number of arguments for {operation} operation.")
+        seqname, sequence = elements[1:]
+        return 'sequence', seqname, factory(_check_sequence(sequence, line_num))
+    return parse
+
+# Lower-cased operation name -> function parsing the split line
+_LINE_HANDLERS = {
+    'pcr': _parse_pcr,
+    'digest': _parse_digest,
+    'ligate': _parse_ligate,
+    'goldengate': _parse_goldengate,
+    'gibson': _parse_gibson,
+    'transform': _parse_transform,
+    # Or it's a sequence with a biological type
+    'oligo': _sequence_handler('oligo', oligo),
+    'plasmid': _sequence_handler('plasmid', plasmid),
+    'dsdna': _sequence_handler('dsdna', dsDNA),
+}
 
 def validate_int(value, line_num):
     try:
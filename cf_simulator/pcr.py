@@ -0,0 +1,210 @@
+from collections import namedtuple
+from functools import lru_cache
+
+# Length of the exact seed at a primer's 3' end; a mismatch there stops the polymerase
+SEED_LENGTH = 10
+
+# Bases at a primer's 3' end that must anneal (with up to max_mismatches mismatches); any
+# bases 5' of them are a tail carried into the product without binding
+ANNEAL_LENGTH = 18
+
+MAX_MISMATCHES = 2
+
+_COMPLEMENT = str.maketrans('ACGT', 'TGCA')
+
+# One primer binding site. strand is '+' when the primer anneals to the bottom strand and
+# extends rightwards along the template, '-' when it extends leftwards. position is the
+# template index just past the primer's 3' end for '+', and of its 3' end for '-'; length is
+# the number of annealed bases and mismatches the mismatches among them.
+BindingSite = namedtuple('BindingSite', ['primer', 'strand', 'position', 'length', 'mismatches'])
+
+# One PCR product: its sequence, the primers extending rightwards (left) and leftwards (right)
+# along the template ('forward' or 'reverse'), the template span it copies (start may exceed
+# end on a circular template) and the total mismatches of both primers.
+Amplicon = namedtuple('Amplicon', ['sequence', 'left', 'right', 'start', 'end', 'mismatches'])
+
+
+def reverse_complement(sequence):
+    return sequence.translate(_COMPLEMENT)[::-1]
+
+
+# Base -> 2-bit code for bytes.translate; every other byte maps to _NOT_A_BASE
+_BASE_CODES = bytes(b'ACGT'.index(byte) if byte in b'ACGT' else 4 for byte in range(256))
+_NOT_A_BASE = 4
+
+
+class TemplateIndex:
+    """
+    Positions of every SEED_LENGTH-mer of a template, built once so each primer is located
+    with a binary search per strand instead of a scan of the template.
+
+    Seeds are stored as two NumPy arrays, their 2-bit codes sorted and their start positions
+    in the same order, which takes 8 bytes per template base for seeds of up to 16 bases.
+    """
+
+    def __init__(self, sequence, circular=False, seed_length=SEED_LENGTH):
+        # NumPy is imported with the first index rather than with the simulator
+        import numpy
+
+        if seed_length > 32:
+            raise ValueError(f"Seeds of {seed_length} bases do not fit a 64-bit code.")
+        self.sequence = sequence.upper()
+        self.circular = circular
+        self.seed_length = seed_length
+        length = len(self.sequence)
+        # Circular templates are indexed across the origin
+        self._text = text = self.sequence + self.sequence[:seed_length - 1] if circular else self.sequence
+        count = max(len(text) - seed_length + 1, 0)
+        # One byte per character, so positions in the codes are positions in the text
+        codes = numpy.frombuffer(text.encode('ascii', 'replace').translate(_BASE_CODES), dtype=numpy.uint8)
+        # Seeds holding anything but ACGT are not indexed; positions() finds those by scanning
+        not_bases = numpy.concatenate(([0], numpy.cumsum(codes == _NOT_A_BASE)))
+        indexed = not_bases[seed_length:seed_length + count] == not_bases[:count]
+        seeds = numpy.zeros(count, dtype=numpy.uint32 if seed_length <= 16 else numpy.uint64)
+        for offset in range(seed_length):
+            seeds <<= 2
+            seeds |= codes[offset:offset + count] & 3
+        positions = numpy.flatnonzero(indexed).astype(numpy.uint32 if length < 2 ** 32 else numpy.uint64)
+        seeds = seeds[indexed]
+        # A stable sort keeps each seed's positions in template order
+        order = numpy.argsort(seeds, kind='stable')
+        self._seeds = seeds[order]
+        self._positions = positions[order]
+
+    def positions(self, seed):
+        """
+        Returns the start positions of a seed on the top strand.
+        """
+        code = 0
+        for byte in seed.encode('ascii', 'replace').translate(_BASE_CODES):
+            if byte == _NOT_A_BASE:
+                return self._scan(seed)
+            code = code << 2 | byte
+        low, high = self._seeds.searchsorted(code, 'left'), self._seeds.searchsorted(code, 'right')
+        return self._positions[low:high].tolist()
+
+    def _scan(self, seed):
+        # Seeds with IUPAC codes or other characters are rare; find them in the text itself
+        positions = []
+        position = self._text.find(seed)
+        while position >= 0:
+            positions.append(position)
+            position = self._text.find(seed, position + 1)
+        return positions
+
+    def window(self, start, length):
+        """
+        Returns length template bases from start (wrapping around circular templates), or None
+        when the window runs off the end of a linear template.
+        """
+        size = len(self.sequence)
+        if self.circular:
+            start %= size
+            if start + length <= size:
+                return self.sequence[start:start + length]
+            return (self.sequence * (length // size + 2))[start:start + length]
+        if start < 0 or start + length > size:
+            return None
+        return self.sequence[start:start + length]
+
+    def binding_sites(self, primer, name='primer', max_mismatches=MAX_MISMATCHES, anneal_length=ANNEAL_LENGTH):
+        """
+        Returns every BindingSite of a primer on either strand: its 3'-terminal seed matches
+        exactly and its 3'-terminal anneal_length bases (or the whole primer if shorter) have at
+        most max_mismatches mismatches. Primers shorter than the seed do not bind.
+        """
+        primer = primer.upper()
+        k = self.seed_length
+        length = min(len(primer), anneal_length)
+        if length < k:
+            return []
+        annealed = primer[-length:]
+        sites = []
+        for position in self.positions(primer[-k:]):
+            end = position + k
+            window = self.window(end - length, length)
+            if window is not None:
+                mismatches = _mismatches(annealed, window)
+                if mismatches <= max_mismatches:
+                    sites.append(BindingSite(name, '+', end % len(self.sequence) if self.circular else end,
+                                             length, mismatches))
+        bottom = reverse_complement(annealed)
+        for position in self.positions(bottom[:k]):
+            window = self.window(position, length)
+            if window is not None:
+                mismatches = _mismatches(bottom, window)
+                if mismatches <= max_mismatches:
+                    sites.append(BindingSite(name, '-', position, length, mismatches))
+        return sites
+
+
+@lru_cache(maxsize=32)
+def template_index(sequence, circular=False, seed_length=SEED_LENGTH):
+    """
+    Returns the (cached) TemplateIndex for a template, shared by every PCR on it.
+    """
+    return TemplateIndex(sequence, circular, seed_length)
+
+
+def find_amplicons(forward, reverse, template, circular=False, max_mismatches=MAX_MISMATCHES, max_length=None):
+    """
+    Returns every product of a PCR, the intended forward/reverse product first (fewest
+    mismatches, then shortest), followed by off-target products of any primer pair by
+    mismatches and length.
+
+    Each product is the rightward primer (with its tail), the template between the two binding
+    sites and the reverse complement of the leftward primer; intended products are read from
+    the forward primer whichever strand it anneals to. Products longer than max_length are left out.
+    """
+    index = template_index(template.upper(), circular)
+    primers = {'forward': forward.upper(), 'reverse': reverse.upper()}
+    sites = [site for name, primer in primers.items() for site in index.binding_sites(primer, name, max_mismatches)]
+    lefts = [site for site in sites if site.strand == '+']
+    rights = [site for site in sites if site.strand == '-']
+
+    amplicons = []
+    for left in lefts:
+        for right in rights:
+            sequence = _product(index, primers[left.primer], left, primers[right.primer], right)
+            if sequence is None or (max_length is not None and len(sequence) > max_length):
+                continue
+            if (left.primer, right.primer) == ('reverse', 'forward'):
+                # The intended product read from the forward primer
+                sequence = reverse_complement(sequence)
+            start, end = left.position - left.length, right.position + right.length
+            if circular:
+                start, end = start % len(index.sequence), end % len(index.sequence)
+            amplicons.append(Amplicon(sequence, left.primer, right.primer, start, end,
+                                      left.mismatches + right.mismatches))
+
+    return sorted(amplicons, key=lambda amplicon: (is_off_target(amplicon), amplicon.mismatches, len(amplicon.sequence)))
+
+
+def is_off_target(amplicon):
+    """
+    True unless the amplicon is primed by the forward and the reverse primer.
+    """
+    return {amplicon.left, amplicon.right} != {'forward', 'reverse'}
+
+
+def _product(index, left_primer, left, right_primer, right):
+    """
+    Returns the product of two facing binding sites, or None if they do not face each other.
+    """
+    tail = reverse_complement(right_primer)
+    if index.circular:
+        gap = (right.position - left.position) % len(index.sequence)
+        return left_primer + index.window(left.position, gap) + tail
+    gap = right.position - left.position
+    if gap >= 0:
+        return left_primer + index.sequence[left.position:right.position] + tail
+    # Overlapping binding sites share their annealed bases
+    if -gap > min(left.length, right.length):
+        return None
+    return left_primer + tail[-gap:]
+
+
+def _mismatches(first, second):
+    if first == second:
+        return 0
+    return sum(a != b for a, b in zip(first, second))
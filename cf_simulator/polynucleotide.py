@@ -1,8 +1,51 @@
+import sys
+
+from .rope import Rope
+
+_FIELDS = ('sequence', 'ext5', 'ext3', 'is_double_stranded', 'is_circular', 'mod_ext5', 'mod_ext3')
+
+
+def _upper(value):
+    # upper() always copies; most sequences are already upper case
+    if value and not value.isupper():
+        return value.upper()
+    return value
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# Overhangs and modifications as given -> their normalized, interned form. They come from a
+# handful of values, so a dict hit replaces the upper()/intern() calls; the size cap keeps
+# unusual inputs from growing it without bound.
+_NORMALIZED_OVERHANGS = {}
+_NORMALIZED_MODIFICATIONS = {}
+_MAX_NORMALIZED_ENDS = 1024
+
+
+def _normalize_end(value, normalized_ends, upper):
+    normalized = _intern(_upper(value) if upper else value)
+    if len(normalized_ends) < _MAX_NORMALIZED_ENDS:
+        normalized_ends[value] = normalized
+    return normalized
+
+
 class Polynucleotide:
+    # No per-instance __dict__: a part costs its sequence plus a fixed ~100 bytes.
+    # The sequence stays a str, which CPython already stores at one byte per base for ASCII.
+    # Overhangs and modifications come from a handful of values and are interned.
+    # A product may be given a Rope sharing its inputs; it is flattened when .sequence is first read.
+    __slots__ = ('_sequence',) + _FIELDS[1:] + ('_hash',)
 
     def __eq__(self, other):
         if not isinstance(other, Polynucleotide):
             return NotImplemented
+        if self is other:
+            return True
+        # The cached hashes reject most non-matches without comparing full sequences
+        if hash(self) != hash(other):
+            return False
         return (self.sequence == other.sequence and
                 self.ext5 == other.ext5 and
                 self.ext3 == other.ext3 and
@@ -10,14 +53,48 @@ class Polynucleotide:
                 self.is_circular == other.is_circular and
                 self.mod_ext5 == other.mod_ext5 and
                 self.mod_ext3 == other.mod_ext3)
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, '_hash', hash(tuple(getattr(self, field) for field in _FIELDS)))
+        return self._hash
+
+    @property
+    def sequence(self):
+        if not isinstance(self._sequence, str):
+            object.__setattr__(self, '_sequence', _upper(str(self._sequence)))
+        return self._sequence
+
+    @sequence.setter
+    def sequence(self, value):
+        object.__setattr__(self, '_sequence', value if isinstance(value, Rope) else _upper(value))
+
+    @property
+    def lazy_sequence(self):
+        """
+        The sequence without flattening it: a str, or a Rope until .sequence is read.
+        """
+        return self._sequence
+
+    def __setattr__(self, name, value):
+        # Keep the cached hash in step with the fields
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, '_hash', None)
+
     def __init__(self, sequence, ext5, ext3, is_double_stranded, is_circular, mod_ext5, mod_ext3):
-        self.sequence = sequence.upper() if sequence else sequence
-        self.ext5 = ext5.upper() if ext5 else ext5
-        self.ext3 = ext3.upper() if ext3 else ext3
-        self.is_double_stranded = is_double_stranded
-        self.is_circular = is_circular
-        self.mod_ext5 = mod_ext5
-        self.mod_ext3 = mod_ext3
+        # Written through the slot descriptors, skipping __setattr__; parsers build many parts
+        overhangs = _NORMALIZED_OVERHANGS
+        modifications = _NORMALIZED_MODIFICATIONS
+        _set_sequence(self, sequence if isinstance(sequence, Rope) else _upper(sequence))
+        _set_ext5(self, overhangs[ext5] if ext5 in overhangs else _normalize_end(ext5, overhangs, True))
+        _set_ext3(self, overhangs[ext3] if ext3 in overhangs else _normalize_end(ext3, overhangs, True))
+        _set_is_double_stranded(self, is_double_stranded)
+        _set_is_circular(self, is_circular)
+        _set_mod_ext5(self, modifications[mod_ext5] if mod_ext5 in modifications
+                      else _normalize_end(mod_ext5, modifications, False))
+        _set_mod_ext3(self, modifications[mod_ext3] if mod_ext3 in modifications
+                      else _normalize_end(mod_ext3, modifications, False))
+        _set_hash(self, None)
 
     def __str__(self):
         return f'Polynucleotide(sequence={self.sequence}, ext5={self.ext5}, ext3={self.ext3}, is_double_stranded={self.is_double_stranded}, is_circular={self.is_circular}, mod_ext5={self.mod_ext5}, mod_ext3={self.mod_ext3})'
@@ -25,6 +102,16 @@ class Polynucleotide:
     def __repr__(self):
         return self.__str__()
 
+_set_sequence = Polynucleotide._sequence.__set__
+_set_ext5 = Polynucleotide.ext5.__set__
+_set_ext3 = Polynucleotide.ext3.__set__
+_set_is_double_stranded = Polynucleotide.is_double_stranded.__set__
+_set_is_circular = Polynucleotide.is_circular.__set__
+_set_mod_ext5 = Polynucleotide.mod_ext5.__set__
+_set_mod_ext3 = Polynucleotide.mod_ext3.__set__
+_set_hash = Polynucleotide._hash.__set__
+
+
 def dsDNA(sequence):
     return Polynucleotide(sequence, '', '', True, False, 'hydroxyl', 'hydroxyl')
 
@@ -34,4 +121,4 @@ def oligo(sequence):
 
 
 def plasmid(sequence):
-    return Polynucleotide(sequence, '', '', True, True, None, None)
\ No newline at end of file
+    return Polynucleotide(sequence, '', '', True, True, None, None)
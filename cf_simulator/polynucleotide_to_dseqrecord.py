@@ -1,59 +1,118 @@
 import re
-from pydna.dseq import Dseq
-from pydna.dseqrecord import Dseqrecord
-from pydna.utils import rc
+from functools import lru_cache
+
+SEQUENCE_CHARACTERS = b'ATCGNRKYSWBVHDM'
+_EXTENSION = re.compile(r'-?[ATCG]+')
+_COMPLEMENT = str.maketrans('ATCGNRKYSWBVHDMatcgnrkyswbvhdm', 'TAGCNYMRSWVBDHKtagcnymrswvbdhk')
+
+# Filled in by _load_pydna on the first conversion; importing pydna takes about a second, and
+# reverse_complement_overhang is used by modules that never convert
+Dseq = Dseqrecord = None
+watson_tail_letter_dict = crick_tail_letter_dict = None
+_WATSON_TAIL = _CRICK_TAIL = None
+
+
+def _load_pydna():
+    global Dseq, Dseqrecord, watson_tail_letter_dict, crick_tail_letter_dict, _WATSON_TAIL, _CRICK_TAIL
+    if Dseqrecord is not None:
+        return
+    from pydna.dseq import Dseq
+    try:
+        # pydna >= 5.5 stores a Dseq as one "dscode" string in which each single-stranded
+        # base has its own letter, so a sticky molecule can be built without annealing strands
+        from pydna.alphabet import watson_tail_letter_dict, crick_tail_letter_dict
+        _WATSON_TAIL = str.maketrans(watson_tail_letter_dict)
+        _CRICK_TAIL = str.maketrans(crick_tail_letter_dict)
+    except ImportError:
+        watson_tail_letter_dict = crick_tail_letter_dict = None
+    from pydna.dseqrecord import Dseqrecord
+
+
+@lru_cache(maxsize=4096)
+def reverse_complement_overhang(overhang):
+    """
+    Reverse complement of a (short, frequently repeated) overhang sequence.
+    """
+    return overhang.translate(_COMPLEMENT)[::-1]
 
 
 def polynucleotide_to_dseqrecord(poly):
-    # Convert the sequence and extensions to uppercase
-    sequence = poly.sequence.upper()
-    ext5 = poly.ext5.upper() if poly.ext5 else ''
-    ext3 = poly.ext3.upper() if poly.ext3 else ''
-    
+    _load_pydna()
+    # The Polynucleotide constructor has already upper-cased every field
+    sequence = poly.sequence
+    ext5 = poly.ext5 or ''
+    ext3 = poly.ext3 or ''
+
     # Check the sequence data
-    if not re.match(r'^[ATCGNRKYSWBVHDM]+$', poly.sequence):
+    if not sequence or not sequence.isascii() or sequence.encode('ascii').translate(None, SEQUENCE_CHARACTERS):
         raise ValueError("Invalid characters in sequence. Sequence must only contain the characters ATCGNRKYSWBVHDM.")
 
-    if poly.ext5 and not re.match(r'^(-)?[ATCG]+$', poly.ext5):
+    if ext5 and not _EXTENSION.fullmatch(ext5):
         raise ValueError("Invalid characters in ext5. ext5 must only contain the characters ATCG and optionally start with a '-'.")
 
-    if poly.ext3 and not re.match(r'^(-)?[ATCG]+$', poly.ext3):
+    if ext3 and not _EXTENSION.fullmatch(ext3):
         raise ValueError("Invalid characters in ext3. ext3 must only contain the characters ATCG and optionally start with a '-'.")
 
     # Check that circular sequences have no sticky ends
-    if poly.is_circular and (poly.ext5 or poly.ext3):
+    if poly.is_circular and (ext5 or ext3):
         raise Exception("Circular Polynucleotide cannot have overhangs")
 
-    # Grab the 'sequences' portion of the Polynucleotide
-    coding_strand = poly.sequence
-    
-    # Calculate the reverse complement
-    complementary_strand = rc(coding_strand)
+    if watson_tail_letter_dict is not None:
+        return Dseqrecord(_quick_dseq(_dscode(sequence, ext5, ext3), poly.is_circular))
+    if poly.is_circular:
+        return Dseqrecord(Dseq(sequence, circular=True))
+    return Dseqrecord(_anneal(sequence, ext5, ext3))
+
+
+def _quick_dseq(data, circular):
+    """
+    Returns the Dseq for a dscode string built by _dscode, through pydna's unchecked
+    Dseq.quick constructor. Dseq() would scan it for internal strand breaks, which the
+    checks above already rule out, and that scan is most of the cost of a conversion.
+    """
+    return Dseq.quick(data.encode('ascii'), circular=circular)
+
+
+def _dscode(sequence, ext5, ext3):
+    """
+    Returns the pydna dscode string for a linear molecule: the double-stranded part with the
+    single-stranded bases at each end written in their strand's tail letters.
+    ext5 without '-' is a 5' overhang of the watson strand, with '-' a 3' overhang of the crick
+    strand; ext3 without '-' is a 5' overhang of the crick strand, with '-' a 3' overhang of the watson strand.
+    """
+    if not ext5 and not ext3:
+        return sequence
+    if ext5.startswith('-'):
+        left = ext5[1:].translate(_CRICK_TAIL)
+    else:
+        left = ext5.translate(_WATSON_TAIL)
+    if ext3.startswith('-'):
+        right = ext3[1:].translate(_WATSON_TAIL)
+    else:
+        right = ext3.translate(_CRICK_TAIL)
+    return left + sequence + right
+
+
+def _anneal(sequence, ext5, ext3):
+    """
+    Builds the Dseq from its two strands, for pydna versions without dscode.
+    """
+    _load_pydna()
+    coding_strand = sequence
+    complementary_strand = sequence.translate(_COMPLEMENT)[::-1]
 
     # Handle 5' extension
-    ext_5 = poly.ext5
-    if not ext_5.startswith('-'):
-        coding_strand = ext_5 + coding_strand
-        overhang = -len(ext_5)
+    if not ext5.startswith('-'):
+        coding_strand = ext5 + coding_strand
+        overhang = -len(ext5)
     else:
-        ext_5 = ext_5[1:]
-        complementary_strand = complementary_strand + rc(ext_5)
-        overhang = len(ext_5)
+        complementary_strand = complementary_strand + reverse_complement_overhang(ext5[1:])
+        overhang = len(ext5) - 1
 
     # Handle 3' extension
-    ext_3 = poly.ext3
-    if not ext_3.startswith('-'):
-        ext_3 = rc(ext_3)
-        complementary_strand = ext_3 + complementary_strand
+    if not ext3.startswith('-'):
+        complementary_strand = reverse_complement_overhang(ext3) + complementary_strand
     else:
-        ext_3 = ext_3[1:]
-        coding_strand += ext_3
-
-    # Create Dseqrecord
-    sequence = Dseq(coding_strand, complementary_strand, overhang)
-
-    # Loop it if it's circular
-    if poly.is_circular:
-        sequence = sequence.looped()
+        coding_strand += ext3[1:]
 
-    return Dseqrecord(sequence)
+    return Dseq(coding_strand, complementary_strand, overhang)
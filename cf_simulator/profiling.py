@@ -0,0 +1,108 @@
+import json
+import time
+import tracemalloc
+from collections import namedtuple
+
+from .enzyme_table import is_known_enzyme
+from .restriction_index import site_index
+from .tracing import step_attributes
+
+# Compute cost of one simulated step. Times are in seconds; peak_bytes is the largest amount of
+# memory allocated during the step above what was allocated when it started (None if not traced).
+StepProfile = namedtuple('StepProfile', ['index', 'operation', 'output', 'wall_time', 'cpu_time',
+                                         'input_lengths', 'fragments', 'peak_bytes'])
+
+SORT_KEYS = ('wall_time', 'cpu_time', 'peak_bytes', 'index')
+
+
+def count_fragments(step, resolve, circular=None):
+    """
+    Returns the number of fragments a step produces: every cut fragment for Digest, the
+    digested pieces (or whole uncut inputs) for GoldenGate, none for Transform, otherwise one.
+    Uses the cached site indexes, so it does not repeat the digest. circular (a session's
+    circular flags, name -> bool) marks the GoldenGate parts that are digested as circles.
+    """
+    if step.operation == 'Digest':
+        enzymes = [enzyme for enzyme in step.enzymes if is_known_enzyme(enzyme)]
+        return len(site_index(resolve(step.dna)).cutsite_pairs(enzymes))
+    if step.operation == 'GoldenGate':
+        # Plasmid parts are digested as circles, as perform_goldengate does
+        is_circular = lambda dna: circular is not None and circular.get(dna, False)
+        return sum(max(len(site_index(resolve(dna).upper(), is_circular(dna)).cutsite_pairs([step.enzyme])), 1)
+                   for dna in step.dnas)
+    if step.operation == 'Transform':
+        return 0
+    return 1
+
+
+class SimulationProfile:
+    """
+    Per-step compute profile of a simulation; pass one to simulate(profile=...).
+
+    Each step is measured for wall time, CPU time of the simulating thread, the lengths of its
+    resolved inputs, the fragments it produced and, when memory is True, its peak allocation
+    with tracemalloc (started for the duration of the step if it is not already running, which
+    slows the simulation down considerably).
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.steps = []
+
+    def measure(self, step, run, resolve, circular=None):
+        """
+        Returns run(step), recording a StepProfile for it. circular is the session's circular
+        flags, as for count_fragments.
+        """
+        input_lengths = step_attributes(step, resolve)['input_lengths']
+        started_tracing = self.memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            result = run(step)
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.thread_time() - cpu_start
+            peak_bytes = tracemalloc.get_traced_memory()[1] - baseline if self.memory else None
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+        self.steps.append(StepProfile(len(self.steps), step.operation, step.output, wall_time, cpu_time,
+                                      input_lengths, count_fragments(step, resolve, circular), peak_bytes))
+        return result
+
+    def sorted_steps(self, sort_by='wall_time'):
+        """
+        Returns the step profiles, most expensive first (in step order for 'index').
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Cannot sort by '{sort_by}'. Must be one of {SORT_KEYS}.")
+        if sort_by == 'index':
+            return list(self.steps)
+        return sorted(self.steps, key=lambda step: getattr(step, sort_by) or 0, reverse=True)
+
+    def to_dict(self):
+        return {
+            'steps': [step._asdict() for step in self.steps],
+            'total_wall_time': sum(step.wall_time for step in self.steps),
+            'total_cpu_time': sum(step.cpu_time for step in self.steps),
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def table(self, sort_by='wall_time'):
+        """
+        Returns a text table of the steps, most expensive first.
+        """
+        header = f"{'#':>3}  {'operation':<10} {'output':<20} {'wall ms':>9} {'cpu ms':>9} {'input bp':>10} {'frags':>5} {'peak KiB':>9}"
+        lines = [header, '-' * len(header)]
+        for step in self.sorted_steps(sort_by):
+            peak = f"{step.peak_bytes / 1024:9.1f}" if step.peak_bytes is not None else f"{'-':>9}"
+            lines.append(f"{step.index:>3}  {step.operation:<10} {step.output[:20]:<20} {step.wall_time * 1e3:9.2f} "
+                         f"{step.cpu_time * 1e3:9.2f} {sum(step.input_lengths):>10} {step.fragments:>5} {peak}")
+        return '\n'.join(lines)
@@ -0,0 +1,138 @@
+from functools import lru_cache
+
+from .enzyme_table import ENZYMES, is_known_enzyme, load_restriction
+
+_COMPLEMENT = str.maketrans('ACGT', 'TGCA')
+
+
+def _site_literals(records):
+    """
+    Maps each recognition site (and its reverse complement) to the (enzyme name, is_forward)
+    pairs it belongs to. Only plain ACGT sites are tabulated; degenerate IUPAC sites are
+    left to the enzyme's own compiled pattern.
+    """
+    literals = {}
+    for record in records:
+        site = record.site
+        if site.strip('ACGT'):
+            continue
+        literals.setdefault(site, []).append((record.name, True))
+        if not record.palindromic:
+            literals.setdefault(site.translate(_COMPLEMENT)[::-1], []).append((record.name, False))
+    return literals
+
+
+# Sites of every enzyme in the precomputed table are collected when an index is built, without
+# importing Biopython. Names Biopython does not know (the homing endonucleases) are not in the
+# table, so they are skipped, as perform_digest has always done.
+_SITE_LITERALS = _site_literals(ENZYMES.values())
+_MAX_SITE_SIZE = max(len(site) for site in _SITE_LITERALS)
+
+
+class RestrictionSiteIndex:
+    """
+    Restriction sites of every indexed enzyme in one sequence, collected once up front.
+
+    The scan walks a precompiled table of recognition sites (both strands) with str.find,
+    so each site costs one C-level pass and only actual hits reach Python. Cut positions
+    use the Biopython convention (1-based position of the first base after the cut on the
+    watson strand) and fragments are built with pydna, so results match
+    Dseqrecord(Dseq(sequence)).cut(...) exactly.
+    """
+
+    def __init__(self, sequence, circular=False):
+        self.sequence = sequence.upper()
+        self.circular = circular
+        self._record = None
+        # enzyme name -> [(site start, is_forward)]
+        self._sites = {name: [] for owners in _SITE_LITERALS.values() for name, _ in owners}
+
+        length = len(self.sequence)
+        text = self.sequence + self.sequence[:_MAX_SITE_SIZE - 1] if circular else self.sequence
+        for literal, owners in _SITE_LITERALS.items():
+            start = text.find(literal)
+            while 0 <= start < length:
+                for name, is_forward in owners:
+                    self._sites[name].append((start, is_forward))
+                start = text.find(literal, start + 1)
+
+    @property
+    def record(self):
+        """
+        The Dseqrecord for the indexed sequence, built on first use.
+        """
+        if self._record is None:
+            # pydna is imported by the first digest rather than when this module loads
+            from pydna.dseq import Dseq
+            from pydna.dseqrecord import Dseqrecord
+            self._record = Dseqrecord(Dseq(self.sequence, circular=self.circular))
+        return self._record
+
+    def cut_positions(self, enzyme):
+        """
+        Returns the cut positions of a single enzyme, as enzyme.search would.
+        """
+        name = str(enzyme)
+        if name not in self._sites:
+            # Enzymes outside the site table are indexed with their own pattern on first request
+            text = self.sequence + self.sequence[:enzyme.size - 1] if self.circular else self.sequence
+            sites = []
+            for match in enzyme.compsite.finditer(text):
+                if match.start() < len(self.sequence):
+                    sites.append((match.start(), enzyme.is_palindromic() or match.group(name) is not None))
+            self._sites[name] = sites
+
+        cuts = []
+        for start, is_forward in self._sites[name]:
+            # Biopython reports site locations 1-based
+            cuts.extend(enzyme._modify(start + 1) if is_forward else enzyme._rev_modify(start + 1))
+        cuts.sort()
+
+        length = len(self.sequence)
+        if self.circular:
+            return sorted(cut + length if cut < 1 else cut - length if cut > length else cut for cut in cuts)
+        if not enzyme.is_defined() and not enzyme.is_ambiguous():
+            return cuts
+        return [cut for cut in cuts if 1 < cut <= length and 1 < cut - enzyme.ovhg <= length]
+
+    def cutsites(self, enzymes):
+        """
+        Returns the pydna cutsites ((cut_watson, ovhg), enzyme) for a set of enzymes.
+        """
+        enzymes = list(dict.fromkeys(_resolve(enzyme) for enzyme in enzymes))
+        cutsites = [((cut - 1, enzyme.ovhg), enzyme) for enzyme in enzymes for cut in self.cut_positions(enzyme)]
+        return sorted(cutsite for cutsite in cutsites if self.record.seq.cutsite_is_valid(cutsite))
+
+    def cutsite_pairs(self, enzymes):
+        """
+        Returns the pydna cutsite pairs bounding each fragment, in fragment order.
+        A single fragment can then be built with self.record.apply_cut(*pair).
+        """
+        return self.record.seq.get_cutsite_pairs(self.cutsites(enzymes))
+
+    def cut(self, enzymes):
+        """
+        Digests the sequence with a set of enzymes (names or Biopython enzyme objects).
+        Returns the tuple of Dseqrecord fragments, empty if nothing cuts.
+        """
+        return tuple(self.record.apply_cut(*pair) for pair in self.cutsite_pairs(enzymes))
+
+
+def _resolve(enzyme):
+    """
+    Returns the Biopython enzyme object for a name or enzyme.
+    """
+    if isinstance(enzyme, str):
+        if not is_known_enzyme(enzyme):
+            raise ValueError(f"Enzyme '{enzyme}' is not recognized.")
+        return load_restriction().__dict__[enzyme]
+    return enzyme
+
+
+@lru_cache(maxsize=128)
+def site_index(sequence, circular=False):
+    """
+    Returns the (cached) RestrictionSiteIndex for a sequence, so repeated digests of the
+    same template reuse a single scan.
+    """
+    return RestrictionSiteIndex(sequence, circular)
@@ -0,0 +1,202 @@
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .construction_file import ConstructionFile
+from .construction_file_simulator import OPERATIONS, SimulationContext, resolve_gene_input
+from .step_cache import DNA_FIELDS, step_key
+from . import tracing
+
+
+def step_inputs(step):
+    """
+    Returns the gene inputs (symbols or sequences) a step reads.
+    """
+    inputs = []
+    for field in DNA_FIELDS:
+        value = getattr(step, field, None)
+        if isinstance(value, (list, tuple)):
+            inputs.extend(value)
+        elif value is not None:
+            inputs.append(value)
+    return inputs
+
+
+def build_step_graph(steps):
+    """
+    Returns, for each step, the set of indices of earlier steps it must wait for.
+
+    A step depends on the latest earlier step producing each of its inputs. A step that
+    redefines a product also waits for the previous producer and for every step that read
+    the previous value, so reordering never changes what a step sees.
+    """
+    last_producer = {}  # product name -> index of the step that last wrote it
+    readers = {}  # product name -> indices of the steps that read the current value
+    dependencies = []
+    for index, step in enumerate(steps):
+        depends_on = set()
+        for name in step_inputs(step):
+            if name in last_producer:
+                depends_on.add(last_producer[name])
+            readers.setdefault(name, []).append(index)
+        # Transform results are not stored as products
+        if step.operation != 'Transform':
+            if step.output in last_producer:
+                depends_on.add(last_producer[step.output])
+            depends_on.update(reader for reader in readers.get(step.output, []) if reader != index)
+            last_producer[step.output] = index
+            readers[step.output] = []
+        dependencies.append(depends_on)
+    return dependencies
+
+
+def critical_path(dependencies, step_times):
+    """
+    Returns the wall-clock time of the longest dependency chain, and the step indices along it,
+    for steps that run as soon as their inputs are ready.
+    """
+    finish = []
+    previous = []
+    for index, depends_on in enumerate(dependencies):
+        before = max(depends_on, key=lambda d: finish[d], default=None)
+        finish.append((finish[before] if before is not None else 0) + step_times[index])
+        previous.append(before)
+    if not finish:
+        return 0, []
+    index = max(range(len(finish)), key=lambda i: finish[i])
+    total = finish[index]
+    path = []
+    while index is not None:
+        path.append(index)
+        index = previous[index]
+    return total, path[::-1]
+
+
+def _resolve_step(step, genes, circular):
+    """
+    Returns a copy of step with every gene input replaced by its sequence from genes, so it
+    can run in another thread or process without reading the session namespace, and the
+    circular flags of the resolved inputs (sequence -> True) for the worker's context.
+    """
+    resolved = copy.copy(step)
+    flags = {}
+    def resolve(item):
+        sequence = resolve_gene_input(item, genes)
+        if circular.get(item, False):
+            flags[sequence] = True
+        return sequence
+    for field in DNA_FIELDS:
+        value = getattr(step, field, None)
+        if isinstance(value, (list, tuple)):
+            setattr(resolved, field, [resolve(item) for item in value])
+        elif value is not None:
+            setattr(resolved, field, resolve(value))
+    return resolved, flags
+
+
+def _timed(perform, step, context):
+    """
+    Runs perform in a worker and returns its result with the start time and duration, so the
+    span can be reported by the scheduling thread.
+    """
+    start = time.time()
+    started = time.perf_counter()
+    result = perform(step, context)
+    return result, start, time.perf_counter() - started
+
+
+def simulate_parallel(constructionFile: ConstructionFile, executor=None, max_workers=None, cache=None, context=None):
+    """
+    Simulate a construction file, running steps that do not depend on each other concurrently.
+
+    Steps are scheduled from the producer/consumer graph of their inputs and outputs and run on
+    executor (a ThreadPoolExecutor with max_workers threads by default; a ProcessPoolExecutor also
+    works since every step is sent with its inputs already resolved). The products, time and cost
+    are identical to simulate(); the fourth value is the critical-path time, i.e. the wall-clock
+    estimate when independent steps are done side by side at the bench. Like simulate(), each
+    call runs in its own SimulationContext unless one is given.
+    """
+    steps = list(constructionFile)
+    for step in steps:
+        if step.operation not in OPERATIONS:
+            raise ValueError(f"Unrecognized operation: {step.operation}")
+    if context is None:
+        context = SimulationContext()
+    genes = context.symbol_to_gene
+    prices = dict(context.reagent_to_price)
+    # Workers only need the prices and the circular flags; their inputs are resolved before submission
+    worker_context = lambda flags: SimulationContext(library={}, prices=prices, circular=flags)
+    trace = tracing.enabled()
+    identity = lambda sequence: sequence
+    for name, sequence in constructionFile.sequences.items():
+        genes[name] = sequence.sequence
+        context.circular[name] = sequence.is_circular
+
+    dependencies = build_step_graph(steps)
+    dependents = [[] for _ in steps]
+    for index, depends_on in enumerate(dependencies):
+        for dependency in depends_on:
+            dependents[dependency].append(index)
+    waiting = [set(depends_on) for depends_on in dependencies]
+    results = [None] * len(steps)
+    running = {}
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        ready = [index for index, depends_on in enumerate(waiting) if not depends_on]
+        while ready or running:
+            finished = []
+            for index in ready:
+                step = steps[index]
+                resolved, flags = _resolve_step(step, genes, context.circular)
+                key = step_key(resolved, identity, prices, flags) if cache is not None else None
+                result = cache.get(key) if cache is not None else None
+                if result is not None:
+                    if trace:
+                        tracing.emit(tracing.Span(step.operation, step.output, time.time(), 0.0,
+                                                  tracing.step_attributes(resolved, identity)))
+                    finished.append((index, result))
+                elif trace:
+                    future = executor.submit(_timed, OPERATIONS[step.operation], resolved, worker_context(flags))
+                    running[future] = (index, key, resolved)
+                else:
+                    future = executor.submit(OPERATIONS[step.operation], resolved, worker_context(flags))
+                    running[future] = (index, key, resolved)
+            ready = []
+
+            if not finished:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, key, resolved = running.pop(future)
+                    result = future.result()
+                    if trace:
+                        result, start, duration = result
+                        tracing.emit(tracing.Span(resolved.operation, resolved.output, start, duration,
+                                                  tracing.step_attributes(resolved, identity)))
+                    if cache is not None:
+                        cache.put(key, result)
+                    finished.append((index, result))
+
+            for index, result in finished:
+                results[index] = result
+                if steps[index].operation != 'Transform':
+                    genes[steps[index].output] = result[0].sequence
+                    context.circular[steps[index].output] = result[0].is_circular
+                for dependent in dependents[index]:
+                    waiting[dependent].discard(index)
+                    if not waiting[dependent]:
+                        ready.append(dependent)
+    except BaseException:
+        for future in running:
+            future.cancel()
+        raise
+    finally:
+        if own_executor:
+            executor.shutdown(wait=True)
+
+    total_time = sum(result[2] for result in results)
+    cost = sum(result[1] for result in results)
+    critical_time, _ = critical_path(dependencies, [result[2] for result in results])
+    return genes, total_time, cost, critical_time
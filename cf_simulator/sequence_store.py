@@ -0,0 +1,331 @@
+import logging
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_right
+from collections import namedtuple
+from collections.abc import Mapping
+
+# Location of one FASTA record, as in a samtools .fai file: sequence length, byte offset of its
+# first base, bases per line and bytes per line (including the line terminator)
+FastaIndexEntry = namedtuple('FastaIndexEntry', ['name', 'length', 'offset', 'line_bases', 'line_width'])
+
+# Location of one 2bit record: sequence length, byte offset of its packed bases and the
+# sorted (start, end) runs of N and of lowercase (soft-masked) bases
+TwoBitEntry = namedtuple('TwoBitEntry', ['name', 'length', 'offset', 'n_blocks', 'mask_blocks'])
+
+TWOBIT_SIGNATURE = 0x1A412743
+
+# 2bit packs four bases per byte, T=0 C=1 A=2 G=3, first base in the high bits
+_TWOBIT_BASES = 'TCAG'
+_TWOBIT_CODES = {base: code for code, base in enumerate(_TWOBIT_BASES)}
+_TWOBIT_BYTES = [''.join(_TWOBIT_BASES[(byte >> shift) & 3] for shift in (6, 4, 2, 0)).encode() for byte in range(256)]
+
+# A region of a stored sequence, 1-based and inclusive as in samtools: "name:start-end"
+_REGION = re.compile(r'^(.*):(\d+)-(\d+)$')
+
+_LINE_BREAKS = b'\r\n'
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceView:
+    """
+    A lazy slice of a stored sequence. Slicing returns another view without reading anything;
+    str(view) reads just the bases it covers.
+    """
+
+    __slots__ = ('_store', '_entry', 'start', 'stop')
+
+    def __init__(self, store, entry, start=0, stop=None):
+        self._store = store
+        self._entry = entry
+        self.start = start
+        self.stop = entry.length if stop is None else stop
+
+    @property
+    def name(self):
+        return self._entry.name
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return str(self)[item]
+            return SequenceView(self._store, self._entry, self.start + start, self.start + max(stop, start))
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("SequenceView index out of range")
+        return self._store._read(self._entry, self.start + item, self.start + item + 1)
+
+    def __str__(self):
+        return self._store._read(self._entry, self.start, self.stop)
+
+    def __repr__(self):
+        return f"SequenceView({self.name!r}, {self.start}, {self.stop})"
+
+
+class SequenceStore(Mapping):
+    """
+    Read-only mapping of sequence name -> SequenceView over an indexed FASTA or a 2bit file.
+
+    The file is memory-mapped and only its index is read when the store is opened, so opening
+    costs the same however large the sequences are. A FASTA file without a samtools .fai index
+    is scanned for its record headers on the first open, and the index is written next to it
+    for later opens (with a warning if it cannot be). Bases are read from the map when a view is
+    converted to str, and only for the region it covers.
+
+    Names are matched case-insensitively, since construction files refer to sequences by
+    lowercase symbol, and "name:start-end" (1-based, inclusive) looks up a region. A store can
+    be the library of a SimulationContext:
+
+        with SequenceStore('registry.2bit') as store:
+            simulate(construction_file, context=SimulationContext(library=store))
+    """
+
+    def __init__(self, path, uppercase=True):
+        self.path = path
+        self.uppercase = uppercase
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._map = b''
+        if self._map[:4] in (struct.pack('<I', TWOBIT_SIGNATURE), struct.pack('>I', TWOBIT_SIGNATURE)):
+            self.format = '2bit'
+            entries = _index_twobit(self._map)
+        else:
+            self.format = 'fasta'
+            index_path = path + '.fai'
+            if os.path.exists(index_path):
+                entries = read_fasta_index(index_path)
+            else:
+                entries = _index_fasta(self._map)
+                try:
+                    _write_fasta_index(index_path, entries)
+                except OSError as e:
+                    logger.warning("Could not write %s (%s); %s will be scanned again on the next open.",
+                                   index_path, e, path)
+        self._entries = {entry.name.lower(): entry for entry in entries}
+
+    def __getitem__(self, name):
+        entry = self._entries.get(name.lower())
+        if entry is not None:
+            return SequenceView(self, entry)
+        match = _REGION.match(name)
+        if match and match.group(1).lower() in self._entries:
+            entry = self._entries[match.group(1).lower()]
+            start, end = int(match.group(2)), int(match.group(3))
+            if not 1 <= start <= end <= entry.length:
+                raise KeyError(f"Region {name} is outside {entry.name} (1-{entry.length}).")
+            return SequenceView(self, entry, start - 1, end)
+        raise KeyError(name)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def entry(self, name):
+        """
+        Returns the index entry of a sequence.
+        """
+        return self._entries[name.lower()]
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _read(self, entry, start, stop):
+        if stop <= start:
+            return ''
+        if isinstance(entry, TwoBitEntry):
+            return self._read_twobit(entry, start, stop)
+        first = entry.offset + (start // entry.line_bases) * entry.line_width + start % entry.line_bases
+        last = entry.offset + ((stop - 1) // entry.line_bases) * entry.line_width + (stop - 1) % entry.line_bases
+        data = self._map[first:last + 1]
+        if entry.line_width != entry.line_bases:
+            data = data.translate(None, _LINE_BREAKS)
+        sequence = data.decode('ascii')
+        return sequence.upper() if self.uppercase else sequence
+
+    def _read_twobit(self, entry, start, stop):
+        packed = self._map[entry.offset + start // 4:entry.offset + (stop + 3) // 4]
+        sequence = bytearray(b''.join(map(_TWOBIT_BYTES.__getitem__, packed))[start % 4:start % 4 + stop - start])
+        for block_start, block_end in _overlapping(entry.n_blocks, start, stop):
+            sequence[block_start - start:block_end - start] = b'N' * (block_end - block_start)
+        if not self.uppercase:
+            for block_start, block_end in _overlapping(entry.mask_blocks, start, stop):
+                sequence[block_start - start:block_end - start] = sequence[block_start - start:block_end - start].lower()
+        return sequence.decode('ascii')
+
+
+def _overlapping(blocks, start, stop):
+    """
+    Yields the parts of the sorted (start, end) blocks that fall within [start, stop).
+    """
+    index = max(bisect_right(blocks, (start, float('inf'))) - 1, 0)
+    for block_start, block_end in blocks[index:]:
+        if block_start >= stop:
+            break
+        if block_end > start:
+            yield max(block_start, start), min(block_end, stop)
+
+
+def read_fasta_index(path):
+    """
+    Returns the FastaIndexEntries of a samtools .fai file.
+    """
+    entries = []
+    with open(path) as handle:
+        for line in handle:
+            fields = line.split('\t')
+            if len(fields) >= 5:
+                entries.append(FastaIndexEntry(fields[0], *(int(field) for field in fields[1:5])))
+    return entries
+
+
+def index_fasta(path, write=True):
+    """
+    Returns the FastaIndexEntries of a FASTA file, writing them to path + '.fai' if write is True
+    so later stores open without scanning. Every record must have lines of equal length, as
+    samtools requires, except its last line.
+    """
+    with open(path, 'rb') as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        entries = _index_fasta(data)
+    if write:
+        _write_fasta_index(path + '.fai', entries)
+    return entries
+
+
+def _write_fasta_index(path, entries):
+    with open(path, 'w') as handle:
+        for entry in entries:
+            handle.write('\t'.join(str(field) for field in entry) + '\n')
+
+
+def _index_fasta(data):
+    """
+    Locates every record of a memory-mapped FASTA file, touching only its header and first
+    lines; sequence lengths follow from the record sizes.
+    """
+    entries = []
+    header = _next_header(data, 0)
+    while header >= 0:
+        line_end = data.find(b'\n', header)
+        if line_end < 0:
+            line_end = len(data)
+        name = data[header + 1:line_end].split(maxsplit=1)
+        offset = line_end + 1
+        header = _next_header(data, offset)
+        end = len(data) if header < 0 else header
+        first_line_end = data.find(b'\n', offset, end)
+        # Trailing line breaks (and blank lines) are not part of the last line
+        while end > offset and data[end - 1] in _LINE_BREAKS:
+            end -= 1
+        if first_line_end < 0:
+            line_bases = line_width = max(end - offset, 1)
+        else:
+            line_width = first_line_end + 1 - offset
+            line_bases = line_width - (2 if data[first_line_end - 1] == ord('\r') else 1)
+        size = max(end - offset, 0)
+        length = (size // line_width) * line_bases + size % line_width
+        entries.append(FastaIndexEntry(name[0].decode() if name else '', length, offset, line_bases, line_width))
+    return entries
+
+
+def _next_header(data, position):
+    """
+    Returns the offset of the first '>' starting a line at or after position, or -1.
+    """
+    if position == 0 and data[:1] == b'>':
+        return 0
+    found = data.find(b'\n>', max(position - 1, 0))
+    return found + 1 if found >= 0 else -1
+
+
+def _index_twobit(data):
+    """
+    Reads the header and record index of a memory-mapped 2bit file.
+    """
+    order = '<' if data[:4] == struct.pack('<I', TWOBIT_SIGNATURE) else '>'
+    _, version, count, _ = struct.unpack_from(order + 'IIII', data, 0)
+    if version != 0:
+        raise ValueError(f"Unsupported 2bit version {version}.")
+    position = 16
+    entries = []
+    for _ in range(count):
+        name_size = data[position]
+        name = bytes(data[position + 1:position + 1 + name_size]).decode()
+        (offset,) = struct.unpack_from(order + 'I', data, position + 1 + name_size)
+        position += 5 + name_size
+
+        length, n_count = struct.unpack_from(order + 'II', data, offset)
+        offset += 8
+        n_blocks = _read_blocks(data, order, offset, n_count)
+        offset += 8 * n_count
+        (mask_count,) = struct.unpack_from(order + 'I', data, offset)
+        offset += 4
+        mask_blocks = _read_blocks(data, order, offset, mask_count)
+        offset += 8 * mask_count + 4  # reserved word
+        entries.append(TwoBitEntry(name, length, offset, n_blocks, mask_blocks))
+    return entries
+
+
+def _read_blocks(data, order, offset, count):
+    starts = struct.unpack_from(f"{order}{count}I", data, offset)
+    sizes = struct.unpack_from(f"{order}{count}I", data, offset + 4 * count)
+    return [(start, start + size) for start, size in zip(starts, sizes)]
+
+
+def write_twobit(path, records):
+    """
+    Writes (name, sequence) records to a 2bit file. Runs of anything other than ACGT are stored
+    as N and lowercase runs as soft-masked blocks.
+    """
+    records = [(name, sequence) for name, sequence in records]
+    header_size = 16 + sum(5 + len(name.encode()) for name, _ in records)
+    bodies = []
+    offset = header_size
+    index = bytearray(struct.pack('<IIII', TWOBIT_SIGNATURE, 0, len(records), 0))
+    for name, sequence in records:
+        encoded = name.encode()
+        index += struct.pack('<B', len(encoded)) + encoded + struct.pack('<I', offset)
+        body = _twobit_record(sequence)
+        bodies.append(body)
+        offset += len(body)
+    with open(path, 'wb') as handle:
+        handle.write(index)
+        for body in bodies:
+            handle.write(body)
+
+
+def _twobit_record(sequence):
+    n_blocks = [match.span() for match in re.finditer(r'[^ACGTacgt]+', sequence)]
+    mask_blocks = [match.span() for match in re.finditer(r'[a-z]+', sequence)]
+    upper = sequence.upper()
+    packed = bytearray()
+    for start in range(0, len(upper), 4):
+        byte = 0
+        for position, base in enumerate(upper[start:start + 4].ljust(4, 'T')):
+            byte |= _TWOBIT_CODES.get(base, 0) << (6 - 2 * position)
+        packed.append(byte)
+    blocks = b''
+    for spans in (n_blocks, mask_blocks):
+        blocks += struct.pack(f'<I{len(spans)}I{len(spans)}I', len(spans), *(start for start, _ in spans),
+                              *(end - start for start, end in spans))
+    return struct.pack('<I', len(sequence)) + blocks + struct.pack('<I', 0) + bytes(packed)
@@ -0,0 +1,458 @@
+"""
+An asyncio HTTP/JSON-RPC 2.0 front-end for simulate().
+
+    python -m cf_simulator.service --port 8080 --workers 4
+
+POST a JSON-RPC request (or a batch of them) to / and GET /metrics for the service's statistics:
+
+    {"jsonrpc": "2.0", "id": 1, "method": "simulate",
+     "params": {"construction_file": "oligo fwd ATGC\\n...", "timeout": 10}}
+
+construction_file is shorthand, JSON text or a JSON object. The result is
+{"sequences": {name: sequence}, "time": ..., "cost": ...}, as in wrapper/simulate.json.
+
+Requests are queued and sent to a bounded process pool in micro-batches: the first queued request
+waits up to batch_delay seconds for others to join it, up to max_batch per batch, and at most two
+batches per worker are in flight. When max_queue requests are waiting, new ones are refused with a
+"busy" error (HTTP 503) rather than queued. A request that misses its timeout is answered with a
+timeout error and dropped from its batch if it has not started, as are the requests of a client
+that disconnects before its answer; a simulation already running in a worker is not interrupted,
+and its result is discarded.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .batch import _simulate_source
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 16
+DEFAULT_BATCH_DELAY = 0.005
+DEFAULT_MAX_QUEUE = 1024
+DEFAULT_TIMEOUT = 60.0
+LATENCY_WINDOW = 4096
+DISCONNECT_POLL = 0.05
+MAX_BODY_BYTES = 64 << 20
+
+# JSON-RPC 2.0 error codes; -32000 to -32099 are left for the server
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SIMULATION_ERROR = -32000
+SERVER_BUSY = -32001
+REQUEST_TIMEOUT = -32002
+
+HTTP_REASONS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+                405: 'Method Not Allowed', 413: 'Payload Too Large', 503: 'Service Unavailable'}
+
+
+class ServiceBusy(Exception):
+    """
+    Raised when the request queue is full.
+    """
+
+
+class RPCError(Exception):
+    """
+    A JSON-RPC error to return to the caller.
+    """
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _simulate_batch(batch):
+    """
+    Runs in a worker: parses and simulates each (index, construction file) pair of a batch.
+    """
+    return [_simulate_source(index, source) for index, source in batch]
+
+
+def percentile(sorted_values, fraction):
+    """
+    Returns the nearest-rank percentile (fraction in [0, 1]) of already sorted values, or None.
+    """
+    if not sorted_values:
+        return None
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class SimulationService:
+    """
+    Serves simulate() over HTTP/JSON-RPC, batching concurrent requests onto a process pool.
+
+    executor defaults to a ProcessPoolExecutor with workers processes (os.cpu_count() by default);
+    one given here is not shut down by close(). Use as an async context manager, or call start()
+    and close().
+    """
+
+    def __init__(self, workers=None, max_batch=DEFAULT_MAX_BATCH, batch_delay=DEFAULT_BATCH_DELAY,
+                 max_queue=DEFAULT_MAX_QUEUE, timeout=DEFAULT_TIMEOUT, executor=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.batch_delay = batch_delay
+        self.timeout = timeout
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._slots = None
+        self._batcher = None
+        self._batches = set()
+        self._server = None
+        self._connections = set()
+        self._next_index = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counts = {'requests': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'timed_out': 0,
+                        'cancelled': 0, 'batches': 0, 'batched_requests': 0}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Starts the worker pool, the batcher and the HTTP server; port 0 picks a free port.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._slots = asyncio.Semaphore(2 * self.workers)
+        self._batcher = asyncio.create_task(self._run_batches())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        logger.info("Simulation service listening on %s:%d", *self.address)
+
+    @property
+    def address(self):
+        """
+        The (host, port) the server listens on.
+        """
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """
+        Stops accepting connections, cancels queued requests and shuts the worker pool down.
+        """
+        if self._server is not None:
+            self._server.close()
+            # Closing the open connections ends their handlers at their next read
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            future.cancel()
+        await asyncio.gather(*self._batches, return_exceptions=True)
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def simulate(self, construction_file, timeout=None):
+        """
+        Queues one construction file (shorthand, JSON text or a decoded JSON dict) and returns its
+        SimulationRecord. Raises ServiceBusy if the queue is full and TimeoutError after timeout
+        seconds (the service default when None).
+        """
+        self._counts['requests'] += 1
+        future = asyncio.get_running_loop().create_future()
+        index = self._next_index
+        self._next_index += 1
+        try:
+            self._queue.put_nowait((index, construction_file, future))
+        except asyncio.QueueFull:
+            self._counts['rejected'] += 1
+            raise ServiceBusy(f"Request queue is full ({self._queue.maxsize} waiting)") from None
+        started = time.perf_counter()
+        try:
+            record = await asyncio.wait_for(future, self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            self._counts['timed_out'] += 1
+            raise
+        except asyncio.CancelledError:
+            # The caller gave up (its client disconnected); the request is dropped if still queued
+            self._counts['cancelled'] += 1
+            raise
+        self._latencies.append(time.perf_counter() - started)
+        self._counts['completed' if record.error is None else 'failed'] += 1
+        return record
+
+    def stats(self):
+        """
+        Returns the service counters, queue depth, batches in flight, mean batch size and the
+        p50/p90/p99/max latency in milliseconds of the most recent requests.
+        """
+        latencies = sorted(self._latencies)
+        counts = dict(self._counts)
+        batched = counts.pop('batched_requests')
+        return {
+            **counts,
+            'queue_depth': self._queue.qsize(),
+            'batches_in_flight': len(self._batches),
+            'mean_batch_size': batched / counts['batches'] if counts['batches'] else None,
+            'latency_ms': {name: None if value is None else round(value * 1000, 3) for name, value in (
+                ('p50', percentile(latencies, 0.5)), ('p90', percentile(latencies, 0.9)),
+                ('p99', percentile(latencies, 0.99)), ('max', latencies[-1] if latencies else None))},
+        }
+
+    # Batching
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.max_batch:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            # Requests cancelled or timed out while queued are dropped before they reach a worker
+            batch = [item for item in batch if not item[2].done()]
+            if not batch:
+                continue
+            # Wait for a free slot in the pool; meanwhile the queue fills and then refuses requests
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch):
+        self._counts['batches'] += 1
+        self._counts['batched_requests'] += len(batch)
+        futures = {index: future for index, _, future in batch}
+        try:
+            records = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _simulate_batch, [(index, source) for index, source, _ in batch])
+        except Exception as e:
+            logger.exception("Simulation batch of %d requests failed", len(batch))
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        for record in records:
+            future = futures[record.index]
+            if not future.done():
+                future.set_result(record)
+
+    # JSON-RPC
+
+    async def _call(self, request):
+        """
+        Answers one decoded JSON-RPC request; returns None for notifications.
+        """
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or 'method' not in request:
+            return _error_response(None, INVALID_REQUEST, "Invalid JSON-RPC 2.0 request")
+        request_id = request.get('id')
+        try:
+            result = await self._dispatch(request['method'], request.get('params', {}))
+        except RPCError as e:
+            response = _error_response(request_id, e.code, e.message)
+        except Exception as e:
+            logger.exception("JSON-RPC method %s failed", request['method'])
+            response = _error_response(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        else:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        return response if 'id' in request else None
+
+    async def _dispatch(self, method, params):
+        if method == 'stats':
+            return self.stats()
+        if method != 'simulate':
+            raise RPCError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+        if isinstance(params, list):
+            params = dict(zip(('construction_file', 'timeout'), params))
+        construction_file = params.get('construction_file') if isinstance(params, dict) else None
+        timeout = params.get('timeout') if isinstance(params, dict) else None
+        if not isinstance(construction_file, (str, dict)) or not (timeout is None or (
+                isinstance(timeout, (int, float)) and not isinstance(timeout, bool) and timeout > 0)):
+            raise RPCError(INVALID_PARAMS, "simulate takes construction_file (a string or object) "
+                                           "and an optional positive timeout")
+        try:
+            record = await self.simulate(construction_file, timeout)
+        except ServiceBusy as e:
+            raise RPCError(SERVER_BUSY, str(e)) from None
+        except asyncio.TimeoutError:
+            raise RPCError(REQUEST_TIMEOUT, "Simulation timed out") from None
+        if record.error is not None:
+            raise RPCError(SIMULATION_ERROR, record.error)
+        return {'sequences': record.products, 'time': record.time, 'cost': record.cost}
+
+    async def _handle_body(self, body):
+        """
+        Returns the HTTP status and JSON-RPC response (None for nothing to send) for a POST body.
+        """
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return 400, _error_response(None, PARSE_ERROR, "Request body is not valid JSON")
+        if isinstance(request, list):
+            if not request:
+                return 400, _error_response(None, INVALID_REQUEST, "Empty batch")
+            responses = [response for response in await asyncio.gather(*map(self._call, request))
+                         if response is not None]
+            return (200, responses) if responses else (204, None)
+        response = await self._call(request)
+        if response is None:
+            return 204, None
+        busy = 'error' in response and response['error']['code'] == SERVER_BUSY
+        return (503 if busy else 200), response
+
+    # HTTP
+
+    async def _handle_connection(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                request = await _read_http_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body, keep_alive = request
+                if path.split('?')[0] == '/metrics':
+                    status, payload = (200, self.stats()) if method == 'GET' else (405, None)
+                elif path.split('?')[0] in ('/', '/rpc'):
+                    if method != 'POST':
+                        status, payload = 405, None
+                    elif body is None:
+                        status, payload = 413, None
+                        keep_alive = False
+                    else:
+                        handler = asyncio.create_task(self._handle_body(body))
+                        if not await _until_done_or_disconnected(handler, reader):
+                            logger.info("Client disconnected; cancelled its pending request")
+                            break
+                        status, payload = handler.result()
+                else:
+                    status, payload = 404, None
+                _write_http_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # The client went away or sent something that is not HTTP
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+async def _until_done_or_disconnected(task, reader):
+    """
+    Waits for task, cancelling it if the client closes the connection first (checked every
+    DISCONNECT_POLL seconds without consuming pipelined requests). Returns whether it finished.
+    """
+    while True:
+        try:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if done:
+            return True
+        if reader.at_eof():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return False
+
+
+def _error_response(request_id, code, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+async def _read_http_request(reader):
+    """
+    Reads one HTTP/1.x request: (method, path, headers, body, keep_alive), or None at end of stream.
+    body is None when it is larger than MAX_BODY_BYTES.
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, path, version = request_line.decode('latin-1').split()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+    if length > MAX_BODY_BYTES:
+        return method, path, headers, None, False
+    body = await reader.readexactly(length) if length else b''
+    return method, path, headers, body, keep_alive
+
+
+def _write_http_response(writer, status, payload, keep_alive):
+    body = b'' if payload is None else json.dumps(payload).encode()
+    head = [f"HTTP/1.1 {status} {HTTP_REASONS[status]}", f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if body:
+        head.append("Content-Type: application/json")
+    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+
+
+async def serve(host='127.0.0.1', port=8080, **options):
+    """
+    Runs a SimulationService until cancelled; options are passed to SimulationService.
+    """
+    service = SimulationService(**options)
+    await service.start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    """
+    Command line entry point: serves simulate() over HTTP/JSON-RPC until interrupted.
+    """
+    parser = argparse.ArgumentParser(description="Serve construction file simulations over HTTP/JSON-RPC.")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on")
+    parser.add_argument('--port', type=int, default=8080, help="port to listen on")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH, help="requests per batch")
+    parser.add_argument('--batch-delay', type=float, default=DEFAULT_BATCH_DELAY,
+                        help="seconds a request waits for others to batch with")
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help="queued requests before new ones are refused")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="default seconds per request")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, max_batch=args.max_batch,
+                          batch_delay=args.batch_delay, max_queue=args.max_queue, timeout=args.timeout))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
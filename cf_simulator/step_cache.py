@@ -0,0 +1,179 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from .polynucleotide import Polynucleotide
+
+# Bump whenever a perform_* function changes its output, so stale cache entries are not reused;
+# tests/test_step_cache.py records a digest of the simulated output for each version
+SIMULATOR_VERSION = "6"
+
+# Step attributes that name DNA inputs; these are keyed by the hash of the resolved sequence
+DNA_FIELDS = {'dna', 'dnas', 'template', 'forward_oligo', 'reverse_oligo'}
+
+POLYNUCLEOTIDE_FIELDS = ['sequence', 'ext5', 'ext3', 'is_double_stranded', 'is_circular', 'mod_ext5', 'mod_ext3']
+
+
+def _hash_sequence(sequence):
+    return hashlib.sha256(sequence.encode()).hexdigest()
+
+
+def step_key(step, resolve, prices=None, circular=None):
+    """
+    Returns the content-addressed cache key for a step.
+
+    The key covers the operation, every parameter of the step, the hash of each resolved
+    input sequence (so renamed inputs with the same sequence still hit) and SIMULATOR_VERSION.
+    The output name is left out except for Transform, whose result text includes it.
+    resolve maps a gene input (symbol or sequence) to its sequence. When prices is given (a
+    session's reagent_to_price) it is part of the key, since it changes the predicted cost.
+    circular (a session's circular flags, name -> bool) marks the inputs that are circular, since
+    a plasmid and a linear fragment with the same sequence give different products.
+    """
+    def input_key(item):
+        digest = _hash_sequence(resolve(item))
+        return digest + ':circular' if circular is not None and circular.get(item, False) else digest
+
+    fields = {}
+    for name, value in vars(step).items():
+        if name == 'output' and step.operation != 'Transform':
+            continue
+        if name in DNA_FIELDS:
+            if isinstance(value, (list, tuple)):
+                value = [input_key(item) for item in value]
+            else:
+                value = input_key(value)
+        fields[name] = value
+    if prices is not None:
+        fields['prices'] = dict(prices)
+    payload = json.dumps([SIMULATOR_VERSION, fields], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def encode_result(result):
+    """
+    Serializes a (product, cost, time) step result to canonical JSON bytes.
+    """
+    product, cost, time = result
+    if isinstance(product, Polynucleotide):
+        product = {field: getattr(product, field) for field in POLYNUCLEOTIDE_FIELDS}
+    return json.dumps([product, cost, time], sort_keys=True, separators=(',', ':')).encode()
+
+
+def decode_result(data):
+    """
+    Rebuilds a (product, cost, time) step result from encode_result output.
+    """
+    product, cost, time = json.loads(data)
+    if isinstance(product, dict):
+        product = Polynucleotide(*(product[field] for field in POLYNUCLEOTIDE_FIELDS))
+    return product, cost, time
+
+
+class StepCache:
+    """
+    Two-tier cache of simulation step results.
+
+    The memory tier is an LRU of encoded results evicted by total size in bytes. The optional
+    disk tier is a SQLite database that survives across processes; entries found there are
+    promoted to memory. Results are stored encoded, so every hit returns a fresh object that
+    is byte-identical to a recomputed result.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, path=None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS step_results (key TEXT PRIMARY KEY, result BLOB)")
+            self._db.commit()
+
+    def get(self, key):
+        """
+        Returns the cached result for key, or None on a miss.
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return decode_result(data)
+            if self._db is not None:
+                row = self._db.execute("SELECT result FROM step_results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._remember(key, bytes(row[0]))
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return decode_result(row[0])
+            self.misses += 1
+            return None
+
+    def put(self, key, result):
+        """
+        Stores a step result in memory and, when configured, on disk.
+        """
+        data = encode_result(result)
+        with self._lock:
+            self._remember(key, data)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO step_results VALUES (?, ?)", (key, data))
+                self._db.commit()
+
+    def _remember(self, key, data):
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        if len(data) > self.max_bytes:
+            return
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def run(self, step, perform, resolve, prices=None, circular=None):
+        """
+        Returns the result of perform(step), from the cache when the same step has been
+        simulated before with the same input sequences (and prices and circular flags, when given).
+        """
+        key = step_key(step, resolve, prices, circular)
+        result = self.get(key)
+        if result is None:
+            result = perform(step)
+            self.put(key, result)
+        return result
+
+    def stats(self):
+        """
+        Returns the hit/miss counters and memory usage as a dict.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._size,
+            }
+
+    def clear(self):
+        """
+        Empties the memory tier and resets the counters (the disk tier is kept).
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.disk_hits = self.misses = 0
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import namedtuple
+
+from .step_cache import DNA_FIELDS
+
+# One traced step: the operation name, its output, when it started (seconds since the epoch),
+# how long it took (seconds) and a dict of attributes (input sequence lengths, enzymes).
+Span = namedtuple('Span', ['name', 'output', 'start', 'duration', 'attributes'])
+
+# Callables receiving every Span; simulate() only measures steps while this is non-empty
+_hooks = []
+_hooks_lock = threading.Lock()
+
+
+def enabled():
+    """
+    True if any span hook is attached.
+    """
+    return bool(_hooks)
+
+
+def add_span_hook(hook):
+    """
+    Calls hook(span) for every step simulated from now on, from the thread that ran the step.
+    """
+    with _hooks_lock:
+        _hooks.append(hook)
+
+
+def remove_span_hook(hook):
+    with _hooks_lock:
+        _hooks.remove(hook)
+
+
+def step_attributes(step, resolve):
+    """
+    Returns the span attributes of a step: the length of each resolved input sequence and,
+    for Digest and GoldenGate, the enzymes.
+    """
+    attributes = {}
+    lengths = []
+    for field in sorted(DNA_FIELDS):
+        value = getattr(step, field, None)
+        if isinstance(value, (list, tuple)):
+            lengths.extend(len(resolve(item)) for item in value)
+        elif value is not None:
+            lengths.append(len(resolve(value)))
+    attributes['input_lengths'] = lengths
+    for field in ('enzyme', 'enzymes'):
+        if hasattr(step, field):
+            attributes[field] = getattr(step, field)
+    return attributes
+
+
+def emit(span):
+    """
+    Sends a span to every attached hook.
+    """
+    for hook in list(_hooks):
+        hook(span)
+
+
+def traced(step, run, resolve):
+    """
+    Returns run(step), reporting a Span for it to the attached hooks.
+    """
+    attributes = step_attributes(step, resolve)
+    start = time.time()
+    started = time.perf_counter()
+    try:
+        return run(step)
+    finally:
+        emit(Span(step.operation, step.output, start, time.perf_counter() - started, attributes))
+
+
+class SpanCollector:
+    """
+    Collects the spans of every step simulated while it is active.
+
+        with SpanCollector() as collector:
+            simulate(construction_file)
+        for span in collector.spans:
+            ...
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def __call__(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def __enter__(self):
+        add_span_hook(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        remove_span_hook(self)
@@ -0,0 +1,53 @@
+import pytest
+from bio_functions import reverse_complement, translate, reverse_complement_many, translate_many
+
+def test_reverse_complement_many_matches_single():
+    # Batch results should match the single-sequence function
+    sequences = ["ATGC", "GCTAGC", "AATTCCGG", ""]
+    results, errors = reverse_complement_many(sequences)
+    assert results == [reverse_complement(seq) for seq in sequences], "Batch reverse complement mismatch"
+    assert errors == {}, "Unexpected errors for valid sequences"
+
+def test_translate_many_matches_single():
+    # Batch results should match the single-sequence function, including stop codons
+    sequences = ["ATGGCTTCCTCCGAAGACGTTATCAAAGAGTTCATGTAA", "ATGTAA", "TGGATATAG", ""]
+    results, errors = translate_many(sequences)
+    assert results == [translate(seq) for seq in sequences], "Batch translation mismatch"
+    assert errors == {}, "Unexpected errors for valid sequences"
+
+def test_batch_collects_per_sequence_errors():
+    # Invalid sequences are reported by position without stopping the batch
+    results, errors = translate_many(["ATGGCC", "ATGXCC", "ATGGC", "TGG"])
+    assert results == ["MA", None, None, "W"], "Valid sequences should still be translated"
+    assert set(errors) == {1, 2}, "Errors should be keyed by input position"
+    assert isinstance(errors[1], ValueError) and "invalid characters" in str(errors[1])
+    assert isinstance(errors[2], ValueError) and "not a multiple of three" in str(errors[2])
+
+    results, errors = reverse_complement_many(["ATGC", "ATGGNC"])
+    assert results == ["GCAT", None], "Valid sequences should still be reverse complemented"
+    assert list(errors) == [1], "Invalid sequence not reported"
+
+def test_batch_bytes_buffer():
+    # A newline-separated bytes buffer comes back as a bytes buffer
+    results, errors = reverse_complement_many(b"ATGC\nATN\nAATTCCGG")
+    assert results == b"GCAT\n\nCCGGAATT", "Bytes buffer reverse complement mismatch"
+    assert list(errors) == [1], "Invalid record not reported"
+
+    results, errors = translate_many([b"ATGGCC", "TGG"])
+    assert results == [b"MA", "W"], "Bytes elements should translate to bytes"
+
+def test_batch_numpy_array_keeps_shape():
+    # NumPy arrays come back with the same shape, keyed by multi-index on error
+    np = pytest.importorskip("numpy")
+    sequences = np.array([["ATGGCC", "TTT"], ["AAN", ""]])
+    results, errors = translate_many(sequences)
+    assert results.shape == (2, 2), "Array shape not preserved"
+    assert results.tolist() == [["MA", "F"], ["", ""]], "Array translation mismatch"
+    assert list(errors) == [(1, 0)], "Array errors should use the element index"
+
+def test_batch_large_library():
+    # Batches of many sequences match looping over the single functions
+    bases = "ATCG"
+    sequences = ["".join(bases[(i * 7 + j * 3) % 4] for j in range(60 + i % 3 * 3)) for i in range(500)]
+    assert reverse_complement_many(sequences)[0] == [reverse_complement(seq) for seq in sequences]
+    assert translate_many(sequences)[0] == [translate(seq) for seq in sequences]
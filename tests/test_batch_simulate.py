@@ -0,0 +1,47 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import json
+import pytest
+from cf_simulator.construction_file import ConstructionFile, PCR, Ligate
+from cf_simulator.construction_file_simulator import simulate
+from cf_simulator.polynucleotide import dsDNA
+from cf_simulator.batch import simulate_many, main
+
+def make_construction_file(n):
+    steps = [PCR("ATGC", "CGTA", "template", "pcrproduct"), Ligate(["pcrproduct", "lacz"], "ligproduct")]
+    return ConstructionFile(steps, {"template": dsDNA("A" * n)})
+
+def make_bad_file():
+    return ConstructionFile([Ligate(["missing"], "ligproduct")], {})
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_results_match_simulate(workers):
+    # Every file gets the same products, time and cost as simulate(), in input order
+    files = [make_construction_file(n) for n in range(1, 30)]
+    records = list(simulate_many(files, workers=workers, chunksize=4))
+    assert [record.index for record in records] == list(range(len(files)))
+    for record, construction_file in zip(records, files):
+        genes, time, cost = simulate(construction_file)
+        assert record.error is None
+        assert record.products["ligproduct"] == genes["ligproduct"]
+        assert (record.time, record.cost) == (time, cost)
+
+def test_bad_file_gives_error_record():
+    # A failing file yields an error record and the rest of the batch still runs
+    files = [make_construction_file(5), make_bad_file(), make_construction_file(6)]
+    records = sorted(simulate_many(files, workers=2, chunksize=1, ordered=False), key=lambda r: r.index)
+    assert [record.error is None for record in records] == [True, False, True]
+    assert "missing" in records[1].error and records[1].products is None
+
+def test_cli_reads_files(tmp_path, capsys):
+    # The CLI parses shorthand files in the workers and writes JSON lines
+    good = tmp_path / "good.txt"
+    good.write_text("oligo fwd ATGC\noligo rev CGTA\npcr fwd rev lacz pcrout\n")
+    bad = tmp_path / "bad.txt"
+    bad.write_text("pcr fwd\n")
+    assert main([str(good), str(bad), "--workers", "1"]) == 1
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert lines[0]["source"] == str(good) and lines[0]["products"]["pcrout"].startswith("ATGCATGACC")
+    assert lines[1]["error"].startswith("ValueError")
@@ -0,0 +1,25 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../benchmarks')))
+
+import json
+from run import BENCHMARKS, run_benchmarks, compare, digest_sequence
+
+def test_workloads_build():
+    # Every benchmark builds its smallest workload and runs it once
+    for name, (params, limit, function) in BENCHMARKS.items():
+        if name != 'simulate_many':
+            function(params[0])()
+
+def test_results_document_and_compare():
+    # Results are JSON-serializable and comparable with an earlier run
+    document = run_benchmarks('^reverse_complement$', quick=True, repeat=1, report=lambda line: None)
+    document = json.loads(json.dumps(document))
+    assert [result['param'] for result in document['results']] == [1000, 10000]
+    assert document['meta']['quick'] is True
+    lines = compare(document, document)
+    assert len(lines) == 2 and all("1.00x" in line for line in lines)
+
+def test_digest_sequence_has_sites():
+    sequence = digest_sequence(1000)
+    assert len(sequence) == 1000 and "GAATTC" in sequence and "GGATCC" in sequence
@@ -0,0 +1,104 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../benchmarks')))
+
+import io
+import json
+import random
+import pytest
+from cf_simulator import binary_format
+from cf_simulator.binary_format import dumps, loads, dump, load, SimulationResult, encode_step_result, decode_step_result
+from cf_simulator.construction_file import ConstructionFile, PCR, Digest, Ligate, GoldenGate, Gibson, Transform
+from cf_simulator.construction_file_simulator import simulate, SimulationContext
+from cf_simulator.polynucleotide import Polynucleotide, dsDNA, oligo, plasmid
+from bench_binary_format import FormatTimes, measure_formats, check
+
+def random_sequence(length, seed, alphabet="ACGT"):
+    return ''.join(random.Random(seed).choices(alphabet, k=length))
+
+BACKBONE = random_sequence(5000, 1)
+
+def construction_file():
+    return ConstructionFile([
+        PCR("ATGCATGCATGCATGCAT", "GGCCGGCCGGCCAATT", "backbone", "pcr", product_size=520),
+        Digest("pcr", ["EcoRI", "BamHI"], -1, "dig"),
+        Ligate(["dig", "GGATCC"], "lig"),
+        GoldenGate(["lig", "insert", BACKBONE], "BsaI", "gg"),
+        Gibson(["gg", "insert"], "gib"),
+        Transform("gib", "Mach1", ["Amp", "Zeo"], "xfm", 37.5),
+    ], {
+        "backbone": plasmid(BACKBONE),
+        "insert": dsDNA(BACKBONE),
+        "primer": oligo("ATGCATGCATGCATGCAT"),
+        "degenerate": Polynucleotide("ACGTNNRYKM", "AATT", "-GATC", True, False, "phosphate", None),
+        "odd": dsDNA("ACGU*"),
+    })
+
+def step_fields(step):
+    return type(step).__name__, vars(step)
+
+def test_construction_file_round_trip():
+    original = construction_file()
+    loaded = loads(dumps(original))
+    assert [step_fields(step) for step in loaded.steps] == [step_fields(step) for step in original.steps]
+    assert loaded.sequences == original.sequences
+
+def test_output_is_reproducible_and_compact():
+    data = dumps(construction_file())
+    assert data == dumps(construction_file())
+    assert data[:4] == binary_format.MAGIC and data[4] == binary_format.FORMAT_VERSION
+    # The 5 kb backbone is referenced three times but stored once, at 2 bits per base
+    assert len(data) < 5000 / 4 + 400
+
+def test_sequence_encodings():
+    for sequence in ["", "A", "ACGTA", random_sequence(1001, 2), random_sequence(999, 3, "ACGTNRYKMSWBDHV"), "acgt"]:
+        assert loads(dumps(dsDNA(sequence))) == dsDNA(sequence)
+    # Every padding length, in both packed encodings
+    for length in range(1, 10):
+        for alphabet in ["ACGT", "ACGTN"]:
+            sequence = random_sequence(length, length, alphabet)
+            assert loads(dumps(dsDNA(sequence))).sequence == sequence
+
+def test_packed_layout():
+    # The first base goes in the high bits of a byte, the last byte is padded with A (2-bit) or = (4-bit)
+    packed = bytearray()
+    binary_format._write_sequence(packed, "ACGTAC")
+    assert bytes(packed) == bytes([0, 6, 0b00011011, 0b00010000])
+    packed = bytearray()
+    binary_format._write_sequence(packed, "NAC")
+    assert bytes(packed) == bytes([1, 3, 0xF1, 0x20])
+
+def test_faster_than_json():
+    # A 1 Mb template dumps and loads faster than as JSON, as in benchmarks/bench_binary_format.py
+    assert check(measure_formats(1000000, number=3, repeat=3)) == []
+    assert check([FormatTimes('loads', 2.0, 1.0)]) == ["binary loads takes 2000.00 ms, JSON 1000.00 ms"]
+
+def test_simulation_result_round_trip():
+    with SimulationContext() as context:
+        _, time, cost = simulate(ConstructionFile([Ligate(["backbone", "GGATCC"], "lig")], {"backbone": dsDNA(BACKBONE)}),
+                                 context=context)
+        result = SimulationResult(dict(context.products), time, cost)
+        data = dumps(result)
+    loaded = loads(data)
+    assert loaded == SimulationResult({"backbone": BACKBONE, "lig": BACKBONE + "GGATCC"}, time, cost)
+    # Far smaller than the same result as JSON text
+    assert len(data) * 3 < len(json.dumps({name: str(sequence) for name, sequence in result.products.items()}))
+
+def test_step_results_and_files():
+    for result in [(dsDNA("ACGT"), 40, 45), ("Transformation successful", 58, 45.5)]:
+        assert decode_step_result(encode_step_result(result)) == result
+    handle = io.BytesIO()
+    dump(plasmid(BACKBONE), handle)
+    handle.seek(0)
+    assert load(handle) == plasmid(BACKBONE)
+
+def test_rejects_foreign_data():
+    with pytest.raises(ValueError):
+        loads(b"not a binary file")
+    data = bytearray(dumps(dsDNA("ACGT")))
+    data[4] = binary_format.FORMAT_VERSION + 1
+    with pytest.raises(ValueError):
+        loads(bytes(data))
+    with pytest.raises(TypeError):
+        dumps({"a": 1})
@@ -0,0 +1,83 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import json
+import socket
+import threading
+import pytest
+from cf_simulator.construction_file_simulator import simulate
+from cf_simulator.parse_CF_shorthand import parse_CF_shorthand
+from cf_simulator.daemon import (SimulationDaemon, DaemonClient, DaemonUnavailable, simulate_sources,
+                                 is_running, main)
+
+SHORTHAND = "oligo fwd ATGC\noligo rev CGTA\npcr fwd rev lacz pcrout\nligate pcrout fwd ligout\n"
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "sim.sock")
+
+def test_daemon_matches_in_process(socket_path):
+    # Records from the daemon match simulate() and the in-process fallback
+    genes, time, cost = simulate(parse_CF_shorthand(SHORTHAND))
+    with SimulationDaemon(socket_path):
+        remote = list(simulate_sources([SHORTHAND, "pcr fwd\n"], socket_path, fallback=False))
+    local = list(simulate_sources([SHORTHAND, "pcr fwd\n"], socket_path))
+    assert remote == local
+    assert remote[0].products["ligout"] == genes["ligout"] and (remote[0].time, remote[0].cost) == (time, cost)
+    assert remote[1].error.startswith("ValueError") and remote[1].index == 1
+
+def test_concurrent_clients_share_daemon(socket_path):
+    # Several clients, each on its own connection, are served at once without seeing each other's products
+    results = {}
+    def client(name):
+        with DaemonClient(socket_path) as connection:
+            source = SHORTHAND.replace("ligout", name)
+            results[name] = [connection.simulate(source) for _ in range(3)]
+    with SimulationDaemon(socket_path) as daemon:
+        threads = [threading.Thread(target=client, args=(f"lig{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert daemon.status()["requests"] == 12
+    for name, records in results.items():
+        assert all(set(record.products) == {"fwd", "rev", "pcrout", name} for record in records)
+
+def test_no_daemon(socket_path):
+    # Without a daemon, clients fail fast and callers can refuse the fallback
+    assert not is_running(socket_path)
+    with pytest.raises(DaemonUnavailable):
+        DaemonClient(socket_path)
+    with pytest.raises(DaemonUnavailable):
+        list(simulate_sources([SHORTHAND], socket_path, fallback=False))
+
+def test_stale_socket_replaced_and_live_socket_refused(socket_path):
+    # A socket file with nobody listening is replaced; a second daemon on a live socket is refused
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(socket_path)
+    stale.close()
+    with SimulationDaemon(socket_path):
+        assert is_running(socket_path)
+        with pytest.raises(RuntimeError):
+            SimulationDaemon(socket_path).start()
+    assert not os.path.exists(socket_path), "The socket is removed on shutdown"
+
+def test_cli_run_and_stop(socket_path, tmp_path, capsys):
+    # run uses the daemon when one is up, stop shuts it down, and run then falls back in-process
+    design = tmp_path / "design.txt"
+    design.write_text(SHORTHAND)
+    daemon = SimulationDaemon(socket_path)
+    daemon.start()
+    server = threading.Thread(target=daemon.serve_forever)
+    server.start()
+    assert main(["--socket", socket_path, "run", str(design)]) == 0
+    assert main(["--socket", socket_path, "stop"]) == 0
+    server.join(10)
+    assert not server.is_alive()
+    assert main(["--socket", socket_path, "run", str(design)]) == 0
+    assert main(["--socket", socket_path, "run", "--no-fallback", str(design)]) == 1
+    lines = capsys.readouterr().out.splitlines()
+    records = [json.loads(line) for line in lines if '"products"' in line]
+    assert len(records) == 2 and records[0] == records[1]
+    assert records[0]["source"] == str(design) and "ligout" in records[0]["products"]
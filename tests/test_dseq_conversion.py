@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import random
+import pytest
+from pydna.dseq import Dseq
+from cf_simulator.polynucleotide import Polynucleotide, dsDNA, plasmid
+from cf_simulator.polynucleotide_to_dseqrecord import polynucleotide_to_dseqrecord, _anneal, _dscode, _quick_dseq, _load_pydna
+from cf_simulator.dseqrecord_to_polynucleotide import dseqrecord_to_polynucleotide
+
+def random_polynucleotide(rng):
+    # Linear molecules get any combination of 5'/3' overhangs at each end; circular ones none
+    def bases(n, alphabet="ACGT"):
+        return ''.join(rng.choice(alphabet) for _ in range(n))
+    circular = rng.random() < 0.2
+    ends = ['', bases(rng.randint(1, 6)), '-' + bases(rng.randint(1, 6))]
+    ext5 = '' if circular else rng.choice(ends)
+    ext3 = '' if circular else rng.choice(ends)
+    return Polynucleotide(bases(rng.randint(1, 60), "ACGTN"), ext5, ext3, True, circular, "phosphate", "hydroxyl")
+
+def test_round_trip_property():
+    # Polynucleotide -> Dseqrecord -> Polynucleotide gives back the same molecule,
+    # and the Dseq matches the one built by annealing both strands
+    rng = random.Random(134)
+    for _ in range(2000):
+        poly = random_polynucleotide(rng)
+        record = polynucleotide_to_dseqrecord(poly)
+        assert dseqrecord_to_polynucleotide(record, "phosphate", "hydroxyl") == poly
+        if not poly.is_circular:
+            annealed = _anneal(poly.sequence, poly.ext5, poly.ext3)
+            assert (record.seq.watson, record.seq.crick, record.seq.ovhg) == (annealed.watson, annealed.crick, annealed.ovhg)
+
+def test_quick_dseq_matches_constructor():
+    # The unchecked Dseq.quick fast path builds the same Dseq as the checked constructor
+    _load_pydna()
+    rng = random.Random(135)
+    for _ in range(500):
+        poly = random_polynucleotide(rng)
+        data = _dscode(poly.sequence, poly.ext5, poly.ext3)
+        quick, checked = _quick_dseq(data, poly.is_circular), Dseq(data, circular=poly.is_circular)
+        assert (quick.watson, quick.crick, quick.ovhg, quick.circular, quick.pos) == \
+            (checked.watson, checked.crick, checked.ovhg, checked.circular, checked.pos)
+        assert bytes(quick) == bytes(checked)
+
+def test_sticky_ends():
+    # An EcoRI-style 5' overhang on the left and a 3' overhang on the right
+    poly = Polynucleotide("GGCC", "AATT", "-TG", True, False, None, None)
+    dseq = polynucleotide_to_dseqrecord(poly).seq
+    assert (dseq.watson, dseq.crick, dseq.ovhg) == ("AATTGGCCTG", "GGCC", -4)
+
+def test_blunt_and_circular():
+    assert polynucleotide_to_dseqrecord(dsDNA("ACGT")).seq == Dseq("ACGT")
+    record = polynucleotide_to_dseqrecord(plasmid("ACGTTT"))
+    assert record.circular and str(record.seq.watson) == "ACGTTT"
+
+def test_no_output(capsys):
+    # Conversions do not print
+    record = polynucleotide_to_dseqrecord(Polynucleotide("GGCC", "AATT", "-TG", True, False, None, None))
+    dseqrecord_to_polynucleotide(record, None, None)
+    assert capsys.readouterr().out == ""
+
+@pytest.mark.parametrize("poly, message", [
+    (Polynucleotide("ACGX", "", "", True, False, None, None), "sequence"),
+    (Polynucleotide("ACGT", "A-T", "", True, False, None, None), "ext5"),
+    (Polynucleotide("ACGT", "", "N", True, False, None, None), "ext3"),
+])
+def test_invalid_characters(poly, message):
+    with pytest.raises(ValueError, match=message):
+        polynucleotide_to_dseqrecord(poly)
+
+def test_circular_with_overhang():
+    with pytest.raises(Exception, match="cannot have overhangs"):
+        polynucleotide_to_dseqrecord(Polynucleotide("ACGT", "AA", "", True, True, None, None))
@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import random
+import time
+import pytest
+from cf_simulator.construction_file import Gibson
+from cf_simulator.construction_file_simulator import perform_gibson
+from cf_simulator.gibson import assemble_gibson, find_overlaps
+
+def random_sequence(length, rng):
+    return ''.join(rng.choice("ACGT") for _ in range(length))
+
+def split_with_overlaps(sequence, parts, overlap, circular):
+    # Cut a sequence into parts that share overlap bases with their neighbours
+    size = len(sequence) // parts
+    if circular:
+        sequence = sequence + sequence[:overlap]
+    fragments = []
+    for i in range(parts):
+        end = (i + 1) * size + overlap if i < parts - 1 or circular else len(sequence)
+        fragments.append(sequence[i * size:end])
+    return fragments
+
+def test_linear_assembly_in_order():
+    rng = random.Random(1)
+    target = random_sequence(3000, rng)
+    assembly = assemble_gibson(split_with_overlaps(target, 4, 25, circular=False))
+    assert (assembly.sequence, assembly.circular, assembly.missing) == (target, False, [])
+    assert [junction.overlap for junction in assembly.junctions] == [25, 25, 25]
+
+def test_circular_assembly_from_shuffled_parts():
+    # Order is recovered automatically and the closing overlap makes the product circular
+    rng = random.Random(2)
+    target = random_sequence(50000, rng)
+    fragments = split_with_overlaps(target, 20, 30, circular=True)
+    shuffled = [fragments[0]] + rng.sample(fragments[1:], 19)
+    start = time.perf_counter()
+    assembly = assemble_gibson(shuffled)
+    assert time.perf_counter() - start < 1.0, "Overlap lookup should not compare every pair of fragments"
+    assert assembly.circular and assembly.missing == [] and not assembly.ambiguous
+    assert assembly.sequence == target
+    assert [shuffled[index] for index in assembly.order] == fragments
+
+def test_given_order_reports_missing_junction():
+    rng = random.Random(3)
+    target = random_sequence(2000, rng)
+    a, b, c = split_with_overlaps(target, 3, 20, circular=False)
+    assembly = assemble_gibson([a, c, b], order='given')
+    assert assembly.missing == [(0, 1), (1, 2)]
+    assert assemble_gibson([a, c, b]).sequence == target, "Automatic ordering fixes the order"
+
+def test_ambiguous_end_is_reported():
+    # Two fragments start with the same homology arm
+    rng = random.Random(4)
+    arm = random_sequence(20, rng)
+    fragments = [random_sequence(100, rng) + arm, arm + random_sequence(100, rng), arm + random_sequence(100, rng)]
+    assembly = assemble_gibson(fragments)
+    assert set(right for right, _ in assembly.ambiguous[0]) == {1, 2}
+
+def test_overlap_limits():
+    # Overlaps shorter than 15 bp are not junctions
+    rng = random.Random(5)
+    arm = random_sequence(14, rng)
+    assert find_overlaps(["A" * 50 + arm, arm + "C" * 50]) == [[], []]
+
+def test_perform_gibson_circular_product():
+    rng = random.Random(6)
+    target = random_sequence(1500, rng)
+    product, cost, time = perform_gibson(Gibson(split_with_overlaps(target, 3, 20, circular=True), "gibsonproduct"))
+    assert product.sequence == target and product.is_circular
@@ -0,0 +1,148 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import random
+import time
+from cf_simulator.construction_file import ConstructionFile, GoldenGate
+from cf_simulator.construction_file_simulator import perform_goldengate, simulate
+from cf_simulator.scheduler import simulate_parallel
+from cf_simulator.step_cache import StepCache
+from cf_simulator.goldengate import assemble_goldengate, digest_parts, flip_overhang
+from cf_simulator.polynucleotide import dsDNA, plasmid
+from cf_simulator.polynucleotide_to_dseqrecord import reverse_complement_overhang
+
+SITES = ("GGTCTC", "GAGACC", "GCTCTTC", "GAAGAGC")
+
+def random_body(length, rng):
+    # Part bodies must not carry a BsaI or SapI site of their own
+    while True:
+        body = ''.join(rng.choice("ACGT") for _ in range(length))
+        if not any(site in body for site in SITES):
+            return body
+
+def bsai_part(left, body, right):
+    return f"GGTCTCA{left}{body}{right}TGAGACC"
+
+def is_rotation(product, target):
+    return len(product) == len(target) and product in target + target
+
+def moclo_parts(count, rng):
+    # count parts joined by distinct 4-nt overhangs, the last one closing back to the first
+    overhangs = set()
+    while len(overhangs) < count:
+        overhang = random_body(4, rng)
+        if overhang != reverse_complement_overhang(overhang):
+            overhangs.add(overhang)
+    overhangs = sorted(overhangs)
+    bodies = [random_body(60, rng) for _ in range(count)]
+    parts = [bsai_part(overhangs[i], bodies[i], overhangs[(i + 1) % count]) for i in range(count)]
+    target = ''.join(overhangs[i] + bodies[i] for i in range(count))
+    return parts, target
+
+def test_three_part_circle():
+    parts, target = moclo_parts(3, random.Random(1))
+    result = assemble_goldengate(parts, 'BsaI')
+    assert len(result.fragments) == 3
+    assert len(result.assemblies) == 1
+    assembly = result.assemblies[0]
+    assert assembly.circular and assembly.pieces == [(0, True), (1, True), (2, True)]
+    assert is_rotation(assembly.sequence, target)
+    assert (result.collisions, result.palindromes, result.unmatched) == ({}, [], [])
+
+def test_reversed_part_is_flipped():
+    # A part supplied as its reverse complement ligates in the reverse orientation
+    parts, target = moclo_parts(4, random.Random(2))
+    parts[2] = reverse_complement_overhang(parts[2])
+    result = assemble_goldengate(parts, 'BsaI')
+    assert len(result.assemblies) == 1
+    assert (2, False) in result.assemblies[0].pieces
+    assert is_rotation(result.assemblies[0].sequence, target)
+
+def test_many_shuffled_parts_are_fast():
+    rng = random.Random(3)
+    parts, target = moclo_parts(25, rng)
+    rng.shuffle(parts)
+    start = time.perf_counter()
+    result = assemble_goldengate(parts, 'BsaI')
+    assert time.perf_counter() - start < 5
+    assert len(result.assemblies) == 1
+    assert len(result.assemblies[0].pieces) == 25
+    assert is_rotation(result.assemblies[0].sequence, target)
+
+def test_combinatorial_library_gives_every_variant():
+    # Two interchangeable parts per position share overhangs, so every combination assembles
+    rng = random.Random(4)
+    overhangs = ['AATG', 'GCTT', 'CGAC']
+    parts = [bsai_part(overhangs[i], random_body(50, rng), overhangs[(i + 1) % 3]) for i in range(3) for _ in range(2)]
+    result = assemble_goldengate(parts, 'BsaI')
+    assert len(result.assemblies) == 8
+    assert len({assembly.sequence for assembly in result.assemblies}) == 8
+    assert set(result.collisions) == set(overhangs)
+    assert assemble_goldengate(parts, 'BsaI', max_assemblies=3).assemblies.__len__() == 3
+
+def test_sapi_three_nucleotide_overhangs():
+    rng = random.Random(5)
+    overhangs = ['ATG', 'GCT', 'CCA']
+    bodies = [random_body(40, rng) for _ in range(3)]
+    parts = [f"GCTCTTCA{overhangs[i]}{bodies[i]}{overhangs[(i + 1) % 3]}TGAAGAGC" for i in range(3)]
+    result = assemble_goldengate(parts, 'SapI')
+    assert [len(fragment.ext5) for fragment in result.fragments] == [3, 3, 3]
+    assert len(result.assemblies) == 1
+    assert is_rotation(result.assemblies[0].sequence, ''.join(overhangs[i] + bodies[i] for i in range(3)))
+
+def test_overhang_checks():
+    rng = random.Random(6)
+    # GATC is palindromic; AATG and AATC differ at one base; TTTT has no partner
+    parts = [bsai_part('AATG', random_body(30, rng), 'GATC'),
+             bsai_part('GATC', random_body(30, rng), 'AATC'),
+             bsai_part('CCGG', random_body(30, rng), 'TTTT')]
+    result = assemble_goldengate(parts, 'BsaI')
+    assert 'GATC' in result.palindromes
+    assert ('AATC', 'AATG') in result.misligations
+    assert (2, 'ext3') in result.unmatched
+    assert flip_overhang('AATG') == 'CATT' and flip_overhang('-AATG') == '-CATT'
+
+def test_circular_backbone_drops_out_stuffer():
+    # The backbone's stuffer between its BsaI sites is recut, leaving the vector to take the insert
+    rng = random.Random(7)
+    vector, stuffer, insert = random_body(200, rng), random_body(40, rng), random_body(60, rng)
+    backbone = plasmid(f"{vector}GCTT" + "TGAGACC" + stuffer + "GGTCTCA" + "AATG")
+    parts = [backbone, bsai_part('GCTT', insert, 'AATG')]
+    fragments = digest_parts(parts, 'BsaI')
+    assert [(fragment.ext5, fragment.ext3) for fragment in fragments] == [('AATG', 'GCTT'), ('GCTT', 'AATG')]
+    result = assemble_goldengate(parts, 'BsaI')
+    assert len(result.assemblies) == 1
+    assert is_rotation(result.assemblies[0].sequence, f"{vector}GCTT{insert}AATG")
+    assert 'GGTCTC' not in result.assemblies[0].sequence
+
+def test_perform_goldengate_returns_circular_product():
+    parts, target = moclo_parts(3, random.Random(8))
+    product, cost, time_ = perform_goldengate(GoldenGate(parts, "BsaI", "gg"))
+    assert product.is_circular and is_rotation(product.sequence, target)
+    assert (cost, time_) == (30, 30)
+
+def test_simulate_keeps_plasmid_backbone_circular():
+    # The backbone's origin falls inside its vector, so only digesting it as a circle keeps the vector whole
+    rng = random.Random(9)
+    vector, stuffer, insert = random_body(200, rng), random_body(40, rng), random_body(60, rng)
+    backbone = f"{vector[100:]}GCTTTGAGACC{stuffer}GGTCTCAAATG{vector[:100]}"
+    target = f"{vector}GCTT{insert}AATG"
+    sequences = {"bb": plasmid(backbone), "ins": dsDNA(bsai_part('GCTT', insert, 'AATG'))}
+    construction_file = ConstructionFile([GoldenGate(["bb", "ins"], "BsaI", "construct")], sequences)
+    genes, _, _ = simulate(construction_file)
+    assert is_rotation(genes["construct"], target)
+    genes, _, _, _ = simulate_parallel(construction_file)
+    assert is_rotation(genes["construct"], target)
+    # The same sequence given as a linear fragment is a different step for the cache
+    cache = StepCache()
+    simulate(construction_file, cache=cache)
+    sequences["bb"] = dsDNA(backbone)
+    genes, _, _ = simulate(construction_file, cache=cache)
+    assert cache.stats()["misses"] == 2 and not is_rotation(genes["construct"], target)
+
+def test_goldengate_without_assembly_warns(caplog):
+    # Parts that cannot close a circle fall back to a linear join, loudly
+    product, _, _ = perform_goldengate(GoldenGate(["ATGC", "CGTA"], "BsaI", "gg"))
+    assert not product.is_circular
+    assert "No circular Golden Gate assembly" in caplog.text
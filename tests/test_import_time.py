@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../benchmarks')))
+
+import pickle
+from bench_import_time import parse_importtime, measure_import, check
+from cf_simulator.enzyme_table import ENZYMES, TABLE_PATH, build_enzyme_table, load_enzyme_table, is_known_enzyme
+
+def test_simulator_import_skips_pydna_and_biopython():
+    # A fresh interpreter imports the simulator without pydna or Bio.Restriction; the time budget
+    # is left to benchmarks/bench_import_time.py, since wall-clock time depends on the machine
+    assert check(measure_import(), budget_ms=None) == []
+
+def test_pickled_table_matches_biopython():
+    # The shipped table is current: rebuilding it from Biopython gives the same records
+    with open(TABLE_PATH, 'rb') as handle:
+        assert pickle.load(handle) == build_enzyme_table()
+    assert ENZYMES["BsaI"].site == "GGTCTC" and not ENZYMES["BsaI"].palindromic
+    assert "I-SceI" not in ENZYMES
+
+def test_stale_table_is_rebuilt(tmp_path):
+    # A table from another Biopython version is ignored and rebuilt, as is a missing one
+    table = build_enzyme_table()
+    table["biopython"] = "0.0"
+    table["enzymes"] = {}
+    path = tmp_path / "enzymes.pickle"
+    path.write_bytes(pickle.dumps(table))
+    assert load_enzyme_table(str(path)) == ENZYMES
+    assert load_enzyme_table(str(tmp_path / "missing.pickle")) == ENZYMES
+
+def test_is_known_enzyme():
+    # Table names are answered from the table; other names fall back to Biopython
+    assert is_known_enzyme("EcoRI") and is_known_enzyme("HhaI")
+    assert not is_known_enzyme("I-SceI") and not is_known_enzyme("FooI")
+
+def test_parse_importtime():
+    text = ("import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   re\n"
+            "import time:      2500 |       2620 | cf_simulator.construction_file_simulator\n")
+    times = parse_importtime(text)
+    assert [(entry.module, entry.self_us, entry.cumulative_us) for entry in times] == [
+        ("re", 120, 120), ("cf_simulator.construction_file_simulator", 2500, 2620)]
+    assert check(times, budget_ms=1) != [] and check(times, budget_ms=10) == []
+    assert check(times, budget_ms=None) == []
@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import random
+import types
+import pytest
+from cf_simulator.construction_file import ConstructionFile, PCR, Digest, GoldenGate, Ligate, Transform
+from cf_simulator.construction_file_simulator import simulate
+from cf_simulator import construction_file_simulator
+from cf_simulator.library import Library, slot_dependencies
+from cf_simulator.polynucleotide import dsDNA
+
+def random_body(length, rng):
+    while True:
+        body = ''.join(rng.choice("ACGT") for _ in range(length))
+        if "GGTCTC" not in body and "GAGACC" not in body:
+            return body
+
+def bsai_part(left, body, right):
+    return f"GGTCTCA{left}{body}{right}TGAGACC"
+
+def make_library(rng, promoters=3, cdss=4):
+    # promoter x cds into one backbone; the backbone PCR reads no slot
+    backbone = bsai_part('CGAC', random_body(200, rng), 'AATG')
+    construction_file = ConstructionFile([
+        PCR("GG", "CC", "backbone", "bb"),
+        PCR("AA", "TT", "promoter", "prom"),
+        GoldenGate(["bb", "prom", "cds"], "BsaI", "construct"),
+        Transform("construct", "Mach1", ["Zeo"], "xfm", 37),
+    ], {"backbone": dsDNA(backbone)})
+    slots = {
+        'promoter': {f"p{i}": bsai_part('AATG', random_body(40, rng), 'GCTT') for i in range(promoters)},
+        'cds': [bsai_part('GCTT', random_body(80, rng), 'CGAC') for _ in range(cdss)],
+    }
+    return Library(construction_file, slots)
+
+def test_variants_match_separate_simulations():
+    library = make_library(random.Random(1))
+    assert len(library) == 12
+    results = list(library.simulate())
+    expected = list(library.variants())
+    assert [result.choices for result in results] == [choices for choices, _ in expected]
+    for result, (choices, construction_file) in zip(results, expected):
+        genes, time, cost = simulate(construction_file)
+        assert (result.time, result.cost) == (time, cost)
+        assert result.products == {name: genes[name] for name in ('bb', 'prom', 'construct')}
+    # Each combination gives a distinct circular construct
+    assert len({result.products['construct'] for result in results}) == 12
+
+def test_shared_steps_run_once(monkeypatch):
+    # Count how often each operation is performed across the whole library
+    calls = []
+    for operation, perform in list(construction_file_simulator.OPERATIONS.items()):
+        def counting(step, context=None, perform=perform):
+            calls.append(step.output)
+            return perform(step, context)
+        monkeypatch.setitem(construction_file_simulator.OPERATIONS, operation, counting)
+    library = make_library(random.Random(2))
+    for _ in library.simulate():
+        pass
+    assert calls.count('bb') == 1
+    assert calls.count('prom') == 3
+    assert calls.count('construct') == 12
+    assert calls.count('xfm') == 12
+
+def test_simulate_is_lazy():
+    library = make_library(random.Random(3), promoters=100, cdss=100)
+    results = library.simulate()
+    assert isinstance(results, types.GeneratorType)
+    first = next(results)
+    assert first.choices == {'promoter': 'p0', 'cds': '0'}
+
+def test_slot_dependencies_follow_products():
+    steps = [PCR("GG", "CC", "a", "x"), PCR("GG", "CC", "x", "y"), Digest("b", ["EcoRI"], 0, "z"),
+             GoldenGate(["y", "z", "c"], "BsaI", "w")]
+    assert slot_dependencies(steps, {'a': {}, 'b': {}}) == [('a',), ('a',), ('b',), ('a', 'b')]
+
+def test_empty_slot_is_rejected():
+    with pytest.raises(ValueError):
+        Library(ConstructionFile([], {}), {'cds': []})
+
+def test_redefined_name_keeps_step_order():
+    # x is read by a slot step before a slot-free step redefines it, so the redefinition must not run first
+    steps = [Ligate(["slot", "x"], "y"), Ligate(["GGGG"], "x"), Ligate(["AAAA"], "slot"), Ligate(["slot"], "z")]
+    library = Library(ConstructionFile(steps, {"x": dsDNA("TTTT")}), {'slot': ['AAAA', 'CCCC']})
+    results = list(library.simulate())
+    for result, (choices, construction_file) in zip(results, library.variants()):
+        genes, _, _ = simulate(construction_file)
+        assert result.products == {name: genes[name] for name in ('y', 'x', 'slot', 'z')}
+    assert results[1].products['y'] == 'CCCCTTTT' and results[1].products['z'] == 'AAAA'
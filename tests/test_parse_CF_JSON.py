@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import io
+import json
+import pytest
+from cf_simulator.parse_CF_JSON import parse_CF_JSON, iter_CF_JSON, set_json_decoder
+
+PART = {"sequence": "atgcGAATTC", "ext5": "", "ext3": "", "is_double_stranded": True,
+        "is_circular": False, "mod_ext5": "hydroxyl", "mod_ext3": "hydroxyl"}
+
+def make_document(steps=None, name="part"):
+    return {"sequences": {name: PART}, "steps": steps if steps is not None else [
+        {"operation": "PCR", "forward_oligo": "ATGC", "reverse_oligo": "CGTA", "template": name, "output": "pcr"},
+        {"operation": "Digest", "dna": "pcr", "enzymes": ["EcoRI"], "fragSelect": 0, "output": "dig"},
+        {"operation": "GoldenGate", "dnas": ["dig"], "enzyme": "BsaI", "output": "gg"},
+        {"operation": "Transform", "dna": "gg", "strain": "Mach1", "antibiotics": ["Zeo"], "output": "xfm",
+         "temperature": 37}]}
+
+def describe(construction_file):
+    return [vars(step) for step in construction_file.steps], construction_file.sequences
+
+def test_parses_steps_and_sequences():
+    # Steps keep their fields and defaults; sequences are upper-cased parts
+    construction_file = parse_CF_JSON(json.dumps(make_document()))
+    pcr, digest, goldengate, transform = construction_file.steps
+    assert (pcr.operation, pcr.template, pcr.product_size) == ("PCR", "part", None)
+    assert (digest.enzymes, goldengate.enzyme, transform.temperature) == (["EcoRI"], "BsaI", 37)
+    assert construction_file.sequences["part"].sequence == "ATGCGAATTC"
+
+@pytest.mark.parametrize("decoder", [json.loads, None])
+def test_decoders_give_same_result(decoder):
+    # The standard library and the default (fastest installed) decoder parse identically
+    text = json.dumps(make_document())
+    expected = describe(parse_CF_JSON(text))
+    set_json_decoder(decoder)
+    try:
+        assert describe(parse_CF_JSON(text)) == expected
+        assert describe(parse_CF_JSON(text.encode())) == expected
+    finally:
+        set_json_decoder()
+
+@pytest.mark.parametrize("step, message", [
+    ({"operation": "Mutagenize", "output": "x"}, "Unrecognized operation: Mutagenize"),
+    ({"operation": "Ligate"}, "Missing required field(s) dnas, output for Ligate operation."),
+    ({"operation": "Digest", "dna": "part", "enzymes": ["EcoRI", "FooI"], "fragSelect": 0, "output": "x"},
+     "Unrecognized enzyme(s): FooI"),
+    ({"operation": "GoldenGate", "dnas": ["part"], "enzyme": "EcoRI", "output": "x"},
+     "Invalid enzyme EcoRI for GoldenGate"),
+    ({"operation": "Transform", "dna": "part", "strain": "Mach1", "antibiotics": ["Amp"], "output": "x"},
+     "Unrecognized antibiotic(s): Amp"),
+])
+def test_invalid_steps_raise(step, message):
+    # Each validation failure reports the offending operation, field or value
+    with pytest.raises(ValueError, match=message.replace("(", r"\(").replace(")", r"\)")):
+        parse_CF_JSON(json.dumps(make_document([step])))
+
+def test_unknown_field_raises():
+    # Fields a step does not take are rejected as before
+    step = {"operation": "Ligate", "dnas": ["part"], "output": "x", "volume": 10}
+    with pytest.raises(TypeError):
+        parse_CF_JSON(json.dumps(make_document([step])))
+
+def test_stream_matches_individual_parses():
+    # A small chunk size forces items to span reads; each item parses as it would alone
+    documents = [make_document(name=f"part{i}") for i in range(5)]
+    handle = io.StringIO(" [\n" + ",\n".join(json.dumps(document) for document in documents) + "\n]\n")
+    parsed = list(iter_CF_JSON(handle, chunk_size=16))
+    assert [describe(item) for item in parsed] == [describe(parse_CF_JSON(json.dumps(d))) for d in documents]
+
+def test_stream_single_document_and_errors():
+    # A lone construction file yields itself; a truncated array is an error
+    assert len(list(iter_CF_JSON(json.dumps(make_document())))) == 1
+    assert list(iter_CF_JSON("[]")) == []
+    with pytest.raises(ValueError):
+        list(iter_CF_JSON("[" + json.dumps(make_document()), chunk_size=8))
+
+@pytest.mark.parametrize("separator, tail", [(" ", "]"), (",", ",]"), (",,", "]")])
+def test_stream_requires_commas_between_items(separator, tail):
+    # Missing, trailing and doubled commas are rejected, as json.loads rejects them
+    item = json.dumps(make_document())
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_CF_JSON("[" + item + separator + item + tail, chunk_size=8))
+
+@pytest.mark.parametrize("chunk_size", [8, 64, 1 << 16])
+def test_stream_error_position_is_relative_to_document(chunk_size):
+    # Positions count the items already read, whatever the chunk size
+    text = "[\n" + ",\n".join(json.dumps(make_document()) for _ in range(3)) + ',\n  {"steps": [}\n]'
+    with pytest.raises(json.JSONDecodeError) as error:
+        list(iter_CF_JSON(text, chunk_size=chunk_size))
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(text)
+    assert (error.value.pos, error.value.lineno, error.value.colno) == \
+        (expected.value.pos, expected.value.lineno, expected.value.colno)
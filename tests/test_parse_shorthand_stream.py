@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import io
+import pytest
+from cf_simulator.parse_CF_shorthand import parse_CF_shorthand, iter_CF_shorthand
+
+SHORTHAND = """/* primers for the
+   lacZ amplicon */
+oligo fwd ATGCGG  # forward primer
+rev CGTA // reverse primer
+pcr fwd rev lacz /* inline */ pcrprod
+ligate pcrprod fwd lig
+"""
+
+def test_yields_sequences_and_steps_in_order():
+    # Items come out in file order with their names
+    items = list(iter_CF_shorthand(io.StringIO(SHORTHAND)))
+    assert [(kind, name) for kind, name, _ in items] == [
+        ("sequence", "fwd"), ("sequence", "rev"), ("step", "pcrprod"), ("step", "lig")]
+    assert items[2][2].template == "lacz"
+
+def test_file_and_string_give_same_result():
+    # parse_CF_shorthand accepts an open file as well as a string
+    from_string = parse_CF_shorthand(SHORTHAND)
+    from_file = parse_CF_shorthand(io.StringIO(SHORTHAND))
+    assert [vars(step) for step in from_file.steps] == [vars(step) for step in from_string.steps]
+    assert from_file.sequences == from_string.sequences
+
+def test_reads_lazily():
+    # Each item is yielded before the following lines are read
+    def lines():
+        yield "oligo fwd ATGC\n"
+        yield "/* open block\n"
+        raise AssertionError("read past the first item")
+    parser = iter_CF_shorthand(lines())
+    assert next(parser)[1] == "fwd"
+
+def test_error_reports_physical_line():
+    # Line numbers count lines inside block comments
+    with pytest.raises(ValueError, match="line 4"):
+        parse_CF_shorthand("/*\n\n*/\nfoo a b c\n")
+
+@pytest.mark.parametrize("line, kind, type_name", [
+    ("PCR fwd rev lacz 500 out", "step", "PCR"),
+    ("Digest dna EcoRI,BamHI 1 out", "step", "Digest"),
+    ("GoldenGate a b BsaI out", "step", "GoldenGate"),
+    ("Gibson a b out", "step", "Gibson"),
+    ("plasmid out acgtnrkyswbvhdm", "sequence", "Polynucleotide"),
+])
+def test_operations_dispatch(line, kind, type_name):
+    # Operation names are case-insensitive and sequences are upper-cased
+    (got_kind, name, value), = iter_CF_shorthand(line)
+    assert (got_kind, name, type(value).__name__) == (kind, "out", type_name)
+    if kind == "sequence":
+        assert value.sequence == "ACGTNRKYSWBVHDM"
+
+@pytest.mark.parametrize("line", ["seq ATGCX", "oligo seq ATG-C", "seq ATGCé"])
+def test_invalid_sequence_characters(line):
+    with pytest.raises(ValueError, match="Invalid sequence format"):
+        parse_CF_shorthand(line)
+
+def test_inline_block_comment_leaves_no_gap():
+    # A /* */ comment is removed outright, so the text either side of it joins up
+    construction_file = parse_CF_shorthand("oligo a ATG/* x */CCC\n")
+    assert construction_file.sequences["a"].sequence == "ATGCCC"
+
+@pytest.mark.parametrize("marker", ["#", "//"])
+def test_block_comment_wins_over_line_comment(marker):
+    # As in the whole-text parser, a /* after a # or // still opens a block comment
+    construction_file = parse_CF_shorthand(f"oligo a ATG {marker} see /* \nfoo */\noligo b CCC\n")
+    assert {name: sequence.sequence for name, sequence in construction_file.sequences.items()} == {"a": "ATG", "b": "CCC"}
+
+def test_unclosed_block_comment_is_text():
+    # Without a closing */ the whole-text parser kept the /* as text
+    with pytest.raises(ValueError, match="line 1"):
+        parse_CF_shorthand("oligo a ATG /* open\noligo b CCC\n")
+
+def test_unclosed_block_comment_is_replayed():
+    # The lines after an unclosed /* are read again from the source rather than held while it is open
+    text = "oligo a CCC\nPCR fwd rev lacz /*out\noligo b GGG # note\n"
+    for source in (text, io.StringIO(text)):
+        construction_file = parse_CF_shorthand(source)
+        assert [step.output for step in construction_file.steps] == ["/*out"]
+        assert sorted(construction_file.sequences) == ["a", "b"]
+    with pytest.raises(ValueError, match="line 2: Unclosed"):
+        parse_CF_shorthand(iter(text.splitlines(keepends=True)))
@@ -0,0 +1,89 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import random
+from cf_simulator.construction_file import ConstructionFile, PCR
+from cf_simulator.construction_file_simulator import perform_pcr, simulate
+from cf_simulator.polynucleotide import plasmid
+from cf_simulator.pcr import find_amplicons, template_index, is_off_target, reverse_complement, TemplateIndex, SEED_LENGTH
+
+def random_sequence(length, seed):
+    return ''.join(random.Random(seed).choices("ACGT", k=length))
+
+TEMPLATE = random_sequence(3000, 1)
+FORWARD = "GAATTC" + TEMPLATE[100:120]
+REVERSE = "GGATCC" + reverse_complement(TEMPLATE[800:820])
+PRODUCT = "GAATTC" + TEMPLATE[100:820] + "GGATCC"
+
+def test_product_includes_primer_tails():
+    amplicons = find_amplicons(FORWARD, REVERSE, TEMPLATE)
+    assert len(amplicons) == 1
+    assert amplicons[0].sequence == PRODUCT
+    # Only the 3'-terminal ANNEAL_LENGTH bases of each primer count as bound
+    assert (amplicons[0].start, amplicons[0].end, amplicons[0].mismatches) == (102, 818, 0)
+
+def test_primers_on_the_other_strand():
+    # Reading the template backwards swaps the strands the primers anneal to
+    amplicons = find_amplicons(FORWARD, REVERSE, reverse_complement(TEMPLATE))
+    assert [amplicon.sequence for amplicon in amplicons] == [PRODUCT]
+
+def test_mismatches_away_from_the_three_prime_end():
+    mutated = FORWARD[:8] + ("A" if FORWARD[8] != "A" else "C") + FORWARD[9:]
+    amplicons = find_amplicons(mutated, REVERSE, TEMPLATE)
+    assert amplicons[0].mismatches == 1
+    assert amplicons[0].sequence.startswith(mutated)
+    assert find_amplicons(mutated, REVERSE, TEMPLATE, max_mismatches=0) == []
+    # A mismatch in the 3' seed prevents extension
+    seed_mutated = FORWARD[:-2] + ("A" if FORWARD[-2] != "A" else "C") + FORWARD[-1]
+    assert find_amplicons(seed_mutated, REVERSE, TEMPLATE) == []
+
+def test_circular_template_across_origin():
+    plasmid = TEMPLATE[500:] + TEMPLATE[:500]
+    assert find_amplicons(FORWARD, REVERSE, plasmid) == []
+    amplicons = find_amplicons(FORWARD, REVERSE, plasmid, circular=True)
+    assert amplicons[0].sequence == PRODUCT
+    assert amplicons[0].start > amplicons[0].end
+
+def test_off_target_amplicons():
+    # A second copy of the forward binding site upstream gives a longer, off-target product
+    template = TEMPLATE[:1500] + reverse_complement(TEMPLATE[100:120]) + TEMPLATE[1500:]
+    amplicons = find_amplicons(FORWARD, REVERSE, template)
+    assert amplicons[0].sequence == PRODUCT
+    assert any(is_off_target(amplicon) for amplicon in amplicons[1:])
+
+def test_perform_pcr_reuses_template_index():
+    template_index.cache_clear()
+    product, cost, time = perform_pcr(PCR(FORWARD, REVERSE, TEMPLATE, "amplicon"))
+    perform_pcr(PCR(FORWARD[3:], REVERSE, TEMPLATE, "again"))
+    assert product.sequence == PRODUCT
+    assert (cost, time) == (40, 120)
+    info = template_index.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+def test_index_matches_a_scan_of_the_template():
+    # Seeds are found where a scan finds them, including across the origin and with IUPAC codes
+    rng = random.Random(2)
+    for circular in (False, True):
+        sequence = ''.join(rng.choice("ACGTN") for _ in range(400))
+        text = sequence + sequence[:SEED_LENGTH - 1] if circular else sequence
+        index = TemplateIndex(sequence, circular)
+        for start in range(0, len(text) - SEED_LENGTH + 1, 7):
+            seed = text[start:start + SEED_LENGTH]
+            assert index.positions(seed) == [p for p in range(len(text) - SEED_LENGTH + 1) if text.startswith(seed, p)]
+    # Two 4-byte arrays per seed, not a dict of lists
+    index = TemplateIndex(TEMPLATE)
+    assert index._seeds.nbytes + index._positions.nbytes <= 8 * len(TEMPLATE)
+
+def test_simulate_amplifies_plasmid_across_origin():
+    # A template given as a plasmid is annealed as a circle
+    construction_file = ConstructionFile([PCR(FORWARD, REVERSE, "puc", "amplicon")],
+                                         {"puc": plasmid(TEMPLATE[500:] + TEMPLATE[:500])})
+    genes, _, _ = simulate(construction_file)
+    assert genes["amplicon"] == PRODUCT
+
+def test_primers_that_do_not_anneal_warn(caplog):
+    # The fallback join is kept, but logged as a warning
+    product, _, _ = perform_pcr(PCR("ATGC", "CGTA", TEMPLATE, "joined"))
+    assert product.sequence == "ATGC" + TEMPLATE + "CGTA"
+    assert any(record.levelname == "WARNING" and "do not anneal" in record.message for record in caplog.records)
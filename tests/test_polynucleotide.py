@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import pickle
+import pytest
+from cf_simulator.polynucleotide import Polynucleotide, dsDNA, oligo, plasmid
+
+def test_factories_keep_attributes():
+    # Fields are upper-cased and the factories set the same flags as before
+    part = plasmid("acgtAC")
+    assert (part.sequence, part.ext5, part.is_double_stranded, part.is_circular) == ("ACGTAC", "", True, True)
+    assert (oligo("AT").ext5, oligo("AT").mod_ext5) == (None, "hydroxyl")
+    assert Polynucleotide("AT", "ag", "tt", True, False, None, None).ext5 == "AG"
+
+def test_compact_representation():
+    # No per-instance dict, and already upper-case sequences are shared rather than copied
+    sequence = "ACGT" * 100
+    part = dsDNA(sequence)
+    assert not hasattr(part, "__dict__")
+    assert part.sequence is sequence
+
+def test_equality_and_hash():
+    # Equal parts hash equally; parts differing in any field are not equal
+    assert dsDNA("ACGT") == dsDNA("acgt") and hash(dsDNA("ACGT")) == hash(dsDNA("acgt"))
+    assert dsDNA("ACGT") != plasmid("ACGT")
+    assert dsDNA("ACGT") != dsDNA("ACGA")
+    assert len({dsDNA("ACGT"), dsDNA("ACGT"), oligo("ACGT")}) == 2
+
+def test_hash_follows_changes():
+    # Assigning a field invalidates the cached hash
+    part = dsDNA("ACGT")
+    before = hash(part)
+    part.sequence = "GGGG"
+    assert part == dsDNA("GGGG") and hash(part) != before
+
+def test_pickle_round_trip():
+    part = plasmid("ACGT")
+    assert pickle.loads(pickle.dumps(part)) == part
@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import json
+import random
+import tracemalloc
+import pytest
+from cf_simulator.construction_file import ConstructionFile, PCR, Digest, Ligate, GoldenGate, Transform
+from cf_simulator.construction_file_simulator import simulate
+from cf_simulator.polynucleotide import dsDNA, plasmid
+from cf_simulator.profiling import SimulationProfile
+
+TEMPLATE = "ATGCGAATTCGATCGGATCCATGCATGCAAGCTTGCAT" * 50
+
+def make_construction_file():
+    steps = [
+        PCR("ATGC", "CGTA", "template", "pcrproduct"),
+        Digest("pcrproduct", ["EcoRI", "BamHI"], 1, "digestproduct"),
+        Ligate(["digestproduct", "GGCC"], "ligproduct"),
+        Transform("ligproduct", "Mach1", ["Zeo"], "xfm", 37),
+    ]
+    return ConstructionFile(steps, {"template": dsDNA(TEMPLATE)})
+
+def test_profile_records_every_step():
+    # Each step gets timings, input lengths, fragment counts and a peak allocation
+    profile = SimulationProfile()
+    expected = simulate(make_construction_file())[1:]
+    assert simulate(make_construction_file(), profile=profile)[1:] == expected, "Profiling must not change results"
+    assert [step.operation for step in profile.steps] == ["PCR", "Digest", "Ligate", "Transform"]
+    pcr, digest, ligate, transform = profile.steps
+    assert pcr.input_lengths == [4, 4, len(TEMPLATE)]
+    assert digest.fragments == 101, "50 EcoRI and 50 BamHI sites give 101 fragments"
+    assert (pcr.fragments, transform.fragments) == (1, 0)
+    assert all(step.wall_time >= 0 and step.cpu_time >= 0 and step.peak_bytes >= 0 for step in profile.steps)
+    assert not tracemalloc.is_tracing(), "tracemalloc is stopped again after each step"
+
+def test_report_formats():
+    # JSON round-trips and the table lists the most expensive step first
+    profile = SimulationProfile(memory=False)
+    simulate(make_construction_file(), profile=profile)
+    report = json.loads(profile.to_json())
+    assert [step["output"] for step in report["steps"]] == ["pcrproduct", "digestproduct", "ligproduct", "xfm"]
+    assert report["steps"][0]["peak_bytes"] is None
+    lines = profile.table().splitlines()
+    slowest = max(profile.steps, key=lambda step: step.wall_time)
+    assert slowest.output in lines[2]
+    with pytest.raises(ValueError, match="Cannot sort"):
+        profile.table(sort_by="cost")
+
+def test_goldengate_counts_circular_parts_as_circles():
+    # A plasmid backbone with its origin in the vector is cut into 2 pieces, not the 3 of a linear digest
+    rng = random.Random(9)
+    def body(length):
+        while True:
+            sequence = ''.join(rng.choice("ACGT") for _ in range(length))
+            if "GGTCTC" not in sequence and "GAGACC" not in sequence:
+                return sequence
+    vector, stuffer, insert = body(200), body(40), body(60)
+    backbone = f"{vector[100:]}GCTTTGAGACC{stuffer}GGTCTCAAATG{vector[:100]}"
+    sequences = {"bb": plasmid(backbone), "ins": dsDNA(f"GGTCTCAGCTT{insert}AATGTGAGACC")}
+    profile = SimulationProfile(memory=False)
+    simulate(ConstructionFile([GoldenGate(["bb", "ins"], "BsaI", "construct")], sequences), profile=profile)
+    assert profile.steps[0].fragments == 2 + 3
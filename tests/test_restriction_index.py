@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import pytest
+from pydna.dseqrecord import Dseqrecord
+from pydna.dseq import Dseq
+from Bio.Restriction import RestrictionBatch
+from cf_simulator.restriction_index import RestrictionSiteIndex, site_index
+
+# A plasmid-like sequence with EcoRI, BamHI, BsaI (both strands), SapI and SmaI sites
+SEQUENCE = ("ATGCGAATTCTTAGGATCCAAGGTCTCAATGCCGTTAACGAGACCTTGCGCTCTTCA"
+            "TTGCCCGGGATTACGGTCTCGCATCAAGAGCACCGAATTCGGCAT")
+
+def fragment_strands(fragments):
+    # Compare fragments by both strands and overhang
+    return [(str(f.seq.watson), str(f.seq.crick), f.seq.ovhg) for f in fragments]
+
+@pytest.mark.parametrize("enzymes", [
+    ["EcoRI"], ["BamHI", "EcoRI"], ["BsaI"], ["SapI"], ["SmaI", "BsaI", "EcoRI"], ["NotI"],
+])
+def test_linear_fragments_match_pydna(enzymes):
+    # Fragment boundaries must be identical to a pydna digest
+    expected = Dseqrecord(Dseq(SEQUENCE)).cut(RestrictionBatch(enzymes))
+    assert fragment_strands(RestrictionSiteIndex(SEQUENCE).cut(enzymes)) == fragment_strands(expected)
+
+@pytest.mark.parametrize("enzymes", [["EcoRI"], ["BsaI"], ["BamHI", "SapI"]])
+def test_circular_fragments_match_pydna(enzymes):
+    # Sites spanning the origin of a circular molecule are found too
+    rotated = SEQUENCE[6:] + SEQUENCE[:6]
+    expected = Dseqrecord(Dseq(rotated, circular=True)).cut(RestrictionBatch(enzymes))
+    got = RestrictionSiteIndex(rotated, circular=True).cut(enzymes)
+    assert fragment_strands(got) == fragment_strands(expected)
+
+def test_enzyme_outside_index():
+    # Enzymes not in the precompiled table are indexed on request
+    sequence = "AAGCGCTTTTTGCGCAA"
+    expected = Dseqrecord(Dseq(sequence)).cut(RestrictionBatch(["HhaI"]))
+    assert fragment_strands(RestrictionSiteIndex(sequence).cut(["HhaI"])) == fragment_strands(expected)
+
+def test_no_cut_and_unknown_enzyme():
+    # No sites gives no fragments; unknown names raise ValueError
+    index = RestrictionSiteIndex("ATATATATAT")
+    assert index.cut(["EcoRI"]) == ()
+    with pytest.raises(ValueError, match="not recognized"):
+        index.cut(["NotAnEnzyme"])
+
+def test_site_index_is_cached():
+    # The same sequence reuses the same index
+    assert site_index(SEQUENCE) is site_index(SEQUENCE)
+    assert site_index(SEQUENCE) is not site_index(SEQUENCE, circular=True)
@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import json
+import random
+import tracemalloc
+from cf_simulator.construction_file import ConstructionFile, Ligate, Gibson
+from cf_simulator.construction_file_simulator import simulate
+from cf_simulator.gibson import assemble_gibson
+from cf_simulator.polynucleotide import Polynucleotide, dsDNA
+from cf_simulator.rope import Rope, join, flatten
+
+def random_sequence(length, seed):
+    return ''.join(random.Random(seed).choices("ACGT", k=length))
+
+def test_rope_behaves_like_its_string():
+    parts = ["ACGT", "TTGCA", "", "GGG"]
+    rope = Rope(parts)
+    text = ''.join(parts)
+    assert (len(rope), str(rope)) == (len(text), text)
+    for start in range(len(text) + 1):
+        for stop in range(start, len(text) + 1):
+            assert str(rope[start:stop]) == text[start:stop]
+    assert [rope[i] for i in range(-len(text), len(text))] == [text[i] for i in range(-len(text), len(text))]
+    assert rope[::-1] == text[::-1]
+    assert rope == text and text == rope and hash(rope) == hash(text)
+    assert rope.startswith("ACGTT") and rope.endswith("AGGG") and not rope.startswith("T")
+    assert "AC" + rope + "GT" == "AC" + text + "GT"
+    assert str(Rope(["acgT", "GG"]).upper()) == "ACGTGG"
+
+def test_joining_and_slicing_share_the_parts():
+    backbone = random_sequence(100000, 1)
+    rope = Rope([backbone, "GAATTC", backbone])
+    assert rope._segments[0][0] is backbone and len(rope._segments) == 3
+    # Slicing back across a join keeps references to the original strings
+    piece = rope[50000:100003]
+    assert piece._segments[0][0] is backbone and str(piece) == backbone[50000:] + "GAA"
+    # Adjacent slices of one string merge back into a single segment
+    assert len(Rope([rope[:40000], rope[40000:80000]])._segments) == 1
+    assert join(["A", "C"]) == "AC" and isinstance(join(["A", Rope(["C"])]), Rope)
+    assert flatten(rope) == backbone + "GAATTC" + backbone
+
+def test_case_is_checked_without_copying():
+    # isupper() and upper() search each segment in place, and copy only the segments holding lower case
+    backbone = random_sequence(1000000, 4)
+    shared = Rope([backbone])
+    rope = Rope([shared[:600000], "ggatcc", shared[400000:]])
+    tracemalloc.start()
+    try:
+        assert not rope.isupper()
+        upper = rope.upper()
+        assert upper.isupper() and rope[:600000].isupper()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 100000
+    assert [segment[0] is backbone for segment in upper._segments] == [True, False, True]
+    assert upper == backbone[:600000] + "GGATCC" + backbone[400000:]
+    assert Rope(["acgT"])[3:].isupper() and not Rope([]).isupper()
+
+def test_polynucleotide_flattens_on_first_read():
+    product = Polynucleotide(Rope(["acgt", "GGCC"]), "", "", True, False, None, None)
+    assert isinstance(product.lazy_sequence, Rope)
+    assert product.sequence == "ACGTGGCC"
+    assert isinstance(product.lazy_sequence, str)
+
+def test_gibson_assembles_ropes():
+    target = random_sequence(3000, 2)
+    fragments = [target[:1020], target[1000:2020], target[2000:]]
+    from_strings = assemble_gibson(fragments)
+    from_ropes = assemble_gibson([Rope([fragment[:500], fragment[500:]]) for fragment in fragments])
+    assert isinstance(from_ropes.sequence, Rope)
+    assert from_ropes.sequence == from_strings.sequence == target
+
+def test_ligation_chain_does_not_copy_the_backbone():
+    # Twenty ligations onto a 1 Mb backbone allocate far less than twenty copies of it
+    backbone = random_sequence(1000000, 3)
+    steps = [Ligate(["backbone" if i == 0 else f"lig{i - 1}", "GGATCC"], f"lig{i}") for i in range(20)]
+    construction_file = ConstructionFile(steps, {"backbone": dsDNA(backbone)})
+    tracemalloc.start()
+    try:
+        genes, _, _ = simulate(construction_file, lazy=True)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 2 * len(backbone)
+    assert isinstance(genes["lig19"], Rope)
+    assert str(genes["lig19"]) == backbone + "GGATCC" * 20
+
+def test_simulate_returns_str_products():
+    # Without lazy=True products come back as str, so str operations and JSON work on them
+    construction_file = ConstructionFile([Ligate(["AAAAGAA", "TTCCCC"], "y")], {})
+    genes, _, _ = simulate(construction_file)
+    assert isinstance(genes["y"], str) and "GAATTC" in genes["y"]
+    assert json.loads(json.dumps(dict(genes)))["y"] == "AAAAGAATTCCCC"
@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from cf_simulator.construction_file import ConstructionFile, PCR, Digest, Gibson, Ligate, Transform
+from cf_simulator.construction_file_simulator import simulate
+from cf_simulator.polynucleotide import dsDNA
+from cf_simulator.scheduler import build_step_graph, critical_path, simulate_parallel
+from cf_simulator.step_cache import StepCache
+
+def make_construction_file():
+    # Three independent PCRs feeding one Gibson, then a transform
+    steps = [
+        PCR("ATGC", "CGTA", "schedtemplate", "schedpcra"),
+        PCR("GGCC", "TTAA", "schedtemplate", "schedpcrb"),
+        PCR("CCGG", "AATT", "A" * 1200, "schedpcrc"),
+        Gibson(["schedpcra", "schedpcrb", "schedpcrc"], "schedgibson"),
+        Digest("schedgibson", ["EcoRI"], 0, "scheddigest"),
+        Transform("scheddigest", "Mach1", ["Zeo"], "schedxfm", 37),
+    ]
+    return ConstructionFile(steps, {"schedtemplate": dsDNA("ATGCGAATTCGATCGGATCCATGC")})
+
+def test_step_graph_dependencies():
+    # PCRs are independent; the Gibson waits for all of them
+    graph = build_step_graph(make_construction_file().steps)
+    assert graph[:3] == [set(), set(), set()]
+    assert graph[3] == {0, 1, 2}
+    assert graph[4] == {3} and graph[5] == {4}
+
+def test_redefined_product_waits_for_readers():
+    # A step that overwrites a product waits for steps that read the old value
+    steps = [PCR("ATGC", "CGTA", "GATC", "schedx"), Ligate(["schedx", "GG"], "schedy"),
+             PCR("ATGC", "CGTA", "TTTT", "schedx")]
+    assert build_step_graph(steps)[2] == {0, 1}
+
+def test_parallel_matches_sequential():
+    # Products, time and cost are identical to sequential simulation
+    genes, time, cost = simulate(make_construction_file())
+    expected = {name: genes[name] for name in ("schedpcra", "schedpcrb", "schedpcrc", "schedgibson", "scheddigest")}
+    parallel_genes, parallel_time, parallel_cost, critical_time = simulate_parallel(make_construction_file(), max_workers=3)
+    assert {name: parallel_genes[name] for name in expected} == expected
+    assert (parallel_time, parallel_cost) == (time, cost)
+    assert critical_time < time, "Independent PCRs should overlap on the critical path"
+
+def test_parallel_with_process_pool_and_cache():
+    # Steps run in other processes and repeated runs are served from the cache
+    genes, time, cost = simulate(make_construction_file())
+    cache = StepCache()
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        first = simulate_parallel(make_construction_file(), executor=executor, cache=cache)
+    second = simulate_parallel(make_construction_file(), cache=cache)
+    assert cache.stats()["hits"] == 6 and cache.stats()["misses"] == 6
+    for run in (first, second):
+        assert run[0]["scheddigest"] == genes["scheddigest"]
+        assert run[1:3] == (time, cost)
+
+def test_critical_path():
+    # The longest chain through the graph determines the wall-clock estimate
+    total, path = critical_path([set(), set(), {0, 1}], [30, 60, 15])
+    assert total == 75 and path == [1, 2]
+
+def test_parallel_propagates_errors():
+    # A failing step raises like the sequential simulator
+    cf = ConstructionFile([PCR("ATGC", "CGTA", "schedmissing", "schedfail")], {})
+    with pytest.raises(ValueError, match="not found"):
+        simulate_parallel(cf)
@@ -0,0 +1,101 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import random
+import pytest
+from cf_simulator.construction_file import ConstructionFile, PCR
+from cf_simulator.construction_file_simulator import simulate, SimulationContext, symbol_to_gene
+from cf_simulator.sequence_store import SequenceStore, SequenceView, index_fasta, read_fasta_index, write_twobit
+
+def random_sequence(length, seed, alphabet="ACGT"):
+    return ''.join(random.Random(seed).choices(alphabet, k=length))
+
+RECORDS = [
+    ("pUC19", random_sequence(2686, 1)),
+    ("chr1", random_sequence(5003, 2, "ACGTacgtN")),
+    ("tiny", "ACG"),
+]
+
+def write_fasta(path, records, width=60, newline="\n"):
+    with open(path, "w", newline="") as handle:
+        for name, sequence in records:
+            handle.write(f">{name} description{newline}")
+            for start in range(0, len(sequence), width):
+                handle.write(sequence[start:start + width] + newline)
+
+@pytest.fixture(params=["fasta", "crlf", "indexed", "2bit"])
+def store(request, tmp_path):
+    path = str(tmp_path / "registry")
+    if request.param == "2bit":
+        write_twobit(path, RECORDS)
+    else:
+        write_fasta(path, RECORDS, width=70 if request.param == "indexed" else 60,
+                    newline="\r\n" if request.param == "crlf" else "\n")
+        if request.param == "indexed":
+            index_fasta(path)
+    with SequenceStore(path) as opened:
+        yield opened
+
+def expected(sequence):
+    return ''.join(base if base in "ACGTacgt" else "N" for base in sequence).upper()
+
+def test_whole_sequences_and_regions(store):
+    assert list(store) == ["puc19", "chr1", "tiny"]
+    for name, sequence in RECORDS:
+        view = store[name.lower()]
+        assert isinstance(view, SequenceView) and len(view) == len(sequence)
+        assert str(view) == expected(sequence)
+    chr1 = expected(RECORDS[1][1])
+    # Views are sliced without reading; each read covers only its own region
+    assert str(store["chr1"][59:61]) == chr1[59:61]
+    assert str(store["chr1"][1000:4000][5:-5]) == chr1[1005:3995]
+    assert store["chr1"][-1] == chr1[-1]
+    assert str(store["chr1:100-250"]) == chr1[99:250]
+    with pytest.raises(KeyError):
+        store["chr1:0-10"]
+    assert "missing" not in store
+
+def test_soft_masking_is_kept_on_request(tmp_path):
+    path = str(tmp_path / "masked.2bit")
+    write_twobit(path, RECORDS)
+    with SequenceStore(path, uppercase=False) as store:
+        assert str(store["chr1"]) == ''.join(base if base in "ACGTacgt" else "N" for base in RECORDS[1][1])
+
+def test_index_file_matches_samtools_layout(tmp_path):
+    path = str(tmp_path / "parts.fa")
+    write_fasta(path, RECORDS)
+    entries = index_fasta(path)
+    assert [(entry.name, entry.length, entry.line_bases, entry.line_width) for entry in entries] == \
+        [("pUC19", 2686, 60, 61), ("chr1", 5003, 60, 61), ("tiny", 3, 3, 4)]
+    assert read_fasta_index(path + ".fai") == entries
+
+def test_first_open_writes_the_index(tmp_path):
+    # An unindexed FASTA is scanned once; the .fai written then is what later opens read
+    path = str(tmp_path / "parts.fa")
+    write_fasta(path, RECORDS)
+    with SequenceStore(path) as store:
+        assert list(store) == ["puc19", "chr1", "tiny"]
+    assert read_fasta_index(path + ".fai") == index_fasta(path, write=False)
+    with open(path + ".fai") as handle:
+        index = handle.read()
+    with open(path + ".fai", "w") as handle:
+        handle.write(index.replace("tiny", "renamed"))
+    with SequenceStore(path) as store:
+        assert list(store) == ["puc19", "chr1", "renamed"]
+        assert str(store["renamed"]) == expected(RECORDS[2][1])
+
+def test_simulate_from_store(store):
+    # Steps read the templates they name, including a region, straight from the store
+    template = expected(RECORDS[0][1])
+    construction_file = ConstructionFile([
+        PCR(template[100:120], "TTTT" + reverse_complement(template[700:720]), "puc19", "amplicon"),
+        PCR(template[150:170], reverse_complement(template[400:420]), "puc19:101-720", "inner"),
+    ], {})
+    genes, _, _ = simulate(construction_file, context=SimulationContext(library=store))
+    assert genes["amplicon"] == template[100:720] + "AAAA"
+    assert genes["inner"] == template[150:420]
+    assert "puc19" not in symbol_to_gene
+
+def reverse_complement(sequence):
+    return sequence.translate(str.maketrans("ACGT", "TGCA"))[::-1]
@@ -0,0 +1,129 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import asyncio
+import http.client
+import json
+import pytest
+from cf_simulator.construction_file_simulator import simulate
+from cf_simulator.parse_CF_shorthand import parse_CF_shorthand
+from cf_simulator.service import (SimulationService, ServiceBusy, SIMULATION_ERROR, METHOD_NOT_FOUND,
+                                  PARSE_ERROR, REQUEST_TIMEOUT, INVALID_PARAMS)
+
+SHORTHAND = "oligo fwd ATGC\noligo rev CGTA\npcr fwd rev lacz pcrout\nligate pcrout fwd ligout\n"
+
+def request(address, method, path, payload=None):
+    # A blocking HTTP client, run in a thread so many can be in flight at once
+    connection = http.client.HTTPConnection(*address, timeout=30)
+    body = payload if payload is None or isinstance(payload, str) else json.dumps(payload)
+    connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    data = response.read()
+    connection.close()
+    return response.status, json.loads(data) if data else None
+
+def rpc(address, method, params, request_id=1):
+    payload = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+    return asyncio.to_thread(request, address, "POST", "/", payload)
+
+def run_service(scenario, **options):
+    # Runs scenario(service) against a service listening on a free local port
+    async def main():
+        async with SimulationService(workers=1, **options) as service:
+            return await scenario(service)
+    return asyncio.run(main())
+
+def test_simulate_matches_in_process():
+    # Shorthand and JSON-object construction files give the products, time and cost of simulate()
+    genes, time, cost = simulate(parse_CF_shorthand(SHORTHAND))
+    construction_file = {"sequences": {"template": {"sequence": "ATGCGAATTC", "ext5": "", "ext3": "",
+                                                    "is_double_stranded": True, "is_circular": False,
+                                                    "mod_ext5": "hydroxyl", "mod_ext3": "hydroxyl"}},
+                         "steps": [{"operation": "Ligate", "dnas": ["template", "GGCC"], "output": "lig"}]}
+    async def scenario(service):
+        return await asyncio.gather(rpc(service.address, "simulate", {"construction_file": SHORTHAND}),
+                                    rpc(service.address, "simulate", [construction_file]))
+    (status, shorthand), (_, from_json) = run_service(scenario)
+    assert status == 200
+    assert shorthand["result"]["sequences"]["ligout"] == genes["ligout"]
+    assert (shorthand["result"]["time"], shorthand["result"]["cost"]) == (time, cost)
+    assert from_json["result"]["sequences"]["lig"] == "ATGCGAATTCGGCC"
+
+def test_concurrent_requests_are_batched():
+    # Requests arriving together share batches, and the metrics report their latencies
+    async def scenario(service):
+        responses = await asyncio.gather(*(rpc(service.address, "simulate", {"construction_file": SHORTHAND}, i)
+                                           for i in range(20)))
+        metrics = await asyncio.to_thread(request, service.address, "GET", "/metrics")
+        return responses, metrics
+    responses, (status, metrics) = run_service(scenario, batch_delay=0.05)
+    assert sorted(body["id"] for _, body in responses) == list(range(20))
+    assert all("result" in body for _, body in responses)
+    assert status == 200 and metrics["completed"] == 20 and metrics["queue_depth"] == 0
+    assert metrics["batches"] < 20, "Concurrent requests should have been batched"
+    assert metrics["latency_ms"]["p50"] <= metrics["latency_ms"]["p99"] <= metrics["latency_ms"]["max"]
+
+def test_errors_are_json_rpc_errors():
+    # Simulation failures, unknown methods and malformed bodies map to JSON-RPC errors
+    async def scenario(service):
+        bad = await rpc(service.address, "simulate", {"construction_file": "pcr fwd\n"})
+        unknown = await rpc(service.address, "digest", {})
+        invalid = await asyncio.to_thread(request, service.address, "POST", "/", "not json")
+        notification = await asyncio.to_thread(request, service.address, "POST", "/",
+                                               {"jsonrpc": "2.0", "method": "stats"})
+        return bad, unknown, invalid, notification
+    bad, unknown, invalid, notification = run_service(scenario)
+    assert bad[1]["error"]["code"] == SIMULATION_ERROR and bad[1]["error"]["message"].startswith("ValueError")
+    assert unknown[1]["error"]["code"] == METHOD_NOT_FOUND
+    assert invalid[0] == 400 and invalid[1]["error"]["code"] == PARSE_ERROR
+    assert notification == (204, None)
+
+def test_timeout_cancels_request():
+    # A request that misses its timeout is answered with an error and never simulated
+    async def scenario(service):
+        response = await rpc(service.address, "simulate", {"construction_file": SHORTHAND, "timeout": 0.001})
+        await asyncio.sleep(0.1)
+        return response, service.stats()
+    (_, body), stats = run_service(scenario, batch_delay=0.05)
+    assert body["error"]["code"] == REQUEST_TIMEOUT
+    assert stats["timed_out"] == 1 and stats["batches"] == 0
+
+def test_full_queue_refuses_requests():
+    # With no batcher draining it, the queue fills and further requests are refused
+    async def scenario():
+        service = SimulationService(workers=1, max_queue=1)
+        waiting = asyncio.create_task(service.simulate(SHORTHAND, timeout=0.05))
+        await asyncio.sleep(0)
+        with pytest.raises(ServiceBusy):
+            await service.simulate(SHORTHAND)
+        assert service.stats()["queue_depth"] == 1
+        with pytest.raises(asyncio.TimeoutError):
+            await waiting
+        return service.stats()
+    stats = asyncio.run(scenario())
+    assert (stats["requests"], stats["rejected"], stats["timed_out"]) == (2, 1, 1)
+
+def test_disconnected_client_request_is_dropped():
+    # A client that hangs up while its request is queued has it cancelled before it reaches a worker
+    async def scenario(service):
+        reader, writer = await asyncio.open_connection(*service.address)
+        body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "simulate",
+                           "params": {"construction_file": SHORTHAND}}).encode()
+        writer.write(b"POST / HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        await writer.drain()
+        await asyncio.sleep(0.1)
+        writer.close()
+        await writer.wait_closed()
+        await asyncio.sleep(0.8)
+        return service.stats()
+    stats = run_service(scenario, batch_delay=0.5)
+    assert stats["cancelled"] == 1 and stats["batches"] == 0 and stats["completed"] == 0
+
+@pytest.mark.parametrize("timeout", [True, 0, -1, "10"])
+def test_invalid_timeout_is_rejected(timeout):
+    # JSON true is not a one-second timeout
+    async def scenario(service):
+        return await rpc(service.address, "simulate", {"construction_file": SHORTHAND, "timeout": timeout})
+    _, body = run_service(scenario)
+    assert body["error"]["code"] == INVALID_PARAMS
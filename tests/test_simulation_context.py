@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from cf_simulator.construction_file import ConstructionFile, PCR, Ligate
+from cf_simulator.construction_file_simulator import simulate, SimulationContext, symbol_to_gene, reagent_to_price
+from cf_simulator.polynucleotide import dsDNA
+
+def make_construction_file(template):
+    # The same product names in every file, with a different template
+    steps = [
+        PCR("ATGC", "CGTA", "ctxtemplate", "ctxpcr"),
+        Ligate(["ctxpcr", "lacz"], "ctxlig"),
+    ]
+    return ConstructionFile(steps, {"ctxtemplate": dsDNA(template)})
+
+def test_products_stay_in_session():
+    # Products are visible through the session but never written to the shared library
+    with SimulationContext() as context:
+        genes, _, _ = simulate(make_construction_file("GGGG"), context=context)
+        assert genes["ctxpcr"] == "ATGCGGGGCGTA"
+        assert genes["lacz"] == symbol_to_gene["lacz"], "Base library should be readable"
+        assert set(context.products) == {"ctxtemplate", "ctxpcr", "ctxlig"}
+    assert "ctxpcr" not in symbol_to_gene
+    assert not context.products, "Closing the session should free its products"
+
+def test_concurrent_sessions_are_isolated():
+    # Simulations with the same product names do not see each other's results
+    templates = ["A" * n for n in range(1, 41)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda t: simulate(make_construction_file(t))[0]["ctxpcr"], templates))
+    assert results == ["ATGC" + t + "CGTA" for t in templates]
+
+def test_session_prices_and_library():
+    # A session can override prices and use its own base library
+    context = SimulationContext(library={"ctxgene": "TTTT"}, prices={**reagent_to_price, "DNA Ligase": 1})
+    steps = [Ligate(["ctxgene", "AAAA"], "ctxout")]
+    genes, _, cost = simulate(ConstructionFile(steps, {}), context=context)
+    assert genes["ctxout"] == "TTTTAAAA"
+    assert cost == 1
+    assert reagent_to_price["DNA Ligase"] == 20, "Shared price table must not change"
+    with pytest.raises(ValueError, match="not found"):
+        simulate(ConstructionFile([Ligate(["lacz"], "ctxout")], {}), context=context)
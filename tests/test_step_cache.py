@@ -0,0 +1,121 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import hashlib
+import random
+import pytest
+from cf_simulator.construction_file import ConstructionFile, PCR, Digest, Ligate, GoldenGate, Gibson, Transform
+from cf_simulator.construction_file_simulator import simulate, perform_pcr, resolve_gene_input, symbol_to_gene
+from cf_simulator.pcr import reverse_complement
+from cf_simulator.polynucleotide import dsDNA, plasmid
+from cf_simulator.step_cache import StepCache, step_key, encode_result, SIMULATOR_VERSION
+
+TEMPLATE = "ATGCGAATTCGATCGGATCCATGCATGCAAGCTTGCAT"
+
+def make_construction_file(template=TEMPLATE):
+    # PCR a template, digest it and ligate the fragment to a linker
+    steps = [
+        PCR("ATGC", "CGTA", "cachetemplate", "cachepcr"),
+        Digest("cachepcr", ["EcoRI"], 1, "cachedig"),
+        Ligate(["cachedig", "GGCC"], "cachelig"),
+        Transform("cachelig", "Mach1", ["Zeo"], "cachexfm", 37),
+    ]
+    return ConstructionFile(steps, {"cachetemplate": dsDNA(template)})
+
+def test_cached_results_identical_to_recomputed():
+    # A second run is served from the cache with the same products, time and cost
+    cache = StepCache()
+    genes, time, cost = simulate(make_construction_file())
+    expected = {name: genes[name] for name in ("cachepcr", "cachedig", "cachelig")}
+
+    first = simulate(make_construction_file(), cache=cache)
+    assert cache.stats()["misses"] == 4 and cache.stats()["hits"] == 0
+    second = simulate(make_construction_file(), cache=cache)
+    assert cache.stats()["hits"] == 4, "Repeated steps should hit the cache"
+    for genes, run_time, run_cost in (first, second):
+        assert {name: genes[name] for name in expected} == expected
+        assert (run_time, run_cost) == (time, cost)
+
+def test_changed_input_misses_only_downstream():
+    # Changing the template upstream of the EcoRI site re-runs the PCR and digest, but the
+    # selected fragment is unchanged so the ligate and transform steps still hit
+    cache = StepCache()
+    simulate(make_construction_file(), cache=cache)
+    simulate(make_construction_file("GG" + TEMPLATE), cache=cache)
+    assert cache.stats()["misses"] == 4 + 2, "Only the PCR and digest inputs changed"
+
+def test_key_uses_sequences_not_names():
+    # Inputs are keyed by their resolved sequence, so renamed inputs still hit
+    resolve = lambda gene_input: resolve_gene_input(gene_input, {"a": "ATGC", "b": "ATGC", "c": "GGGG"})
+    assert step_key(PCR("a", "c", "c", "out1"), resolve) == step_key(PCR("b", "c", "c", "out2"), resolve)
+    assert step_key(PCR("a", "c", "c", "out1"), resolve) != step_key(PCR("c", "c", "c", "out1"), resolve)
+
+def test_disk_tier_survives_new_cache(tmp_path):
+    # Results written to SQLite are found by a fresh cache
+    path = str(tmp_path / "steps.sqlite")
+    step = PCR("ATGC", "CGTA", "GATC", "PCR_Product")
+    resolve = lambda gene_input: resolve_gene_input(gene_input, symbol_to_gene)
+    first = StepCache(path=path)
+    result = first.run(step, perform_pcr, resolve)
+    first.close()
+
+    second = StepCache(path=path)
+    cached = second.run(step, perform_pcr, resolve)
+    assert second.stats()["disk_hits"] == 1, "Result should come from the disk tier"
+    assert encode_result(cached) == encode_result(result), "Cached result must be byte-identical"
+    second.close()
+
+def test_lru_evicts_by_size():
+    # The least recently used entries are evicted once the byte budget is exceeded
+    cache = StepCache(max_bytes=400)
+    resolve = lambda gene_input: gene_input
+    steps = [PCR("ATGC", "CGTA", "A" * (100 + i), f"p{i}") for i in range(3)]
+    for step in steps:
+        cache.run(step, perform_pcr, resolve)
+    assert cache.stats()["bytes"] <= 400
+    assert cache.stats()["entries"] < 3, "Oldest entry should have been evicted"
+    cache.run(steps[-1], perform_pcr, resolve)
+    assert cache.stats()["hits"] == 1, "Most recent entry should still be cached"
+
+def version_construction_file():
+    # One step of every operation, including a plasmid PCR template and a plasmid Golden Gate backbone
+    rng = random.Random(4)
+    # Without G the random stretches carry no restriction sites of their own
+    body = lambda length: ''.join(rng.choice("ACT") for _ in range(length))
+    template = body(300) + "GAATTC" + body(400) + "GGATCC" + body(300)
+    vector, insert = body(200), body(60)
+    return ConstructionFile([
+        PCR(template[-20:], reverse_complement(template[720:740]), "vtemplate", "vpcr"),
+        Digest("vpcr", ["EcoRI", "BamHI"], 1, "vdig"),
+        Ligate(["vdig", "GATC"], "vlig"),
+        GoldenGate(["vbackbone", "GGTCTCAGCTT" + insert + "AATGTGAGACC"], "BsaI", "vgg"),
+        Gibson([vector[:120], vector[100:]], "vgib"),
+        Transform("vgg", "Mach1", ["Zeo"], "vxfm", 37),
+    ], {"vtemplate": plasmid(template[500:] + template[:500]),
+        "vbackbone": plasmid(vector[100:] + "GCTTTGAGACC" + body(40) + "GGTCTCAAATG" + vector[:100])})
+
+class RecordingCache:
+    # Stands in for a StepCache, keeping the encoded result of every step
+    def __init__(self):
+        self.results = []
+    def run(self, step, perform, resolve, prices=None, circular=None):
+        result = perform(step)
+        self.results.append(encode_result(result))
+        return result
+
+# sha256 of the encoded step results of version_construction_file() for each SIMULATOR_VERSION.
+# When this test fails, a perform_* function changed its output: bump SIMULATOR_VERSION and
+# record the new digest here, so results cached by the old code are not reused.
+OUTPUT_DIGESTS = {
+    "5": "8396a23fd157d48c9ca69278cac828b37338415cd5f058d55ecdc03b84b642e7",
+    "6": "7e5dcff5ea6b030d7ebbae2cef7ad6d47a2822f39db4af8f97430f18c960a370",
+}
+
+def test_output_change_bumps_simulator_version():
+    # Results cached under one SIMULATOR_VERSION must be what the current code computes
+    recorder = RecordingCache()
+    simulate(version_construction_file(), cache=recorder)
+    digest = hashlib.sha256(b''.join(recorder.results)).hexdigest()
+    assert OUTPUT_DIGESTS.get(SIMULATOR_VERSION) == digest, \
+        f"Simulated output changed: bump SIMULATOR_VERSION and record {digest!r} for it"
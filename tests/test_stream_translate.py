@@ -0,0 +1,59 @@
+import gzip
+import io
+import pytest
+from bio_functions import reverse_complement, translate, read_fasta, translate_six_frames, find_orfs
+
+SEQUENCE = "CCATGGCTTCCTCCGAAGACGTTATCAAAGAGTTCATGTAAGGCTTACTTCAGCCATGCATGATTAACG"
+
+def frames_by_name(pieces):
+    # Group streamed pieces by (record name, frame)
+    frames = {}
+    for name, frame, start, protein in pieces:
+        frames.setdefault((name, frame), []).append(protein)
+    return frames
+
+def test_read_fasta_records_and_chunks():
+    # Multi-line records are split by header and upper-cased
+    fasta = ">first some description\nATGC\natgc\n>second\nGGCC\n"
+    records = [(name, "".join(chunks)) for name, chunks in read_fasta(io.StringIO(fasta), chunk_size=3)]
+    assert records == [("first", "ATGCATGC"), ("second", "GGCC")], "FASTA records parsed incorrectly"
+
+def test_read_raw_file():
+    # Files without a header are read as a single unnamed record
+    records = [(name, "".join(chunks)) for name, chunks in read_fasta(io.BytesIO(b"ATGC\nGGCC"))]
+    assert records == [(None, "ATGCGGCC")], "Raw sequence file parsed incorrectly"
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 7, 64])
+def test_six_frames_match_translate(chunk_size):
+    # Codons split across chunk boundaries must be carried over
+    fasta = ">seq\n" + "\n".join(SEQUENCE[i:i + 10] for i in range(0, len(SEQUENCE), 10)) + "\n"
+    frames = frames_by_name(translate_six_frames(io.StringIO(fasta), chunk_size=chunk_size))
+    for k in (1, 2, 3):
+        in_frame = SEQUENCE[k - 1:]
+        in_frame = in_frame[:len(in_frame) // 3 * 3]
+        assert "".join(frames[("seq", k)]) == translate(in_frame), f"Frame {k} mismatch"
+        assert "".join(reversed(frames[("seq", -k)])) == translate(reverse_complement(in_frame)), f"Frame -{k} mismatch"
+
+def test_six_frames_gzip(tmp_path):
+    # Gzip-compressed files are detected and decompressed while streaming
+    path = tmp_path / "genome.fa.gz"
+    with gzip.open(path, "wt") as handle:
+        handle.write(">g\nATGAAATAG\n")
+    frames = frames_by_name(translate_six_frames(str(path)))
+    assert frames[("g", 1)] == ["MK_"], "Gzip FASTA translation mismatch"
+
+def test_unknown_bases_translate_to_x():
+    # Codons containing ambiguous bases are reported as 'X'
+    frames = frames_by_name(translate_six_frames(io.BytesIO(b"ATGNNNTAG")))
+    assert frames[(None, 1)] == ["MX_"], "Ambiguous codon not translated to X"
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 64])
+def test_find_orfs_both_strands(chunk_size):
+    # ORFs on the forward and reverse strand are reported with record coordinates
+    orfs = list(find_orfs(io.StringIO(">seq\n" + SEQUENCE), min_length=3, chunk_size=chunk_size))
+    forward = [orf for orf in orfs if orf[1] > 0]
+    reverse = [orf for orf in orfs if orf[1] < 0]
+    assert ("seq", 3, 2, 41, "MASSEDVIKEFM") in forward, "Forward ORF not found"
+    for name, frame, start, end, protein in reverse:
+        assert translate(reverse_complement(SEQUENCE[start:end])) == protein + "_", "Reverse ORF coordinates mismatch"
+    assert reverse, "Reverse-strand ORF not found"
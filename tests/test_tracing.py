@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import logging
+import pytest
+from cf_simulator.construction_file import ConstructionFile, PCR, Digest, GoldenGate
+from cf_simulator.construction_file_simulator import simulate, perform_goldengate
+from cf_simulator.polynucleotide import dsDNA
+from cf_simulator.scheduler import simulate_parallel
+from cf_simulator.step_cache import StepCache
+from cf_simulator import tracing
+from cf_simulator.tracing import SpanCollector
+
+TEMPLATE = "ATGCGAATTCGATCGGATCCATGCATGCAAGCTTGCAT"
+
+def make_construction_file():
+    steps = [
+        PCR("ATGC", "CGTA", "template", "pcrproduct"),
+        Digest("pcrproduct", ["EcoRI", "BamHI"], 1, "digestproduct"),
+    ]
+    return ConstructionFile(steps, {"template": dsDNA(TEMPLATE)})
+
+@pytest.mark.parametrize("run", [
+    simulate,
+    lambda cf: simulate(cf, cache=StepCache()),
+    simulate_parallel,
+])
+def test_collector_receives_spans(run):
+    # Each step reports its name, output, input lengths, enzymes and duration
+    with SpanCollector() as collector:
+        run(make_construction_file())
+    spans = sorted(collector.spans, key=lambda span: span.output)
+    assert [(span.name, span.output) for span in spans] == [("Digest", "digestproduct"), ("PCR", "pcrproduct")]
+    assert spans[0].attributes == {"input_lengths": [len(TEMPLATE) + 8], "enzymes": ["EcoRI", "BamHI"]}
+    assert spans[1].attributes == {"input_lengths": [4, 4, len(TEMPLATE)]}
+    assert all(span.duration >= 0 for span in spans)
+    assert not tracing.enabled(), "The collector is detached on exit"
+
+def test_no_spans_without_hooks(monkeypatch):
+    # With no hook attached, steps are not measured at all
+    monkeypatch.setattr(tracing, "traced", lambda *args: pytest.fail("traced while disabled"))
+    simulate(make_construction_file())
+
+def test_goldengate_logs_instead_of_printing(capsys, caplog):
+    # Golden Gate writes nothing to stdout; fragment sizes go to the module logger at DEBUG
+    step = GoldenGate(["GGTCTCAATGCCGTTAAC", "GGTCTCTTACGGCATCAAGAGACC"], "BsaI", "ggproduct")
+    with caplog.at_level(logging.DEBUG, logger="cf_simulator.construction_file_simulator"):
+        perform_goldengate(step)
+    assert capsys.readouterr().out == ""
+    assert any("Using enzyme: BsaI" in message for message in caplog.messages)